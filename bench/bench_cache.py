@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""对比无缓存、冷缓存、热缓存时打开场馆列表的耗时和静态资源命中率
+
+模拟站点的脚本、样式和场馆图片都带 immutable 缓存头，并按 --asset-latency-ms 延迟
+（模拟远端 CDN）。每轮使用一个新的浏览器上下文（和脚本一样），计时从导航开始到
+load 事件（脚本、样式、图片都加载完，页面可交互），然后计时 --reloads 次 page.reload()
+（抢票循环中的刷新），取中位数。命中率统计全部导航的静态资源请求。
+
+安装路由后 Chromium 会关闭该上下文的 HTTP 缓存，刷新时的静态资源也都经过 Python；
+对比 warm 和 warm-first 的刷新耗时即可看出刷新时继续使用 AssetCache 还是交还给浏览器缓存更快。
+
+- none：不使用 AssetCache，只有浏览器自带的缓存，新上下文里总是空的
+- cold：AssetCache 的目录为空（第一次运行）
+- warm：沿用 cold 留下的目录（之后的每次运行），刷新时也由 AssetCache 提供（asset_cache_reloads 开启）
+- warm-first：同 warm，但第一次加载后移除路由，刷新交给浏览器缓存（asset_cache_reloads 关闭）
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.sync_api import sync_playwright
+
+from bench.mock_server import INDEX_PATH, MockServer
+from utils.asset_cache import AssetCache
+from utils.browser_launcher import context_options, launch_browser
+
+
+def run_trial(browser, server, cache, reloads=3):
+    """返回 (首次打开耗时ms, 刷新耗时中位数ms, 本轮命中率)"""
+    before = dict(cache.stats) if cache else None
+    context = browser.new_context(**context_options(True))
+    context.add_cookies([{'name': 'mock_session', 'value': '1', 'url': server.base_url}])
+    if cache:
+        cache.install(context)
+    page = context.new_page()
+    try:
+        started = time.perf_counter()
+        page.goto(f"{server.base_url}{INDEX_PATH}#/sportVenue/venues", wait_until='load')
+        first = (time.perf_counter() - started) * 1000
+        times = []
+        for _ in range(reloads):
+            started = time.perf_counter()
+            page.reload(wait_until='load')
+            times.append((time.perf_counter() - started) * 1000)
+        reload = statistics.median(times)
+    finally:
+        context.close()
+    if not cache:
+        return first, reload, None
+    hits = sum(cache.stats[k] - before[k] for k in ('hits', 'revalidated'))
+    total = hits + cache.stats['misses'] - before['misses']
+    return first, reload, hits / total if total else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark page load with a cold and a warm persistent asset cache')
+    parser.add_argument('--runs', type=int, default=5, help='Trials per mode')
+    parser.add_argument('--asset-latency-ms', type=float, default=80, help='Simulated latency of each static asset')
+    parser.add_argument('--reloads', type=int, default=3, help='Reloads timed per trial')
+    args = parser.parse_args()
+
+    server = MockServer(asset_latency_ms=args.asset_latency_ms).start()
+    try:
+        with sync_playwright() as p, tempfile.TemporaryDirectory() as tmp:
+            browser = launch_browser(p, headless=True)
+            try:
+                print(f"{'mode':<10} {'load p50':>9} {'reload p50':>11} {'hit rate':>9}")
+                for mode in ('none', 'cold', 'warm', 'warm-first'):
+                    results = []
+                    for i in range(args.runs):
+                        cache = None
+                        if mode != 'none':
+                            # 冷缓存每轮一个空目录；热缓存的目录已由 cold 填充
+                            directory = os.path.join(tmp, f'cold-{i}' if mode == 'cold' else 'warm')
+                            cache = AssetCache(directory, serve_reloads=mode != 'warm-first')
+                        results.append(run_trial(browser, server, cache, args.reloads))
+                        if mode == 'cold' and i == 0:
+                            # 第一次冷运行留下的内容作为热缓存
+                            os.rename(directory, os.path.join(tmp, 'warm'))
+                    rates = [r for _, _, r in results if r is not None]
+                    rate = f"{statistics.mean(rates):.0%}" if rates else '-'
+                    print(f"{mode:<10} {statistics.median(r[0] for r in results):>7.1f}ms "
+                          f"{statistics.median(r[1] for r in results):>9.1f}ms {rate:>9}")
+            finally:
+                browser.close()
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""在一台机器上用多个工作进程跑分布式预约：一个协调进程、N 个工作进程、一个模拟站点
+
+每个工作进程是独立的 Python 进程（各自的 Playwright 和浏览器），通过 Unix socket
+连接协调进程。任务为多个账号在不同时间段/场地上的预约，全部在 --release-in 秒后放票。
+输出每个任务由哪个工作进程完成、耗时、首次看到可预约相对放票的时间，以及各工作进程
+测得的时钟偏移。
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.harness import isolated_workdir, mock_config
+from bench.mock_server import INDEX_PATH, TIME_SLOTS, MockBookingSite, MockServer
+from utils.cluster import Coordinator, WorkerAgent
+from utils.job_queue import BookingJob, JobQueue
+
+
+def run_worker(args):
+    """工作进程：让页面对象访问模拟站点，在自己的临时目录中执行分到的任务"""
+    import pages.login_page as login_page_module
+    login_page_module.BASE_URL = args.base_url
+    login_page_module.VENUE_URL = f"{args.base_url}{INDEX_PATH}#/sportVenue"
+    with isolated_workdir():
+        WorkerAgent(address=args.worker, capacity=args.capacity, name=args.name).connect().run()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Distributed booking with several worker processes on one machine')
+    parser.add_argument('--workers', type=int, default=3, help='Worker processes')
+    parser.add_argument('--capacity', type=int, default=1, help='Browsers per worker')
+    parser.add_argument('--jobs', type=int, default=6, help='Accounts/targets to book')
+    parser.add_argument('--release-in', type=float, default=15.0, help='Seconds from start until release')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    parser.add_argument('--name', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return run_worker(args)
+
+    site = MockBookingSite(release_in=args.release_in)
+    server = MockServer(site=site).start()
+    with tempfile.TemporaryDirectory() as tmp, isolated_workdir():
+        jobs = []
+        for i in range(args.jobs):
+            # 每个任务一个账号、一个不同的时间段/场地，放票时间就是模拟站点的放票时间
+            cfg = mock_config(server, username=f'bench-{i}', time_slot=TIME_SLOTS[i // 2 % len(TIME_SLOTS)],
+                              court='out' if i % 2 else 'in', strategy='soft', max_attempts=200,
+                              release_time=datetime.now().strftime('%H:%M'), job_max_attempts=1,
+                              job_lead_seconds=args.release_in + 60)
+            job = BookingJob(cfg)
+            job.release_at = site.release_at
+            jobs.append(job)
+        coordinator = Coordinator(JobQueue(jobs), address=f"unix://{os.path.join(tmp, 'cluster.sock')}").start()
+        workers = [
+            subprocess.Popen([sys.executable, os.path.abspath(__file__), '--worker', coordinator.address,
+                              '--base-url', server.base_url, '--name', f'worker-{i}',
+                              '--capacity', str(args.capacity)])
+            for i in range(args.workers)
+        ]
+        try:
+            started = time.time()
+            summary = coordinator.run()
+            for worker in workers:
+                worker.wait(timeout=30)
+        finally:
+            for worker in workers:
+                if worker.poll() is None:
+                    worker.kill()
+            server.stop()
+
+    print(f"\n{len(jobs)} jobs on {args.workers} workers in {time.time() - started:.1f}s: {summary}")
+    print(f"{'job':<40} {'worker':<10} {'result':<8} {'duration':>9} {'seen vs release':>16} {'offset':>9}")
+    for r in coordinator.results:
+        seen = r.get('first_available_offset')
+        print(f"{r['job']:<40} {r['worker']:<10} {'ok' if r['success'] else 'unpaid' if r.get('unpaid') else 'failed':<8} {r['duration']:>8.2f}s "
+              f"{'-' if seen is None else f'{seen:+.3f}s':>16} {r['clock_offset'] * 1000:>+7.2f}ms")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
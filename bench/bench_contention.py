@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""与大量模拟竞争客户端同时抢票，比较各刷新策略的胜率和抢到所用时间"""
+import argparse
+import os
+import statistics
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.sync_api import sync_playwright
+
+from bench.harness import first_order, isolated_workdir, mock_config, point_pages_at, run_booking
+from bench.mock_server import ContentionSimulator, MockBookingSite, MockServer
+from pages.ticket_page import TicketPage
+from utils.browser_launcher import context_options, launch_browser
+
+
+def run_once(playwright, strategy, args, seed):
+    site = MockBookingSite(release_in=args.release_in, inventory=args.inventory)
+    server = MockServer(site=site).start()
+    simulator = ContentionSimulator(
+        site, clients=args.clients, seed=seed,
+        reaction_ms={'dist': 'lognormal', 'median': args.reaction_median_ms, 'sigma': args.reaction_sigma},
+    ).start()
+    point_pages_at(server)
+    cfg = mock_config(server, strategy=strategy, slots_api_url='/api/slots?venue={venue}&date={date}',
+                      wait_timeout_seconds=str(args.wait_timeout), max_attempts=args.max_attempts)
+    browser = launch_browser(playwright, headless=True)
+    try:
+        page = browser.new_context(**context_options(True)).new_page()
+        try:
+            run_booking(page, cfg)
+        except Exception:
+            pass
+        order = first_order(site)
+        return order['created_at'] - site.release_at if order else None
+    finally:
+        simulator.stop()
+        browser.close()
+        server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Win rate of each refresh strategy against synthetic competitors')
+    parser.add_argument('--strategies', nargs='*', default=list(TicketPage.STRATEGIES), help='Strategies to compare')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per strategy')
+    parser.add_argument('--clients', type=int, default=300, help='Competing synthetic clients')
+    parser.add_argument('--inventory', type=int, default=1, help='Bookings per court and slot')
+    parser.add_argument('--reaction-median-ms', type=float, default=1500, help='Median competitor reaction time')
+    parser.add_argument('--reaction-sigma', type=float, default=0.6, help='Lognormal sigma of reaction time')
+    parser.add_argument('--release-in', type=float, default=5.0, help='Seconds from start until release')
+    parser.add_argument('--wait-timeout', type=float, default=0.5, help='wait_timeout_seconds of the pipeline')
+    parser.add_argument('--max-attempts', type=int, default=40, help='Retry budget of select_time_slot_loop')
+    args = parser.parse_args()
+
+    with isolated_workdir(), sync_playwright() as p:
+        print(f"{'strategy':<10} {'wins':>7} {'t2w p50':>8} {'t2w min':>8}")
+        for strategy in args.strategies:
+            times = [run_once(p, strategy, args, seed=i) for i in range(args.runs)]
+            wins = [t for t in times if t is not None]
+            p50 = f"{statistics.median(wins):.2f}s" if wins else '-'
+            best = f"{min(wins):.2f}s" if wins else '-'
+            print(f"{strategy:<10} {len(wins):>3}/{args.runs:<3} {p50:>8} {best:>8}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""在不同故障注入配置下运行完整抢票流程，统计放票后到下单的耗时和无效重试次数"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.sync_api import sync_playwright
+
+from bench.harness import first_order, isolated_workdir, mock_config, point_pages_at, run_booking
+from bench.mock_server import MockBookingSite, MockServer
+from utils.browser_launcher import context_options, launch_browser
+from utils.fault_injection import FaultInjector
+from utils.run_history import RunRecorder
+
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fault_profiles')
+
+
+def run_profile(playwright, profile_path, runs, release_in, wait_timeout):
+    results = []
+    for _ in range(runs):
+        server = MockServer(site=MockBookingSite(release_in=release_in)).start()
+        point_pages_at(server)
+        cfg = mock_config(server, wait_timeout_seconds=str(wait_timeout))
+        recorder = RunRecorder.from_config('bench', cfg)
+        injector = FaultInjector.from_file(profile_path)
+        browser = launch_browser(playwright, headless=True)
+        try:
+            context = browser.new_context(**context_options(True))
+            injector.install(context)
+            page = context.new_page()
+            try:
+                ok = run_booking(page, cfg, recorder)
+            except Exception:
+                ok = False
+            order = first_order(server.site)
+            results.append({
+                'ok': ok and order is not None,
+                'time_to_booking': order['created_at'] - server.site.release_at if order else None,
+                'retries': recorder.retries,
+                'stats': dict(injector.stats),
+            })
+        finally:
+            browser.close()
+            server.stop()
+    return injector.name, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time-to-booking and wasted retries under injected faults')
+    parser.add_argument('--profiles', nargs='*', default=sorted(glob.glob(os.path.join(PROFILE_DIR, '*.json'))),
+                        help='Fault profile files')
+    parser.add_argument('--runs', type=int, default=3, help='Runs per profile')
+    parser.add_argument('--release-in', type=float, default=5.0, help='Seconds from start until release')
+    parser.add_argument('--wait-timeout', type=float, default=1.5, help='wait_timeout_seconds used by the pipeline')
+    args = parser.parse_args()
+
+    with isolated_workdir(), sync_playwright() as p:
+        print(f"{'profile':<14} {'success':>8} {'t2b p50':>8} {'t2b max':>8} {'retries':>8}  injected")
+        for path in args.profiles:
+            name, results = run_profile(p, path, args.runs, args.release_in, args.wait_timeout)
+            wins = [r for r in results if r['ok']]
+            times = [r['time_to_booking'] for r in wins]
+            stats = results[-1]['stats']
+            print(f"{name:<14} {len(wins):>4}/{len(results):<3} "
+                  f"{(statistics.median(times) if times else float('nan')):>7.2f}s "
+                  f"{(max(times) if times else float('nan')):>7.2f}s "
+                  f"{statistics.mean(r['retries'] for r in results):>8.1f}  "
+                  f"drop={stats['dropped']} err={stats['errors']} delay={stats['delay_ms'] / 1000:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
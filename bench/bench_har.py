@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""用录制的HAR离线回放抢票/余票查询/登录流程，统计耗时并检查结果是否与录制时一致
+
+先用真实站点录制一次：
+    python scripts/loop_script.py --config=config/settings.json --record-har har/booking.zip
+再反复回放：
+    python bench/bench_har.py --script loop --config=config/settings.json --har har/booking.zip --runs 10
+"""
+import argparse
+import importlib
+import os
+import statistics
+import sys
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCRIPTS = {
+    'loop': 'scripts.loop_script',
+    'leftover': 'scripts.leftover_script',
+    'login': 'scripts.login_script',
+}
+
+
+def run_once(module, config, har, latency_ms):
+    """回放一次，返回 (耗时秒数, 退出码)"""
+    original_argv = sys.argv
+    sys.argv = ['script.py', f'--config={config}', f'--replay-har={har}', f'--har-latency-ms={latency_ms}']
+    try:
+        start = time.perf_counter()
+        result = module.main()
+        elapsed = time.perf_counter() - start
+    finally:
+        sys.argv = original_argv
+    exit_code = result[0] if isinstance(result, tuple) else result
+    return elapsed, exit_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a recorded HAR through a script and time it')
+    parser.add_argument('--script', choices=list(SCRIPTS), default='loop', help='Script to replay')
+    parser.add_argument('--config', required=True, help='Path to config file')
+    parser.add_argument('--har', required=True, help='HAR file recorded with --record-har')
+    parser.add_argument('--runs', type=int, default=5, help='Number of replays')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Extra latency per replayed request')
+    parser.add_argument('--expect-exit', type=int, default=0, help='Exit code every replay must return')
+    args = parser.parse_args()
+
+    if args.script == 'login':
+        # 登录脚本会一直保持浏览器打开，无法重复回放
+        parser.error('login_script keeps the browser open forever; record/replay it manually')
+
+    module = importlib.import_module(SCRIPTS[args.script])
+    durations, failures = [], 0
+    for i in range(args.runs):
+        elapsed, exit_code = run_once(module, args.config, args.har, args.latency_ms)
+        durations.append(elapsed)
+        if exit_code != args.expect_exit:
+            failures += 1
+        print(f"run {i + 1}: {elapsed:.2f}s exit={exit_code}")
+
+    print(f"median {statistics.median(durations):.2f}s  min {min(durations):.2f}s  max {max(durations):.2f}s")
+    if failures:
+        print(f"REGRESSION: {failures}/{args.runs} runs did not exit with {args.expect_exit}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""对比各启动配置的浏览器启动耗时和模拟站点上的单次刷新耗时"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.sync_api import sync_playwright
+
+from bench.mock_server import INDEX_PATH, MockServer
+from utils.browser_launcher import LAUNCH_PROFILES, context_options, launch_browser
+
+
+def mock_session_cookie(base_url):
+    """模拟站点的登录cookie，跳过登录页"""
+    return {'name': 'mock_session', 'value': '1', 'url': base_url}
+
+
+def date_view_url(server, venue='C'):
+    return f"{server.base_url}{INDEX_PATH}#/sportVenue/venue?venue={venue}&date={server.site.dates()[1]}"
+
+
+def bench_profile(playwright, server, profile, headless, launches, reloads):
+    launch_times, reload_times = [], []
+    for i in range(launches):
+        start = time.perf_counter()
+        browser = launch_browser(playwright, headless=headless, profile=profile)
+        launch_times.append(time.perf_counter() - start)
+        try:
+            if i:
+                continue
+            context = browser.new_context(**context_options(headless, profile))
+            context.add_cookies([mock_session_cookie(server.base_url)])
+            page = context.new_page()
+            page.goto(date_view_url(server))
+            page.wait_for_selector("div.element:has-text('可预约')")
+            for _ in range(reloads):
+                start = time.perf_counter()
+                page.reload()
+                page.wait_for_selector("div.element:has-text('可预约')")
+                reload_times.append(time.perf_counter() - start)
+        finally:
+            browser.close()
+    return launch_times, reload_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark browser launch profiles against the mock site')
+    parser.add_argument('--launches', type=int, default=5, help='Browser launches per profile')
+    parser.add_argument('--reloads', type=int, default=20, help='Reloads per profile')
+    parser.add_argument('--headed', action='store_true', help='Benchmark headed mode')
+    parser.add_argument('--profiles', nargs='*', default=list(LAUNCH_PROFILES), help='Profiles to compare')
+    args = parser.parse_args()
+
+    server = MockServer().start()
+    try:
+        with sync_playwright() as p:
+            print(f"{'profile':<18} {'launch p50':>10} {'reload p50':>10} {'reload p90':>10}")
+            for profile in args.profiles:
+                launches, reloads = bench_profile(p, server, profile, not args.headed, args.launches, args.reloads)
+                reloads.sort()
+                print(f"{profile:<18} {statistics.median(launches) * 1e3:>8.0f}ms "
+                      f"{statistics.median(reloads) * 1e3:>8.0f}ms "
+                      f"{reloads[int(len(reloads) * 0.9) - 1] * 1e3:>8.0f}ms")
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""测量重试循环中单次 logger.info 的耗时：同步处理器 vs 队列+后台线程"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger import build_handlers, start_queue_logging
+
+
+def _measure(logger, calls):
+    """返回单次调用的平均耗时（微秒）"""
+    start = time.perf_counter()
+    for i in range(calls):
+        logger.info("Failed to select time slot: %s, retrying...", f"20:00-21:00 #{i}")
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def _fresh_logger(name):
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def run(calls, compact):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, 'w', encoding='utf-8') as devnull:
+        # 旧方案：处理器直接挂在logger上，调用方同步写终端和文件
+        sync_logger = _fresh_logger('bench.sync')
+        handlers = build_handlers(os.path.join(tmp, 'sync.log'), compact=compact, stream=devnull)
+        for handler in handlers:
+            sync_logger.addHandler(handler)
+        results['sync'] = _measure(sync_logger, calls)
+        for handler in handlers:
+            handler.close()
+
+        # 新方案：调用方只入队，后台线程写终端和文件
+        queue_logger = _fresh_logger('bench.queue')
+        handlers = build_handlers(os.path.join(tmp, 'queue.log'), compact=compact, stream=devnull)
+        listener = start_queue_logging(queue_logger, handlers)
+        results['queue'] = _measure(queue_logger, calls)
+        drain_start = time.perf_counter()
+        listener.stop()
+        results['queue_drain_ms'] = (time.perf_counter() - drain_start) * 1e3
+        for handler in handlers:
+            handler.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-call logging cost')
+    parser.add_argument('--calls', type=int, default=20000, help='Number of logger.info calls per pipeline')
+    parser.add_argument('--compact', action='store_true', help='Use the compact structured format')
+    args = parser.parse_args()
+
+    results = run(args.calls, args.compact)
+    print(f"sync  handlers : {results['sync']:.2f} us/call")
+    print(f"queue handler  : {results['queue']:.2f} us/call  (background drain {results['queue_drain_ms']:.0f} ms)")
+    print(f"speedup        : {results['sync'] / results['queue']:.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
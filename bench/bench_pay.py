@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""对比模拟站点上支付密码输入阶段的耗时：逐个点击按键 vs 缓存键盘布局批量输入
+
+每轮在模拟站点上新建一个未支付订单，打开支付页并点击“下一步”，只计时 enter_password 阶段
+（输入密码、确认支付、判断结果）。
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.sync_api import sync_playwright
+
+from bench.mock_server import TIME_SLOTS, VENUE_COURTS, MockBookingSite, MockServer
+from pages.pay_page import PayPage
+from utils.browser_launcher import context_options, launch_browser
+
+
+def legacy_enter_password(pay_page, password):
+    """修改前的实现：逐个定位点击按键，确认后立即检查一次结果"""
+    pay_page.page.wait_for_selector("input#password", timeout=10000)
+    pay_page.page.click("input#password")
+    pay_page._click_keys(password)
+    pay_page.page.locator(".next-button-max").click()
+    # 立即检查时结果通常还没出现，这里补上等待才能与新实现比较
+    pay_page.page.locator("text=支付成功").or_(pay_page.page.locator("text=返回")).first.wait_for()
+    return not pay_page.page.locator("text=返回").is_visible()
+
+
+def run_trial(page, server, mode, password):
+    day = server.site.dates()[1]
+    order = None
+    for slot in TIME_SLOTS:
+        for court in VENUE_COURTS['C']:
+            order = server.site.book('C', day, slot, court)
+            if order:
+                break
+        if order:
+            break
+    page.goto(f"{server.base_url}/pay.html?order={order['orderId']}")
+    pay_page = PayPage(page, keypad_input='js' if mode == 'batch-js' else 'mouse')
+    pay_page.click_next_step()
+    start = time.perf_counter()
+    if mode == 'legacy':
+        ok = legacy_enter_password(pay_page, password)
+    else:
+        ok = pay_page.enter_password(password)
+    elapsed = time.perf_counter() - start
+    if not ok or server.site.orders[order['orderId']]['status'] != 'paid':
+        raise RuntimeError(f"payment failed in mode {mode}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the payment PIN entry stage on the mock site')
+    parser.add_argument('--runs', type=int, default=10, help='Payments per mode')
+    parser.add_argument('--slow-mo', type=int, default=0, help='Delay per Playwright call in ms (emulates a remote browser)')
+    args = parser.parse_args()
+
+    # 库存足够每种方式都支付 runs 次
+    server = MockServer(site=MockBookingSite(inventory=args.runs * 3)).start()
+    try:
+        with sync_playwright() as p:
+            browser = launch_browser(p, headless=True, slow_mo=args.slow_mo)
+            try:
+                page = browser.new_context(**context_options(True)).new_page()
+                for mode in ('legacy', 'batch-mouse', 'batch-js'):
+                    times = [run_trial(page, server, mode, server.site.pay_pass) for _ in range(args.runs)]
+                    print(f"{mode:<12} enter_password p50={statistics.median(times) * 1000:7.1f}ms "
+                          f"min={min(times) * 1000:7.1f}ms max={max(times) * 1000:7.1f}ms")
+            finally:
+                browser.close()
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""对比有无连接预热时，空闲之后第一次刷新时间段的耗时
+
+本地模拟站点没有 DNS/TLS 开销，这里在浏览器和模拟站点之间放一个 TCP 代理：
+每个新连接先等待 --connect-ms（模拟 DNS + TCP + TLS 的往返），空闲超过
+--idle-timeout 秒的连接被关闭（模拟服务器的 keep-alive 超时）。每轮先打开日期视图，
+空闲到连接被关闭，然后（可选）预热，再计时第一次请求时间段接口。
+"""
+import argparse
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.sync_api import sync_playwright
+
+from bench.mock_server import INDEX_PATH, MockServer
+from utils.browser_launcher import context_options, launch_browser
+from utils.prewarm import Prewarmer
+
+POLL_JS = '''async (url) => {
+    const started = performance.now();
+    const response = await fetch(url, {cache: 'no-store'});
+    await response.json();
+    return performance.now() - started;
+}'''
+
+
+class SlowConnectProxy:
+    """TCP 代理：新连接延迟 connect_ms 才转发，空闲 idle_timeout 秒后断开"""
+
+    def __init__(self, target, connect_ms, idle_timeout):
+        self.target = target
+        self.connect_ms = connect_ms
+        self.idle_timeout = idle_timeout
+        self.connections = 0
+        self.listener = socket.create_server(('127.0.0.1', 0))
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.listener.getsockname()[1]}"
+
+    def start(self):
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self.listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(client,), daemon=True).start()
+
+    def _serve(self, client):
+        self.connections += 1
+        time.sleep(self.connect_ms / 1000)
+        upstream = socket.create_connection(self.target)
+        for sock in (client, upstream):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        threading.Thread(target=self._pump, args=(upstream, client, None), daemon=True).start()
+        self._pump(client, upstream, self.idle_timeout)
+
+    @staticmethod
+    def _pump(src, dst, idle_timeout):
+        src.settimeout(idle_timeout)
+        try:
+            while True:
+                data = src.recv(65536)
+                if not data:
+                    break
+                dst.sendall(data)
+        except OSError:
+            pass
+        finally:
+            for sock in (src, dst):
+                try:
+                    sock.close()
+                except OSError:
+                    pass
+
+    def stop(self):
+        self.listener.close()
+
+
+def run_trial(browser, proxy, server, idle_timeout, prewarm):
+    context = browser.new_context(**context_options(True))
+    context.add_cookies([{'name': 'mock_session', 'value': '1', 'url': proxy.base_url}])
+    page = context.new_page()
+    try:
+        # 预热器和脚本中一样，在页面发出请求前创建，从请求中学到要预热的主机
+        prewarmer = Prewarmer(page, release_at=time.time())
+        day = server.site.dates()[1]
+        page.goto(f"{proxy.base_url}{INDEX_PATH}#/sportVenue/venue?venue=C&date={day}")
+        page.wait_for_selector("div.element:has-text('可预约')")
+        # 等待代理关闭空闲连接
+        time.sleep(idle_timeout + 0.5)
+        if prewarm:
+            prewarmer.prewarm()
+        return page.evaluate(POLL_JS, f"{proxy.base_url}/api/slots?venue=C&date={day}")
+    finally:
+        context.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark first-poll latency with and without connection prewarming')
+    parser.add_argument('--runs', type=int, default=5, help='Trials per mode')
+    parser.add_argument('--connect-ms', type=float, default=150, help='Simulated DNS + TCP + TLS setup per connection')
+    parser.add_argument('--idle-timeout', type=float, default=2.0, help='Seconds before an idle connection is closed')
+    args = parser.parse_args()
+
+    server = MockServer().start()
+    host, port = server.httpd.server_address[:2]
+    proxy = SlowConnectProxy((host, port), args.connect_ms, args.idle_timeout).start()
+    try:
+        with sync_playwright() as p:
+            browser = launch_browser(p, headless=True)
+            try:
+                for prewarm in (False, True):
+                    times = [run_trial(browser, proxy, server, args.idle_timeout, prewarm) for _ in range(args.runs)]
+                    print(f"{'prewarmed' if prewarm else 'cold':<10} first poll p50={statistics.median(times):7.1f}ms "
+                          f"min={min(times):7.1f}ms max={max(times):7.1f}ms")
+            finally:
+                browser.close()
+    finally:
+        proxy.stop()
+        server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""检查各入口的冷启动耗时，以及命令行入口是否加载了 GUI 模块
+
+第一部分用 -X importtime 运行到参数解析为止（不启动浏览器），只反映模块导入：
+  gymticket.py --help          只解析子命令
+  gymticket.py book --help     加载抢票脚本及 Playwright
+  scripts/loop_script.py       for_scheduler.py 原先直接运行的脚本
+  import main                  GUI 入口的模块加载
+
+第二部分测量抢票路径从进程启动到调用 launch_browser 的耗时：子进程照常运行
+gymticket.py book / scripts/loop_script.py（读配置、导入、启动 Playwright 驱动），
+在 launch_browser 被调用的那一刻记下时间并退出，不需要安装浏览器。
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRIES = {
+    'gymticket': ['gymticket.py', '--help'],
+    'gymticket book': ['gymticket.py', 'book', '--help'],
+    'loop_script': ['scripts/loop_script.py', '--help'],
+    'main.py (GUI)': ['-c', 'import main'],
+}
+# 命令行入口不应该加载的模块
+GUI_MODULES = ('tkinter', 'webbrowser', 'unittest.mock')
+
+# 抢票路径：(入口, 参数)，{config} 替换为临时配置文件
+LAUNCH_ENTRIES = {
+    'gymticket book': ['gymticket.py', 'book', '--config={config}'],
+    'loop_script': ['scripts/loop_script.py', '--config={config}'],
+}
+# 在子进程中替换 launch_browser：被调用时输出当前时间并立即退出，然后按原样运行入口脚本
+LAUNCH_PROBE = """
+import os, runpy, sys, time
+sys.path.insert(0, os.getcwd())
+import utils.browser_launcher
+def probe(*args, **kwargs):
+    print(f"launch_browser {time.time()}", flush=True)
+    os._exit(0)
+utils.browser_launcher.launch_browser = probe
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name='__main__')
+"""
+
+
+def parse_importtime(stderr):
+    """返回 {模块: (self_us, cumulative_us)}，只统计顶层导入"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us), not name[1:].startswith(' '))
+    return modules
+
+
+def run_entry(argv):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', *argv], cwd=ROOT,
+                            capture_output=True, text=True)
+    return time.perf_counter() - start, parse_importtime(result.stderr)
+
+
+def time_to_launch(argv):
+    """从启动子进程到入口调用 launch_browser 的秒数；没有走到启动浏览器时返回 None"""
+    start = time.time()
+    result = subprocess.run([sys.executable, '-c', LAUNCH_PROBE, *argv], cwd=ROOT, capture_output=True, text=True)
+    for line in result.stdout.splitlines():
+        if line.startswith('launch_browser '):
+            return float(line.split()[1]) - start
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check cold start import time of the entry points')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per entry point')
+    parser.add_argument('--top', type=int, default=5, help='Slowest top-level imports to show')
+    args = parser.parse_args()
+
+    failed = False
+    for label, argv in ENTRIES.items():
+        walls, imports = [], []
+        for _ in range(args.runs):
+            wall, modules = run_entry(argv)
+            walls.append(wall)
+            imports.append(sum(self_us for self_us, _, _ in modules.values()) / 1e6)
+        print(f"{label:<16} wall p50={statistics.median(walls) * 1000:7.1f}ms  "
+              f"imports p50={statistics.median(imports) * 1000:7.1f}ms  modules={len(modules)}")
+        top = sorted(((cum, name) for name, (_, cum, top_level) in modules.items() if top_level), reverse=True)
+        for cum, name in top[:args.top]:
+            print(f"    {cum / 1000:7.1f}ms  {name}")
+        if label.startswith('gymticket'):
+            loaded = [name for name in GUI_MODULES if name in modules]
+            if loaded:
+                failed = True
+                print(f"    !! command line entry imported GUI modules: {loaded}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = os.path.join(tmp, 'settings.json')
+        with open(config, 'w', encoding='utf-8') as f:
+            json.dump({'username': 'bench', 'password': 'bench', 'pay_pass': '000000', 'date': 'tomorrow',
+                       'time_slot': '20:00-21:00', 'venue': 'C', 'court': 'out', 'wait_timeout_seconds': '2'}, f)
+        print("\nbook path, process start -> launch_browser:")
+        for label, argv in LAUNCH_ENTRIES.items():
+            times = [time_to_launch([arg.format(config=config) for arg in argv]) for _ in range(args.runs)]
+            if None in times:
+                failed = True
+                print(f"{label:<16} !! did not reach launch_browser")
+                continue
+            print(f"{label:<16} p50={statistics.median(times) * 1000:7.1f}ms  "
+                  f"min={min(times) * 1000:7.1f}ms  max={max(times) * 1000:7.1f}ms")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    exit(main())
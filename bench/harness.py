@@ -0,0 +1,61 @@
+"""基准测试共用的工具：在模拟站点上跑真实的页面对象流程"""
+import os
+import tempfile
+from contextlib import contextmanager
+
+import pages.login_page as login_page_module
+from pages.login_page import LoginPage
+from pages.ticket_page import TicketPage
+from bench.mock_server import INDEX_PATH
+
+
+def point_pages_at(server):
+    """让页面对象访问模拟站点而不是真实站点（服务器时钟也只采样模拟站点）"""
+    login_page_module.BASE_URL = server.base_url
+    login_page_module.VENUE_URL = f"{server.base_url}{INDEX_PATH}#/sportVenue"
+
+
+@contextmanager
+def isolated_workdir():
+    """在临时目录中运行，避免模拟站点的 cookies / 深链接 / 运行历史写进真实的 config 目录"""
+    original = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            yield tmp
+        finally:
+            os.chdir(original)
+
+
+def mock_config(server, **overrides):
+    """模拟站点上的一份抢票配置"""
+    cfg = {
+        'username': 'bench',
+        'password': 'bench',
+        'pay_pass': server.site.pay_pass,
+        'date': 'tomorrow',
+        'time_slot': '20:00-21:00',
+        'venue': 'C',
+        'court': 'out',
+        'wait_timeout_seconds': '0.5',
+        'nav_mode': 'deeplink',
+        'pay_url': '/pay.html?order={order_id}',
+        'booking_api_path': '/api/book',
+        'orders_url': '#/orders',
+        'orders_api_path': '/api/orders',
+    }
+    cfg.update(overrides)
+    return cfg
+
+
+def run_booking(page, cfg, recorder=None):
+    """与 loop_script 相同的完整抢票流程，返回是否完成"""
+    LoginPage(page).login(cfg['username'], cfg['password'])
+    ticket_page = TicketPage.from_config(page, cfg, recorder=recorder)
+    return bool(ticket_page.book(cfg))
+
+
+def first_order(site, client='browser'):
+    """模拟站点上某个客户端的第一个订单"""
+    orders = [o for o in site.orders.values() if o['client'] == client]
+    return min(orders, key=lambda o: o['created_at']) if orders else None
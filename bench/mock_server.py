@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""本地模拟的体育馆预约站点，页面结构与选择器和真实站点保持一致，供离线基准测试使用
+
+启动后设置环境变量 GYM_BASE_URL=http://127.0.0.1:<port>，脚本和页面对象即会访问模拟站点。
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.fault_injection import sample_latency
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+INDEX_PATH = '/qljfwapp/sys/lwSzuCgyy/index.do'
+APP_JS_PATH = '/static/app.3f9c1e.js'
+APP_CSS_PATH = '/static/app.3f9c1e.css'
+
+# 与 TicketPage.venue_images 一致
+VENUE_IMAGES = {
+    'A': '6cf6b63b970a4f4b87193d799d8092c7',
+    'B': '317a6df934914473b49996840b305987',
+    'C': 'eaaf3fd0bf624a328966f987fcd0ac52',
+}
+VENUE_COURTS = {
+    'A': ['一楼健身房'],
+    'B': ['羽毛球场1号', '羽毛球场2号', '羽毛球场3号', '羽毛球场4号'],
+    'C': ['东馆篮球3号场', '天台篮球4号场'],
+}
+TIME_SLOTS = [f"{hour:02d}:00-{hour + 1:02d}:00" for hour in range(8, 22)]
+# 1x1 透明 PNG
+PIXEL_PNG = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082'
+)
+
+INDEX_HTML = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>体育场馆预约</title>
+<link rel="stylesheet" href="{APP_CSS_PATH}">
+</head><body><div id="app"></div><script src="{APP_JS_PATH}"></script></body></html>
+"""
+
+APP_CSS = """
+.union-2 { width: 120px; height: 80px; margin: 4px; background: #ddd; }
+.element { display: inline-block; padding: 6px; margin: 4px; border: 1px solid #999; cursor: pointer; }
+.element.selected { background: #9cf; }
+label { display: inline-block; }
+"""
+
+APP_JS = """
+const VENUES = %(venues)s;
+const api = (path, body) => fetch(path, body === undefined ? {} : {
+    method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify(body)
+}).then(r => r.json().then(data => ({status: r.status, data})));
+const el = (html) => { const t = document.createElement('template'); t.innerHTML = html.trim(); return t.content.firstChild; };
+const route = () => {
+    const [path, query] = (location.hash.slice(1) || '/sportVenue').split('?');
+    return {path, params: new URLSearchParams(query || '')};
+};
+
+function renderLogin(app) {
+    app.innerHTML = `<section><input id="username"><input id="password" type="password">
+        <div class="container-ge"><input type="checkbox"> 记住我</div>
+        <a id="login_submit" href="javascript:void(0)">登录</a></section>`;
+    document.getElementById('login_submit').onclick = async () => {
+        const res = await api('/api/login', {username: document.getElementById('username').value,
+                                             password: document.getElementById('password').value});
+        if (res.status === 200) { location.hash = '#/sportVenue'; render(); }
+    };
+}
+
+function renderCampus(app) {
+    app.innerHTML = '<div class="bh-btn-primary">粤海校区</div>';
+    app.firstChild.onclick = () => { location.hash = '#/sportVenue/venues'; };
+}
+
+function renderVenues(app) {
+    app.innerHTML = '';
+    for (const [venue, image] of Object.entries(VENUES)) {
+        const img = el(`<img class="union-2" src="/img/${image}.png">`);
+        img.onclick = () => { location.hash = `#/sportVenue/venue?venue=${venue}`; };
+        app.appendChild(img);
+    }
+}
+
+async function renderVenue(app, params) {
+    const venue = params.get('venue'), day = params.get('date');
+    app.innerHTML = '<div id="dates"></div><div id="slots"></div><div id="courts"></div>';
+    const dates = (await api('/api/dates')).data.dates;
+    for (const d of dates) {
+        const label = el(`<label><div class="date">${d}</div></label>`);
+        label.onclick = () => {
+            const target = `#/sportVenue/venue?venue=${venue}&date=${d}`;
+            if (location.hash === target) { render(); } else { location.hash = target; }
+        };
+        document.getElementById('dates').appendChild(label);
+    }
+    if (!day) return;
+    const res = await api(`/api/slots?venue=${venue}&date=${day}`);
+    for (const slot of res.data.slots) {
+        const node = el(`<div class="element">${slot.time}(${slot.status})</div>`);
+        if (slot.status === '可预约') node.onclick = () => selectSlot(node, venue, day, slot.time);
+        document.getElementById('slots').appendChild(node);
+    }
+}
+
+async function selectSlot(node, venue, day, time) {
+    document.querySelectorAll('#slots .element').forEach(n => n.classList.remove('selected'));
+    node.classList.add('selected');
+    const res = await api(`/api/courts?venue=${venue}&date=${day}&time=${time}`);
+    const courts = document.getElementById('courts');
+    courts.innerHTML = '';
+    let chosen = null;
+    for (const court of res.data.courts) {
+        const label = el(`<label><div class="element">${court.name}(${court.status})</div></label>`);
+        label.onclick = () => {
+            courts.querySelectorAll('.element').forEach(n => n.classList.remove('selected'));
+            label.firstChild.classList.add('selected');
+            chosen = court.name;
+        };
+        courts.appendChild(label);
+    }
+    const submit = el('<button class="bh-btn bh-btn-default bh-btn-large">提交预约</button>');
+    submit.onclick = async () => {
+        if (!chosen) return;
+        const booked = await api('/api/book', {venue, date: day, time, court: chosen});
+        if (booked.status === 200) { location.hash = '#/orders'; }
+        else { courts.appendChild(el(`<div class="error">${booked.data.message}</div>`)); }
+    };
+    courts.appendChild(submit);
+}
+
+async function renderOrders(app) {
+    app.innerHTML = '<a href="javascript:void(0)">已支付</a> <a href="javascript:void(0)">未支付</a><div id="orders"></div>';
+    app.querySelectorAll('a')[1].onclick = async () => {
+        const res = await api('/api/orders?status=unpaid');
+        const list = document.getElementById('orders');
+        list.innerHTML = '';
+        for (const order of res.data.orders) {
+            const row = el(`<div class="order">${order.time} ${order.court}
+                <button>(体育经费)支付</button> <button>(剩余金额)支付</button></div>`);
+            const [fund, balance] = row.querySelectorAll('button');
+            fund.onclick = () => window.open(`/pay.html?order=${order.orderId}`);
+            balance.onclick = () => api('/api/pay', {orderId: order.orderId, method: 'balance'});
+            list.appendChild(row);
+        }
+    };
+}
+
+async function render() {
+    const app = document.getElementById('app');
+    if (!document.cookie.includes('mock_session=')) return renderLogin(app);
+    const {path, params} = route();
+    if (path === '/sportVenue/venues') return renderVenues(app);
+    if (path === '/sportVenue/venue') return renderVenue(app, params);
+    if (path === '/orders') return renderOrders(app);
+    return renderCampus(app);
+}
+window.addEventListener('hashchange', render);
+render();
+"""
+
+PAY_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>支付</title></head><body>
+<button id="next">下一步</button>
+<div id="pin" style="display:none">
+  <input id="password" readonly>
+  <div class="keypad">%(keys)s</div>
+  <button class="next-button-max">确认支付</button>
+</div>
+<div id="result"></div>
+<script>
+const order = new URLSearchParams(location.search).get('order');
+let pin = '';
+document.getElementById('next').onclick = () => { document.getElementById('pin').style.display = 'block'; };
+document.querySelectorAll('.keypad button').forEach(key => key.onclick = () => {
+    pin += key.dataset.digit;
+    document.getElementById('password').value = '*'.repeat(pin.length);
+});
+document.querySelector('.next-button-max').onclick = async () => {
+    const r = await fetch('/api/pay', {method: 'POST', headers: {'Content-Type': 'application/json'},
+                                       body: JSON.stringify({orderId: order, method: 'fund', password: pin})});
+    document.getElementById('result').innerHTML = r.status === 200
+        ? '<div class="success">支付成功</div>' : '<div class="fail">支付失败 <a href="javascript:history.back()">返回</a></div>';
+};
+</script></body></html>
+""" % {'keys': ''.join(f'<button class="key-{d}" data-digit="{d}">{d}</button>' for d in '1234567890')}
+
+
+class MockBookingSite:
+    """模拟站点的状态：放票时间、每个场地的库存和订单"""
+
+    def __init__(self, release_in: float = 0.0, inventory: int = 1, pay_pass: str = '123456'):
+        self.release_at = time.time() + release_in
+        self.inventory = inventory
+        self.pay_pass = pay_pass
+        self.lock = threading.Lock()
+        self.booked = {}
+        self.orders = {}
+
+    def dates(self):
+        return [date.today().isoformat(), (date.today() + timedelta(days=1)).isoformat()]
+
+    def remaining(self, venue, day, slot, court):
+        return self.inventory - self.booked.get((venue, day, slot, court), 0)
+
+    def slot_status(self, venue, day, slot):
+        if time.time() < self.release_at:
+            return '未开放', 0
+        left = sum(self.remaining(venue, day, slot, court) for court in VENUE_COURTS.get(venue, []))
+        return ('可预约' if left > 0 else '已约满'), left
+
+    def slots(self, venue, day):
+        result = []
+        for slot in TIME_SLOTS:
+            status, left = self.slot_status(venue, day, slot)
+            result.append({'time': slot, 'status': status, 'remaining': left})
+        return result
+
+    def courts(self, venue, day, slot):
+        released = time.time() >= self.release_at
+        return [
+            {'name': court, 'status': '可预约' if released and self.remaining(venue, day, slot, court) > 0 else '已约满'}
+            for court in VENUE_COURTS.get(venue, [])
+        ]
+
+    def book(self, venue, day, slot, court, client='browser'):
+        """预订一个场地，成功返回订单，库存不足返回 None"""
+        with self.lock:
+            if time.time() < self.release_at or self.remaining(venue, day, slot, court) <= 0:
+                return None
+            key = (venue, day, slot, court)
+            self.booked[key] = self.booked.get(key, 0) + 1
+            order = {
+                'orderId': uuid.uuid4().hex[:12], 'venue': venue, 'date': day, 'time': slot,
+                'court': court, 'status': 'unpaid', 'client': client, 'created_at': time.time(),
+            }
+            self.orders[order['orderId']] = order
+            return order
+
+    def pay(self, order_id, method, password=None):
+        order = self.orders.get(order_id)
+        if not order or order['status'] != 'unpaid':
+            return False
+        if method == 'fund' and password != self.pay_pass:
+            return False
+        order['status'] = 'paid'
+        order['paid_at'] = time.time()
+        return True
+
+
+class ContentionSimulator:
+    """模拟放票时刻与我们竞争的大量客户端
+
+    每个客户端在放票后经过一段反应时间（按分布抽样，毫秒）尝试预订：以 hot_ratio 的概率
+    抢热门时间段，否则随机选一个时间段；场地按随机顺序尝试，直到订到或全部约满。
+    """
+
+    def __init__(self, site: MockBookingSite, clients: int = 200, reaction_ms=None,
+                 venue: str = 'C', day: str = None, hot_slot: str = '20:00-21:00',
+                 hot_ratio: float = 0.7, seed: int = None):
+        self.site = site
+        self.clients = clients
+        self.reaction_ms = reaction_ms or {'dist': 'lognormal', 'median': 1500, 'sigma': 0.6}
+        self.venue = venue
+        self.day = day or site.dates()[1]
+        self.hot_slot = hot_slot
+        self.hot_ratio = hot_ratio
+        self.rng = random.Random(seed)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _schedule(self):
+        plan = []
+        for i in range(self.clients):
+            fire_at = self.site.release_at + sample_latency(self.reaction_ms, self.rng) / 1000
+            slot = self.hot_slot if self.rng.random() < self.hot_ratio else self.rng.choice(TIME_SLOTS)
+            plan.append((fire_at, f"sim-{i}", slot))
+        return sorted(plan)
+
+    def _run(self):
+        for fire_at, client, slot in self._schedule():
+            if self._stop.wait(max(0.0, fire_at - time.time())):
+                return
+            courts = list(VENUE_COURTS[self.venue])
+            self.rng.shuffle(courts)
+            for court in courts:
+                if self.site.book(self.venue, self.day, slot, court, client=client):
+                    break
+
+    def start(self) -> 'ContentionSimulator':
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logger.info(f"Contention simulator started with {self.clients} clients")
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    site: MockBookingSite = None
+    # 静态资源（脚本、样式、图片）的额外延迟，模拟远端 CDN
+    asset_latency_ms: float = 0.0
+    # 与真实站点一样保持连接，连接复用（预热）的效果才能测出来
+    protocol_version = 'HTTP/1.1'
+    # 响应头和响应体分两次写出，复用连接时避免 Nagle + 延迟确认带来的 40ms 停顿
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        logger.debug("mock %s", format % args)
+
+    def _send(self, status, body, content_type='application/json; charset=utf-8', headers=None):
+        if not isinstance(body, bytes):
+            body = (body if isinstance(body, str) else json.dumps(body, ensure_ascii=False)).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_HEAD(self):
+        self.send_response(204)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        immutable = {'Cache-Control': 'public, max-age=31536000, immutable'}
+        if self.asset_latency_ms and (url.path.startswith('/static/') or url.path.startswith('/img/')):
+            time.sleep(self.asset_latency_ms / 1000)
+        if url.path == INDEX_PATH:
+            self._send(200, INDEX_HTML, 'text/html; charset=utf-8', {'Cache-Control': 'no-cache'})
+        elif url.path == APP_JS_PATH:
+            self._send(200, APP_JS % {'venues': json.dumps(VENUE_IMAGES)}, 'application/javascript', immutable)
+        elif url.path == APP_CSS_PATH:
+            self._send(200, APP_CSS, 'text/css', immutable)
+        elif url.path.startswith('/img/'):
+            self._send(200, PIXEL_PNG, 'image/png', immutable)
+        elif url.path == '/pay.html':
+            self._send(200, PAY_HTML, 'text/html; charset=utf-8')
+        elif url.path == '/api/dates':
+            self._send(200, {'dates': self.site.dates()})
+        elif url.path == '/api/slots':
+            self._send(200, {'slots': self.site.slots(query.get('venue'), query.get('date'))})
+        elif url.path == '/api/courts':
+            self._send(200, {'courts': self.site.courts(query.get('venue'), query.get('date'), query.get('time'))})
+        elif url.path == '/api/orders':
+            orders = [o for o in self.site.orders.values() if o['status'] == query.get('status', o['status'])]
+            self._send(200, {'orders': orders})
+        else:
+            self._send(404, {'message': 'not found'})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        body = self._json_body()
+        if url.path == '/api/login':
+            self._send(200, {'ok': True}, headers={'Set-Cookie': 'mock_session=1; Path=/'})
+        elif url.path == '/api/book':
+            order = self.site.book(body.get('venue'), body.get('date'), body.get('time'), body.get('court'),
+                                   client=body.get('client', 'browser'))
+            if order:
+                self._send(200, {'code': '0', 'data': order})
+            else:
+                self._send(409, {'code': '1', 'message': '该场地已被预约'})
+        elif url.path == '/api/pay':
+            ok = self.site.pay(body.get('orderId'), body.get('method'), body.get('password'))
+            self._send(200 if ok else 400, {'ok': ok})
+        else:
+            self._send(404, {'message': 'not found'})
+
+
+class MockServer:
+    """在后台线程中运行模拟站点"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, site: MockBookingSite = None,
+                 asset_latency_ms: float = 0.0):
+        self.site = site or MockBookingSite()
+        handler = type('BoundMockRequestHandler', (MockRequestHandler,),
+                       {'site': self.site, 'asset_latency_ms': asset_latency_ms})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Mock booking site running at {self.base_url}{INDEX_PATH}")
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local mock of the gym booking site')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on')
+    parser.add_argument('--release-in', type=float, default=0.0, help='Seconds until slots are released')
+    parser.add_argument('--inventory', type=int, default=1, help='Bookings available per court and slot')
+    parser.add_argument('--simulate-clients', type=int, default=0, help='Competing synthetic clients at release')
+    parser.add_argument('--reaction-ms', type=float, default=1500, help='Median reaction time of synthetic clients')
+    parser.add_argument('--asset-latency-ms', type=float, default=0.0, help='Extra latency of static assets')
+    args = parser.parse_args()
+
+    server = MockServer(port=args.port, site=MockBookingSite(release_in=args.release_in, inventory=args.inventory),
+                        asset_latency_ms=args.asset_latency_ms)
+    server.start()
+    if args.simulate_clients:
+        ContentionSimulator(server.site, clients=args.simulate_clients,
+                            reaction_ms={'dist': 'lognormal', 'median': args.reaction_ms, 'sigma': 0.6}).start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
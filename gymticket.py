@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""无界面的统一命令行入口
+
+    python gymticket.py book   --config=config/settings.json [--headed]
+    python gymticket.py query  --config=config/settings.json
+    python gymticket.py login  --config=config/settings.json --headed
+    python gymticket.py scan   --config=config/settings.json --until 22:00
+    python gymticket.py daemon --config=config/settings.json --jobs=config/jobs.json
+    python gymticket.py cluster coordinator --config=config/settings.json --jobs=config/jobs.json
+    python gymticket.py cluster worker --connect=tcp://10.0.0.1:8765 --capacity=2
+    python gymticket.py report [--mode book]
+
+只在选定子命令后才导入对应脚本（以及 Playwright），不加载 GUI 相关模块。
+抢票路径启动浏览器之前的耗时主要是启动 Playwright 驱动，与直接运行脚本相同；
+各入口的耗时可用 bench/bench_startup.py 检查。
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+
+# 子命令 -> (脚本模块, 说明)
+COMMANDS = {
+    'book': ('scripts.loop_script', '抢票'),
+    'query': ('scripts.leftover_script', '查询余票'),
+    'login': ('scripts.login_script', '只登录并保持浏览器打开'),
+    'scan': ('scripts.watch_script', '监视退订并预约'),
+    'daemon': ('scripts.queue_script', '按任务文件执行多日期/多账号预约'),
+    'cluster': ('scripts.cluster_script', '多台机器分布式预约（协调进程 / 工作进程）'),
+    'report': ('scripts.report_script', '运行历史统计报告'),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='gymticket',
+        description='Gym ticket command line',
+        epilog='\n'.join(f"  {name:<8}{desc}" for name, (_, desc) in COMMANDS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('command', choices=list(COMMANDS), help='Subcommand, see below')
+    parser.add_argument('args', nargs=argparse.REMAINDER, help='Arguments of the subcommand (try: <command> --help)')
+    args = parser.parse_args(argv)
+
+    module_name, _ = COMMANDS[args.command]
+    # 各脚本自行解析 sys.argv，这里把子命令之后的参数交给它
+    sys.argv = [f'gymticket {args.command}', *args.args]
+    result = importlib.import_module(module_name).main()
+
+    if isinstance(result, tuple):
+        exit_code, _, payload = result
+        if args.command == 'query':
+            # 与 leftover_script 直接运行时一致，结果以JSON输出到标准输出
+            print(json.dumps(payload, ensure_ascii=False))
+        return exit_code
+    return result or 0
+
+
+if __name__ == '__main__':
+    # 配置、日志和运行历史都使用相对路径，固定在项目根目录运行
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    sys.exit(main())
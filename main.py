@@ -55,11 +55,10 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import json
 import os
-import webbrowser
 from datetime import datetime
 import sys
-from unittest import mock
 from utils.logger import setup_logger
+from utils.browser_pool import BrowserPool
 
 logger = setup_logger(__name__)
 
@@ -81,6 +80,10 @@ class App:
         # 当前配置文件路径
         self.current_config_file = None
         
+        # 常驻浏览器池，与窗口同生命周期，每次运行只新建 context
+        self.browser_pool = BrowserPool()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
         # 初始化所有内容到一个页面
         self.setup_ui()
         
@@ -93,8 +96,23 @@ class App:
         # 启动监控settings.json变化的线程
         self.monitor_settings_json_changes()
         
+        # 界面显示后预热无头浏览器，余票查询无需再等待启动
+        self.root.after(500, self.warm_browser_pool)
+        
         logger.info("GUI initialized successfully")
 
+    def warm_browser_pool(self):
+        """预热浏览器池中的无头浏览器"""
+        try:
+            self.browser_pool.browser(headless=True)
+        except Exception as e:
+            logger.warning(f"failed to warm up browser pool: {str(e)}")
+
+    def on_close(self):
+        """关闭窗口时释放浏览器池"""
+        self.browser_pool.close()
+        self.root.destroy()
+
     def get_config_file_path(self, username):
         """根据用户名获取配置文件路径"""
         return os.path.join('config', f'settings_{username}.json')
@@ -442,7 +460,7 @@ class App:
     def clear_cookies(self, show_message=True):
         """清除cookie和存储的登录状态"""
         try:
-            cookie_files = ['cookies.json', 'storage.json']
+            cookie_files = ['cookies.json', 'storage.json', 'storage_state.json']
             for file in cookie_files:
                 path = os.path.join('config', file)
                 if os.path.exists(path):
@@ -768,12 +786,19 @@ class App:
             
             logger.info(f"running {script_name} script with args: {sys.argv[1:]}")
             
-            # 调用脚本的main函数
-            result = script_main()
+            # 调用脚本的main函数，复用常驻浏览器池
+            script_kwargs = {'pool': self.browser_pool}
+            if mode == 3:
+                # 余票查询逐条推送结果到界面
+                self.leftover_found = 0
+                script_kwargs['on_result'] = self.append_leftover_timeslot
+            result = script_main(**script_kwargs)
             
             # 处理返回结果
+            payload = None
             if isinstance(result, tuple):
-                exit_code, message = result
+                exit_code, message, *rest = result
+                payload = rest[0] if rest else None
             else:
                 # 兼容旧版本返回值格式
                 exit_code = result
@@ -788,7 +813,7 @@ class App:
             elif mode == 3:  # 如果是余票查询模式
                 if exit_code == 0:
                     # 只有查询成功时才显示结果
-                    self.display_leftover_timeslots()
+                    self.display_leftover_timeslots(payload)
                 else:
                     # 查询失败时直接显示详细错误信息
                     self.leftover_textbox.delete(1.0, tk.END)
@@ -834,6 +859,7 @@ class App:
         
         # 点击链接打开网页
         def open_link(event):
+            import webbrowser
             webbrowser.open_new("https://github.com/Kingvonlikecoding/gym-ticket-autobuy")
         
         # 绑定点击事件
@@ -849,26 +875,19 @@ class App:
         # 运行查询脚本
         self.run_script(3)
     
-    def display_leftover_timeslots(self):
+    def append_leftover_timeslot(self, timeslot):
+        """查询过程中每找到一个有票时间段就立即显示"""
+        if self.leftover_found == 0:
+            self.leftover_textbox.delete(1.0, tk.END)
+            self.leftover_textbox.insert(tk.END, "当日有票的时间段：\n")
+        self.leftover_found += 1
+        self.leftover_textbox.insert(tk.END, f"{self.leftover_found}. {timeslot}\n")
+        self.leftover_textbox.update()
+
+    def display_leftover_timeslots(self, leftover_timeslots):
         """显示查询到的有票时间段"""
-        # 确保config目录存在
-        config_dir = os.path.join(os.path.dirname(__file__), 'config')
-        if not os.path.exists(config_dir):
-            os.makedirs(config_dir)
-        result_file = os.path.join(config_dir, 'leftover_result.json')
-        
         try:
-            # 检查文件是否存在
-            if not os.path.exists(result_file):
-                self.leftover_textbox.delete(1.0, tk.END)
-                self.leftover_textbox.insert(tk.END, "查询失败：未找到结果文件")
-                return
-            
-            # 读取结果
-            with open(result_file, 'r', encoding='utf-8') as f:
-                leftover_timeslots = json.load(f)
-            
-            # 显示结果
+            # 结果已在查询过程中逐条显示，这里只补充完整列表或无票提示
             self.leftover_textbox.delete(1.0, tk.END)
             
             if leftover_timeslots is None or not leftover_timeslots:
@@ -882,13 +901,6 @@ class App:
             logger.error(f"failed to display leftover timeslots: {str(e)}")
             self.leftover_textbox.delete(1.0, tk.END)
             self.leftover_textbox.insert(tk.END, f"查询失败：{str(e)}")
-        finally:
-            # 清理临时文件
-            if os.path.exists(result_file):
-                try:
-                    os.remove(result_file)
-                except:
-                    pass
 
 def launch_app(config_path=None):
     """启动应用"""
@@ -3,27 +3,39 @@ from playwright.sync_api import Page, expect
 import json
 import os
 import sys
+from urllib.parse import urlparse
 
 # 直接使用utils.logger，它会自动检测测试环境
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# 预约系统地址，设置 GYM_BASE_URL 可指向本地模拟站点（见 bench/mock_server.py）
+BASE_URL = os.getenv('GYM_BASE_URL', 'https://ehall.szu.edu.cn').rstrip('/')
+VENUE_URL = BASE_URL + '/qljfwapp/sys/lwSzuCgyy/index.do#/sportVenue'
+
+
+def booking_host():
+    """登录后实际访问的预约系统主机（在调用时读取，基准测试会把 VENUE_URL 指向模拟站点）"""
+    return urlparse(VENUE_URL).netloc
+
 class LoginPage:
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, account: str = None):
         self.page = page
         self.username_input = page.locator("//section//input[@id='username']")
         self.password_input = page.locator("//section//input[@id='password']")
         self.remember_me_checkbox = page.locator('//div[@class="container-ge"]//input[@type="checkbox"]')
         self.login_button = page.locator("//section//a[@id='login_submit']")
         self.yuehai_button = page.locator("div.bh-btn-primary:has-text('粤海校区')")
-        self.cookie_file = os.path.join('config', 'cookies.json')
-        self.storage_file = os.path.join('config', 'storage.json')
+        # 多账号同时运行时（如任务队列）按账号分开保存登录态
+        suffix = f"_{account}" if account else ''
+        self.cookie_file = os.path.join('config', f'cookies{suffix}.json')
+        self.storage_file = os.path.join('config', f'storage{suffix}.json')
 
     def navigate(self):
         """导航到登录页面"""
         try:
-            self.page.goto("https://ehall.szu.edu.cn/qljfwapp/sys/lwSzuCgyy/index.do#/sportVenue")
+            self.page.goto(VENUE_URL)
         except:
             logger.error("Failed to navigate to the login page.")
             raise Exception("Failed to navigate to the login page.")
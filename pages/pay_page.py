@@ -1,13 +1,44 @@
-from playwright.sync_api import Page
+from playwright.sync_api import Page, TimeoutError
 
 # 直接使用utils.logger，它会自动检测测试环境
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# 一次读出数字键盘布局：数字 -> 按键中心坐标（键盘可能每次打乱顺序，所以每次都重新读）
+_KEYPAD_LAYOUT_JS = '''() => {
+    const layout = {};
+    for (let digit = 0; digit <= 9; digit++) {
+        const key = document.querySelector('.key-' + digit);
+        if (!key) continue;
+        const rect = key.getBoundingClientRect();
+        // 只缓存完整显示在视口内的按键，否则退回逐个点击（会自动滚动）
+        if (rect.width && rect.height && rect.top >= 0 && rect.left >= 0
+                && rect.bottom <= window.innerHeight && rect.right <= window.innerWidth) {
+            layout[digit] = [rect.left + rect.width / 2, rect.top + rect.height / 2];
+        }
+    }
+    return layout;
+}'''
+
+# 在页面内一次性派发整串按键的点击事件（非可信事件，需要键盘接受）
+_KEYPAD_BATCH_JS = '''(password) => {
+    for (const digit of password) {
+        const key = document.querySelector('.key-' + digit);
+        for (const type of ['pointerdown', 'mousedown', 'pointerup', 'mouseup']) {
+            key.dispatchEvent(new PointerEvent(type, {bubbles: true, cancelable: true}));
+        }
+        key.click();
+    }
+}'''
+
+
 class PayPage:
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, keypad_input: str = 'mouse', result_timeout_seconds: float = 10):
         self.page = page
+        # 密码键盘输入方式：mouse 按缓存的坐标发送可信的鼠标事件；js 在页面内一次性派发所有按键
+        self.keypad_input = keypad_input
+        self.result_timeout_seconds = result_timeout_seconds
 
     def pay_with_sports_fund(self):
         """使用体育经费支付，并切换到新标签页"""
@@ -22,18 +53,71 @@ class PayPage:
         self.page.click("button:has-text('下一步')")
         return self
 
+    def _type_on_keypad(self, password: str) -> bool:
+        """按一次读出的键盘布局输入密码，读不到完整布局时返回 False"""
+        layout = self.page.evaluate(_KEYPAD_LAYOUT_JS)
+        if any(digit not in layout for digit in password):
+            return False
+        if self.keypad_input == 'js':
+            self.page.evaluate(_KEYPAD_BATCH_JS, password)
+        else:
+            for digit in password:
+                x, y = layout[digit]
+                self.page.mouse.click(x, y)
+        return True
+
+    def _click_keys(self, password: str):
+        """逐个定位并点击按键（较慢，键盘布局读取失败时使用）"""
+        for digit in password:
+            self.page.locator(f".key-{digit}").click()
+
+    def _wait_result(self, response) -> bool:
+        """根据确认支付后的响应（或跳转）和页面结果判断是否支付成功"""
+        if response is not None and not response.ok:
+            return False
+        if response is not None and response.request.resource_type != 'document':
+            try:
+                data = response.json()
+                if isinstance(data, dict) and (data.get('ok') is False or data.get('success') is False):
+                    return False
+            except Exception:
+                pass
+        # 等待结果出现，而不是立刻检查一次；成功页也有“返回”“返回首页”链接，只按结果文字判断
+        succeeded = self.page.get_by_text('支付成功').first
+        failed = self.page.get_by_text('支付失败').first
+        try:
+            succeeded.or_(failed).first.wait_for(state='visible', timeout=self.result_timeout_seconds * 1000)
+        except TimeoutError:
+            # 没有结果页面时无法确认已支付，按未支付处理（订单仍可在“未支付”列表中支付）
+            logger.warning("no payment result page observed")
+            return False
+        return succeeded.is_visible() and not failed.is_visible()
+
     def enter_password(self, password: str):
-        """输入支付密码"""
+        """输入支付密码
+
+        一次读取键盘布局后批量输入，确认支付后通过响应/跳转事件判断结果。
+        """
         self.page.wait_for_selector("input#password", timeout=10000)
         self.page.click("input#password")
 
-        for digit in password:
-            self.page.locator(f".key-{digit}").click()
-        
-        self.page.locator(".next-button-max").click()
+        if not self._type_on_keypad(password):
+            logger.info("keypad layout unavailable, clicking keys one by one")
+            self._click_keys(password)
+
+        response = None
+        try:
+            # 确认支付后的第一个 POST 响应（接口请求或表单提交后的跳转）
+            with self.page.expect_response(lambda r: r.request.method == 'POST',
+                                           timeout=self.result_timeout_seconds * 1000) as response_info:
+                self.page.locator(".next-button-max").click()
+            response = response_info.value
+        except TimeoutError:
+            logger.warning("no payment response observed, checking the page")
 
-        if self.page.locator("text=返回").is_visible():
+        if not self._wait_result(response):
             logger.error("pay failed  支付失败")
             return False
 
         logger.info("pay success  支付成功")
+        return True
@@ -0,0 +1,178 @@
+import time
+from typing import Any, Iterable, Optional
+from urllib.parse import urljoin, urlparse
+
+from playwright.sync_api import Error, Page, Response, TimeoutError
+
+from pages.pay_page import PayPage
+# 直接使用utils.logger，它会自动检测测试环境
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+# 提交预约响应中可能保存订单号的字段
+ORDER_ID_KEYS = ('orderId', 'order_id', 'orderNo', 'order_no')
+
+
+def find_order_id(data: Any, keys: Iterable[str] = ORDER_ID_KEYS) -> Optional[str]:
+    """在提交预约接口返回的JSON中递归查找订单号"""
+    if isinstance(data, dict):
+        for key in keys:
+            if data.get(key) not in (None, ''):
+                return str(data[key])
+        data = list(data.values())
+    if isinstance(data, list):
+        for item in data:
+            found = find_order_id(item, keys)
+            if found:
+                return found
+    return None
+
+
+class PaymentFlow:
+    """提交预约之后的支付流程状态机
+
+    状态：submitted -> (direct | ui -> orders -> unpaid_list -> (balance | fund_popup)) -> pin -> done / failed
+
+    配置了支付页地址模板 ``pay_url``（如 ``/pay.html?order={order_id}``）且能从提交预约的
+    响应中取到订单号时，直接为该订单打开支付页（direct），不经过“未支付”列表；
+    失败时退回界面流程（ui）。配置了订单页地址 ``orders_url``（如 ``#/orders``）时，界面流程
+    提交后直接打开订单页，不等待SPA自己跳转。点击“未支付”后等待的是未支付订单列表接口
+    ``orders_api_path``（如 ``/api/orders``）的响应；未配置时取同一站点路径中含 order 的接口。
+
+    每一步都由事件推进：提交预约的响应、“未支付”列表接口的响应、支付弹窗的打开，
+    而不是每步固定等待 10 秒的选择器。整个流程共用一个截止时间 ``timeout_seconds``。
+    支付弹窗在创建时就交给下一步处理，不等待它的 load 事件。
+    """
+
+    def __init__(self, page: Page, pay_password: str, keypad_input: str = 'mouse', timeout_seconds: float = 30,
+                 pay_url: Optional[str] = None, orders_url: Optional[str] = None,
+                 orders_api_path: Optional[str] = None):
+        self.page = page
+        self.pay_url = pay_url
+        self.orders_url = orders_url
+        self.orders_api_path = orders_api_path
+        self.order_id: Optional[str] = None
+        self.pay_password = pay_password
+        self.keypad_input = keypad_input
+        self.timeout_seconds = timeout_seconds
+        self.booking_response: Response = None
+        self.popup: Page = None
+        self.state = 'submitted'
+        self.transitions = []
+        self._deadline = None
+
+    def _remaining_ms(self) -> float:
+        return max(self._deadline - time.monotonic(), 0.1) * 1000
+
+    def run(self, booking_response: Response = None) -> bool:
+        """从提交预约之后运行到支付完成，返回是否支付成功"""
+        if booking_response is not None:
+            self.booking_response = booking_response
+        self._deadline = time.monotonic() + self.timeout_seconds
+        started = time.perf_counter()
+        while self.state not in ('done', 'failed'):
+            previous = self.state
+            try:
+                self.state = getattr(self, f'_on_{self.state}')()
+            except TimeoutError as e:
+                logger.error(f"Payment timed out in state {previous}: {str(e)}")
+                self.state = 'failed'
+            self.transitions.append((previous, self.state, time.perf_counter() - started))
+            logger.info(f"payment: {previous} -> {self.state} ({time.perf_counter() - started:.3f}s)")
+        return self.state == 'done'
+
+    def _on_submitted(self):
+        if self.booking_response is None:
+            return 'ui'
+        if not self.booking_response.ok:
+            logger.error(f"Booking was rejected with status {self.booking_response.status}")
+            return 'failed'
+        try:
+            self.order_id = find_order_id(self.booking_response.json())
+        except Exception:
+            self.order_id = None
+        if self.order_id:
+            logger.info(f"Booking created order {self.order_id}")
+        return 'direct' if self.order_id and self.pay_url else 'ui'
+
+    def _on_direct(self):
+        url = urljoin(self.page.url, self.pay_url.format(order_id=self.order_id))
+        page = self.page.context.new_page()
+        try:
+            page.goto(url, wait_until='commit', timeout=self._remaining_ms())
+            next_step = page.locator("button:has-text('下一步')")
+            next_step.wait_for(state='visible', timeout=min(self._remaining_ms(), 10000))
+            next_step.click()
+        except (TimeoutError, Error) as e:
+            logger.warning(f"Direct payment of order {self.order_id} failed, falling back to the UI: {str(e)}")
+            page.close()
+            return 'ui'
+        self.popup = page
+        return 'pin'
+
+    def _on_ui(self):
+        if self.orders_url:
+            url = urljoin(self.page.url, self.orders_url)
+            if self.page.url != url:
+                self.page.goto(url, wait_until='commit', timeout=self._remaining_ms())
+        # 提交后SPA跳转到订单页（或已直接打开），“未支付”标签一出现就进入
+        self.page.locator("a:has-text('未支付')").wait_for(state='visible', timeout=self._remaining_ms())
+        return 'orders'
+
+    def _is_orders_response(self, response: Response) -> bool:
+        """是否为未支付订单列表接口的响应（排除页面上的其他后台请求）"""
+        if response.request.resource_type not in ('xhr', 'fetch'):
+            return False
+        path = urlparse(response.url).path
+        if self.orders_api_path:
+            return path == urlparse(urljoin(self.page.url, self.orders_api_path)).path
+        return urlparse(response.url).netloc == urlparse(self.page.url).netloc and 'order' in path.lower()
+
+    def _on_orders(self):
+        # 点击后等待未支付订单列表接口返回，而不是轮询按钮
+        try:
+            with self.page.expect_response(self._is_orders_response, timeout=self._remaining_ms()):
+                self.page.click("a:has-text('未支付')")
+        except TimeoutError:
+            logger.warning("no unpaid-order response observed, waiting for the list")
+        return 'unpaid_list'
+
+    def _on_unpaid_list(self):
+        self.page.locator("button:has-text(')支付')").first.wait_for(state='visible', timeout=self._remaining_ms())
+        # 一次统计可见的支付按钮，不逐个调用 is_visible
+        visible = self.page.evaluate('''() => [...document.querySelectorAll('button')]
+            .filter(b => b.textContent.includes(')支付') && b.offsetParent !== null).length''')
+        if visible == 1:
+            return 'balance'
+        return 'fund_popup'
+
+    def _on_balance(self):
+        try:
+            with self.page.expect_response(lambda r: r.request.method == 'POST', timeout=self._remaining_ms()) as info:
+                self.page.click("button:has-text('(剩余金额)支付')")
+        except TimeoutError:
+            # 没有观察到支付请求时与原流程一样，点击即视为成功
+            logger.warning("no balance payment response observed")
+            logger.info("buy ticket success!!! 买票成功 !!!")
+            return 'done'
+        if not info.value.ok:
+            logger.error(f"Balance payment failed with status {info.value.status}")
+            return 'failed'
+        logger.info("buy ticket success!!! 买票成功 !!!")
+        return 'done'
+
+    def _on_fund_popup(self):
+        with self.page.expect_popup(timeout=self._remaining_ms()) as popup_info:
+            self.page.click("button:has-text('(体育经费)支付')")
+        self.popup = popup_info.value
+        next_step = self.popup.locator("button:has-text('下一步')")
+        next_step.wait_for(state='visible', timeout=self._remaining_ms())
+        next_step.click()
+        return 'pin'
+
+    def _on_pin(self):
+        pay_page = PayPage(self.popup, keypad_input=self.keypad_input,
+                           result_timeout_seconds=self._remaining_ms() / 1000)
+        return 'done' if pay_page.enter_password(self.pay_password) else 'failed'
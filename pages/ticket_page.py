@@ -1,27 +1,368 @@
 from playwright.sync_api import Page, TimeoutError
+import os
 import random
-from datetime import date, timedelta
-from pages.pay_page import PayPage
+import time
+from datetime import date, datetime, timedelta
+from urllib.parse import urldefrag, urljoin, urlparse
+from pages.login_page import booking_host
+from pages.payment_flow import PaymentFlow
+from utils.action_macro import MacroDrift, MacroPlayer, MacroRecording, MacroStore
+from utils.json_file import read_json, update_json
+from utils.rate_governor import shared_governor
+from utils.release_predictor import ReleasePredictor
+from utils.run_history import timed_stage
+from utils.server_clock import shared_server_clock
+from utils.slots import SlotWindow, slots_from_json, wait_for_slots
+from utils.strategy_racer import DETECTORS, BookingGuard, StrategyRacer
 
 # 直接使用utils.logger，它会自动检测测试环境
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+
+def resolve_date(da_te: str, today: date = None) -> str:
+    """将日期设置转换为 YYYY-MM-DD
+
+    支持 today、tomorrow、+N（N 天后）和 YYYY-MM-DD。
+    """
+    today = today or date.today()
+    da_te = str(da_te).strip()
+    if da_te == 'today':
+        return today.strftime("%Y-%m-%d")
+    if da_te == 'tomorrow':
+        return (today + timedelta(days=1)).strftime("%Y-%m-%d")
+    if da_te.startswith('+') and da_te[1:].isdigit():
+        return (today + timedelta(days=int(da_te[1:]))).strftime("%Y-%m-%d")
+    try:
+        return datetime.strptime(da_te, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"Unsupported date: {da_te}, it should be today, tomorrow, +N or YYYY-MM-DD")
+
 class TicketPage:
-    def __init__(self, page: Page):
+    # 等待放票时的刷新策略
+    STRATEGIES = ('reload', 'soft', 'network', 'http', 'race')
+
+    def __init__(self, page: Page, recorder=None, nav_mode: str = 'deeplink',
+                 strategy: str = 'reload', slots_api_url: str = None, instrumentation=None, prewarmer=None,
+                 governor=None, keypad_input: str = 'mouse', payment_timeout_seconds: float = 30,
+                 pay_url: str = None, race_detectors=DETECTORS, macro_mode: str = 'off', server_clock=None,
+                 booking_api_path: str = None, submit_timeout_seconds: float = 5, orders_url: str = None,
+                 orders_api_path: str = None):
         self.page = page
+        # 可选的 RunRecorder，记录各阶段耗时、重试次数和首次看到可预约的时间
+        self.recorder = recorder
+        # 可选的 RunInstrumentation，只在 select_date 到 submit_booking 之间录制 trace
+        self.instrumentation = instrumentation
+        # 可选的 Prewarmer，放票前保持到预约系统的连接处于打开状态
+        self.prewarmer = prewarmer
+        # 进程内共享的 RateGovernor，所有轮询（重试、余票查询、监视）都先向它申请
+        self.governor = governor or shared_governor()
+        self.governor.watch(page)
+        # 进程内共享的 ServerClock，从响应的 Date 头估计服务器时钟，记录首次看到可预约的服务器时间
+        self.server_clock = server_clock or shared_server_clock(booking_host())
+        self.server_clock.watch(page)
+        # 支付密码键盘的输入方式，见 PayPage
+        self.keypad_input = keypad_input
+        # 提交预约之后整个支付流程的截止时间
+        self.payment_timeout_seconds = payment_timeout_seconds
+        # 支付页地址模板，如 /pay.html?order={order_id}，配置后从提交响应中取订单号直接支付
+        self.pay_url = pay_url
+        # 提交预约接口的路径，如 /api/book；未配置时取页面所在站点的第一个 POST 接口请求
+        self.booking_api_path = booking_api_path
+        # 等待提交预约响应的时间，与支付流程的截止时间分开
+        self.submit_timeout_seconds = submit_timeout_seconds
+        # 订单页地址，如 #/orders，配置后提交预约后直接打开，不等待SPA跳转
+        self.orders_url = orders_url
+        # 未支付订单列表接口的路径，如 /api/orders
+        self.orders_api_path = orders_api_path
+        self.booking_response = None
+        self._submitted_at = None
+        # 同一目标只提交一次预约，被服务器拒绝后才允许再次提交
+        self.booking_guard = BookingGuard()
+        self._target = None
+        # 实际选中的时间段（按时间窗口选择时与配置的 time_slot 不同）
+        self.selected_slot = None
+        # 导航模式：deeplink 通过记录的SPA路由一次跳转进入场馆/日期视图，click 每次都逐级点击
+        self.nav_mode = nav_mode
+        # 刷新策略：reload 整页刷新；soft 重新点击日期让SPA重新拉取数据；
+        # network 同 soft 但以时间段接口的响应为准；http 直接请求时间段接口，有票时才刷新页面；
+        # race 同时运行页面、网络响应和接口轮询三种检测，谁先看到有票就由谁触发预约
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unsupported strategy: {strategy}, it should be one of {list(self.STRATEGIES)}")
+        self.strategy = strategy
+        # 时间段接口地址模板，如 /api/slots?venue={venue}&date={date}，network/http 策略需要
+        self.slots_api_url = slots_api_url
+        self.racer = StrategyRacer(self, race_detectors) if strategy == 'race' else None
+        # 宏模式：off 不使用；on 有录制好的宏就回放，没有就在这次成功后录制；record 总是重新录制
+        if macro_mode not in ('off', 'on', 'record'):
+            raise ValueError(f"Unsupported macro_mode: {macro_mode}, it should be one of ['off', 'on', 'record']")
+        self.macro_mode = macro_mode
+        self.macros = MacroStore() if macro_mode != 'off' else None
+        self.deeplink_file = os.path.join('config', 'deeplinks.json')
+        self.deeplinks = self.load_deeplinks() if nav_mode == 'deeplink' else {}
+        self._landing_url = None
+        self._venue_url = None
         self.venue_images = {
             'A': '6cf6b63b970a4f4b87193d799d8092c7',  # 健身房
             'B': '317a6df934914473b49996840b305987',  # 羽毛球
             'C': 'eaaf3fd0bf624a328966f987fcd0ac52'   # 篮球
         }
 
+    @classmethod
+    def from_config(cls, page: Page, cfg: dict, recorder=None, instrumentation=None, prewarmer=None):
+        """按配置文件创建 TicketPage"""
+        governor = shared_governor(cfg)
+        # 只用预约系统的 Date 头估计服务器时钟，统一认证等其他主机的时钟不一定一致
+        server_clock = shared_server_clock(booking_host())
+        if recorder:
+            if server_clock.offset is None:
+                server_clock.sample(page)
+            before = float(cfg.get('release_window_before', 10))
+            after = float(cfg.get('release_window_after', 60))
+            if cfg.get('release_predict', True):
+                # 按历史上各场馆/星期实际看到可预约的时间设置高频刷新窗口
+                weekday = datetime.fromtimestamp(recorder.release_at).weekday()
+                window = ReleasePredictor.from_history().burst_window(
+                    cfg.get('venue', ''), weekday, margin=float(cfg.get('release_window_margin', 5)))
+                if window:
+                    before, after = window
+                    logger.info(f"Predicted release window: {-before:+.1f}s .. {after:+.1f}s")
+            # 放票时间是服务器时钟上的时间，换算成本机时间
+            governor.add_release_window(recorder.release_at - (server_clock.offset or 0.0), before=before, after=after)
+        return cls(
+            page,
+            recorder=recorder,
+            instrumentation=instrumentation,
+            prewarmer=prewarmer,
+            governor=governor,
+            server_clock=server_clock,
+            keypad_input=cfg.get('keypad_input', 'mouse'),
+            payment_timeout_seconds=float(cfg.get('payment_timeout_seconds', 30)),
+            pay_url=cfg.get('pay_url'),
+            booking_api_path=cfg.get('booking_api_path'),
+            submit_timeout_seconds=float(cfg.get('submit_timeout_seconds', 5)),
+            orders_url=cfg.get('orders_url'),
+            orders_api_path=cfg.get('orders_api_path'),
+            nav_mode=cfg.get('nav_mode', 'deeplink'),
+            strategy=cfg.get('strategy', 'reload'),
+            slots_api_url=cfg.get('slots_api_url'),
+            race_detectors=cfg.get('race_detectors') or DETECTORS,
+            macro_mode=cfg.get('macro_mode', 'off'),
+        )
+
+    def _add_retry(self):
+        if self.recorder:
+            self.recorder.add_retry()
+
+    def _mark_available(self):
+        if self.recorder and self.recorder.first_available_at is None:
+            self.recorder.mark_available(server_offset=self.server_clock.offset)
+            offset = self.recorder.first_available_server_offset
+            if offset is not None:
+                logger.info(f"First available at server time "
+                            f"{datetime.fromtimestamp(self.server_clock.now()).strftime('%H:%M:%S.%f')[:-3]} "
+                            f"({offset:+.3f}s vs release, clock ±{self.server_clock.uncertainty:.3f}s)")
+
+    def load_deeplinks(self):
+        """从文件加载之前记录的场馆/日期深链接"""
+        return read_json(self.deeplink_file)
+
+    def save_deeplink(self, venue_type: str, da_te: str):
+        """记录进入日期视图后的SPA路由和sessionStorage，供之后一次跳转直达
+
+        若日期出现在路由中，则保存为带 {date} 占位符的模板，可直接打开日期视图；
+        否则只保存场馆视图的路由，之后仍需点击一次日期。
+        """
+        if self.nav_mode != 'deeplink' or not self._venue_url:
+            return
+        # 路由没有随场馆变化时无法深链接，只能逐级点击
+        if self._landing_url and urldefrag(self._venue_url).fragment == urldefrag(self._landing_url).fragment:
+            return
+        date_url = self.page.url
+        session_storage = self.page.evaluate('''() => {
+            const data = {};
+            for (let i = 0; i < sessionStorage.length; i++) {
+                const key = sessionStorage.key(i);
+                data[key] = sessionStorage.getItem(key);
+            }
+            return data;
+        }''')
+        entry = {
+            'venue_url': self._venue_url,
+            'date_url': date_url.replace(da_te, '{date}') if da_te in date_url else None,
+            'session_storage': session_storage,
+        }
+        if self.deeplinks.get(venue_type) == entry:
+            return
+        self.deeplinks[venue_type] = entry
+        try:
+            # 重新读取文件后只改动这一个场馆，保留其他页面/任务同时记录的深链接
+            self.deeplinks = update_json(self.deeplink_file, lambda links: links.__setitem__(venue_type, entry))
+            logger.info(f"Saved deeplink for venue {venue_type}: {entry['date_url'] or entry['venue_url']}")
+        except OSError as e:
+            logger.warning(f"Failed to save deeplink: {str(e)}")
+
+    def open_deeplink(self, venue_type: str, da_te: str):
+        """通过深链接一次跳转进入场馆或日期视图
+
+        Returns:
+            str | None: 'date' 已进入日期视图，'venue' 已进入场馆视图（仍需选择日期），
+            None 表示没有可用的深链接或SPA没有接受该路由，调用方需要逐级点击
+        """
+        link = self.deeplinks.get(venue_type) if self.nav_mode == 'deeplink' else None
+        if not link:
+            return None
+        state = 'date' if link.get('date_url') else 'venue'
+        url = link['date_url'].replace('{date}', da_te) if state == 'date' else link['venue_url']
+        try:
+            # SPA 可能从 sessionStorage 恢复选中的场馆/日期，先写回再跳转
+            if link.get('session_storage'):
+                self.page.evaluate('''(storage) => {
+                    for (const [key, value] of Object.entries(storage)) {
+                        sessionStorage.setItem(key, value);
+                    }
+                }''', link['session_storage'])
+            if self.page.url == url:
+                # 已在该路由上时 goto 只是同一文档内的锚点跳转，SPA 不会重新拉取数据，改为整页刷新
+                self.page.reload(wait_until='load')
+            else:
+                self.page.goto(url, wait_until='load')
+        except Exception as e:
+            logger.warning(f"Failed to open deeplink {url}: {str(e)}")
+            return None
+
+        # SPA 不认识该路由时会跳回首页，此时丢弃该深链接，回退到逐级点击
+        if urldefrag(self.page.url).fragment.split('?')[0] != urldefrag(url).fragment.split('?')[0]:
+            logger.warning(f"Deeplink for venue {venue_type} was redirected to {self.page.url}, falling back to clicks")
+            self.deeplinks.pop(venue_type, None)
+            return None
+        return state
+
+    def _resolve_date(self, da_te: str):
+        """将 today/tomorrow/+N/YYYY-MM-DD 转换为 YYYY-MM-DD"""
+        return resolve_date(da_te)
+
+    def _reload_venue_view(self, venue_type: str, da_te: str):
+        """重新进入场馆视图，优先使用深链接
+
+        Returns:
+            str: 'date' 表示已直接进入日期视图，'venue' 表示还需要选择日期
+        """
+        state = self.open_deeplink(venue_type, da_te)
+        if state:
+            return state
+        self.page.reload()
+        self.page.wait_for_load_state('networkidle')
+        self.page.wait_for_load_state('domcontentloaded')
+        self.page.wait_for_load_state('load')
+        self.select_campus()
+        self.select_venue(venue_type)
+        return 'venue'
+
+    @timed_stage('open_date_view')
+    def open_date_view(self, da_te: str, venue_type: str, wait_timeout_seconds: float):
+        """进入指定场馆和日期的时间段视图，能用深链接时跳过校区/场馆/日期的逐级点击"""
+        day = self._resolve_date(da_te)
+        state = self.open_deeplink(venue_type, day)
+        if state == 'date':
+            try:
+                self.page.locator(f"//label/div[contains(.,'{day}')]").first.wait_for(
+                    state='visible', timeout=wait_timeout_seconds * 1000)
+                logger.info(f"Opened date view of venue {venue_type} via deeplink")
+                return self
+            except TimeoutError:
+                logger.info(f"Date view of venue {venue_type} did not render from deeplink, selecting date")
+        if state:
+            # 已在场馆视图（或日期视图没有按时渲染），只差选择日期
+            return self.select_date(da_te, venue_type, wait_timeout_seconds)
+        return self.run_segment(f"open/{venue_type}", [
+            ('select_campus', self.select_campus),
+            ('select_venue', lambda: self.select_venue(venue_type)),
+            ('select_date', lambda: self.select_date(da_te, venue_type, wait_timeout_seconds)),
+        ], {'date': self._resolve_date(da_te)}, wait_timeout_seconds)
+
+    def book(self, cfg: dict):
+        """按配置完成进入日期视图、抢时间段、选场地、提交和支付的完整流程"""
+        wait_timeout_seconds = float(cfg['wait_timeout_seconds'])
+        venue_type, court = cfg['venue'], cfg.get('court')
+        # 使用括号 ( ... ) 可以让整个表达式自动支持换行
+        return (self
+            .open_date_view(cfg['date'], venue_type, wait_timeout_seconds=wait_timeout_seconds)
+            .select_time_slot_loop(cfg.get('time_slot'), cfg['date'], venue_type,
+                                   wait_timeout_seconds=wait_timeout_seconds,
+                                   max_attempts=int(cfg.get('max_attempts', 100)),
+                                   window=SlotWindow.from_config(cfg))
+            .run_segment(f"book/{venue_type}/{self.selected_slot}/{court or '-'}", [
+                ('select_specific_venue', lambda: self.select_specific_venue(venue_type, court)),
+                ('submit_booking', self.submit_booking),
+            ], {'date': self._resolve_date(cfg['date']), 'time_slot': self.selected_slot}, wait_timeout_seconds,
+                save_if=lambda: self.booking_response is not None and self.booking_response.ok)
+            .make_payment(cfg['pay_pass'])
+        )
+
+    def run_segment(self, key: str, stages, values: dict, wait_timeout_seconds: float, save_if=None):
+        """执行一段页面对象操作，开启宏模式时录制或回放
+
+        回放时每一步先在页面内校验路由、元素和文本，再按坐标点击；某一步偏离录制时的状态，
+        就丢弃该宏，从这一步所属的阶段开始改用页面对象完成。
+
+        Args:
+            key: 宏的键，如 book/C/18:00-19:00/-
+            stages: [(阶段名, 执行该阶段的页面对象方法)]，按顺序执行
+            values: 录制成占位符、回放时填入的目标文本，如 {'date': '2024-01-01'}
+            save_if: 可选，判断这次是否成功、值得保存为宏
+        """
+        steps = self.macros.get(key) if self.macro_mode == 'on' else None
+        recording = None
+        if steps:
+            resume = self._replay_macro(key, steps, values, wait_timeout_seconds)
+            if resume is None:
+                return self
+            stages = stages[[name for name, _ in stages].index(resume):]
+        elif self.macros:
+            recording = MacroRecording(self.page, values)
+            recording.start()
+        for name, run in stages:
+            if recording:
+                recording.mark(name)
+            run()
+        if recording and (save_if is None or save_if()):
+            recorded = recording.stop()
+            if recorded:
+                self.macros.put(key, recorded)
+                logger.info(f"Recorded macro {key} ({len(recorded)} steps)")
+        return self
+
+    def _replay_macro(self, key: str, steps, values: dict, wait_timeout_seconds: float):
+        """回放宏，全部完成返回 None，偏离时返回需要用页面对象重新执行的阶段名"""
+        player = MacroPlayer(self.page, values, timeout_seconds=wait_timeout_seconds)
+        started = time.perf_counter()
+        for step in steps:
+            try:
+                x, y = player.locate(step)
+            except MacroDrift as e:
+                logger.warning(f"Macro {key} drifted at {step['stage']}: {str(e)}, falling back to page objects")
+                self.macros.discard(key)
+                return step['stage']
+            if step['stage'] == 'submit_booking':
+                self._submit(lambda: self.page.mouse.click(x, y))
+            else:
+                player.click(step, x, y)
+        elapsed = time.perf_counter() - started
+        logger.info(f"Replayed macro {key} in {elapsed:.3f}s")
+        if self.recorder:
+            self.recorder.stages[f"macro_{key.split('/')[0]}"] = elapsed
+        return None
+
+    @timed_stage('select_campus')
     def select_campus(self):
         """选择粤海校区"""
+        self._landing_url = self.page.url
         self.page.click("div.bh-btn-primary:has-text('粤海校区')")
         return self
 
+    @timed_stage('select_venue')
     def select_venue(self, venue_type: str):
         """选择场馆"""
         image_id = self.venue_images.get(venue_type)
@@ -31,34 +372,31 @@ class TicketPage:
         
         self.page.wait_for_selector(f"img.union-2[src*='{image_id}']", timeout=10000)
         self.page.click(f"img.union-2[src*='{image_id}']")
+        self._venue_url = self.page.url
         return self
 
+    @timed_stage('select_date')
     def select_date(self, da_te: str, venue_type: str, wait_timeout_seconds: float, max_attempts=100):
-        """选择日期（今天或明天）"""
-        today = date.today().strftime("%Y-%m-%d")
-        tomorrow = (date.today() + timedelta(days=1)).strftime("%Y-%m-%d")
-        if da_te=='today':
-            da_te = today
-        elif da_te=='tomorrow':
-            da_te = tomorrow
-        else:
-            da_te = dajiba
+        """选择日期（today、tomorrow、+N 或 YYYY-MM-DD）"""
+        if self.instrumentation:
+            self.instrumentation.start_hot_section('select_date -> submit_booking')
+        da_te = self._resolve_date(da_te)
         target_selector = f"//label/div[contains(.,'{da_te}')]"
         logger.info(f"Selecting date: {da_te}")
 
+        state = None
         for attempt in range(max_attempts):
             if attempt > 0:
-                self.page.reload()
-                self.page.wait_for_load_state('networkidle')
-                self.page.wait_for_load_state('domcontentloaded')
-                self.page.wait_for_load_state('load')
-                self.select_campus()
-                self.select_venue(venue_type)
+                state = self._reload_venue_view(venue_type, da_te)
 
             try:
                 date_locator = self.page.locator(target_selector)
                 date_locator.wait_for(state='visible', timeout=wait_timeout_seconds * 1000)
+                if state == 'date':
+                    # 深链接直接打开了该日期的视图，日期出现说明视图已渲染，无需再点击
+                    return self
                 date_locator.click()
+                self.save_deeplink(venue_type, da_te)
                 return self
             except TimeoutError:
                 if attempt >= max_attempts - 1:
@@ -66,6 +404,7 @@ class TicketPage:
                     raise RuntimeError(f"Failed to find and click date '{da_te}' after {max_attempts} attempts.")
                 else: 
                     logger.info(f"Failed to find date '{da_te}' , retrying...")
+                    self._add_retry()
         return self
 
     def select_time_slot(self, time_slot: str):
@@ -76,45 +415,192 @@ class TicketPage:
             logger.error(f"Failed to select time slot: {time_slot}")
         return self
 
-    def select_time_slot_loop(self, time_slot: str, da_te: str, venue_type: str, wait_timeout_seconds: float):
-        """选择时间段（循环尝试）"""
-        max_attempts = 100
+    def _slots_api(self, venue_type: str, day: str):
+        return urljoin(self.page.url, self.slots_api_url.format(venue=venue_type, date=day))
+
+    @staticmethod
+    def _slot_available(data, time_slot) -> bool:
+        """在时间段接口返回的JSON中查找目标时间段（或时间窗口内的任一时间段）是否可预约"""
+        if isinstance(time_slot, SlotWindow):
+            return time_slot.best(slots_from_json(data)) is not None
+        if isinstance(data, dict):
+            values = [v for v in data.values() if isinstance(v, str)]
+            if time_slot in values and any('可预约' in v for v in values):
+                return True
+            data = list(data.values())
+        if isinstance(data, list):
+            return any(TicketPage._slot_available(item, time_slot) for item in data)
+        return False
+
+    def query_slot_api(self, time_slot: str, venue_type: str, day: str) -> bool:
+        """直接请求时间段接口，判断目标时间段是否已可预约"""
+        started = time.perf_counter()
+        try:
+            response = self.page.request.get(self._slots_api(venue_type, day))
+        except Exception:
+            self.governor.observe(ok=False)
+            raise
+        self.governor.observe(status=response.status, latency=time.perf_counter() - started,
+                              retry_after=response.headers.get('retry-after'))
+        if not response.ok:
+            logger.info(f"Slots API returned {response.status}")
+            return False
+        try:
+            return self._slot_available(response.json(), time_slot)
+        except ValueError:
+            return False
+
+    def _refresh_slots(self, time_slot: str, da_te: str, venue_type: str, wait_timeout_seconds: float):
+        """重试前按刷新策略刷新时间段数据
+
+        Returns:
+            bool: False 表示直接请求接口得知目标仍不可预约，本轮无需检查页面
+        """
+        day = self._resolve_date(da_te)
+        date_label = self.page.locator(f"//label/div[contains(.,'{day}')]").first
+        if self.strategy == 'reload' or not date_label.is_visible():
+            if self._reload_venue_view(venue_type, day) == 'venue':
+                self.select_date(da_te, venue_type, wait_timeout_seconds)
+            return True
+
+        if self.strategy == 'http' and self.slots_api_url:
+            if not self.query_slot_api(time_slot, venue_type, day):
+                # 轮询间隔由 RateGovernor 控制
+                return False
+            self._mark_available()
+
+        if self.strategy == 'network' and self.slots_api_url:
+            api_path = urlparse(self._slots_api(venue_type, day)).path
+            with self.page.expect_response(lambda r: urlparse(r.url).path == api_path,
+                                           timeout=wait_timeout_seconds * 1000):
+                date_label.click()
+            return True
+
+        # 重新点击日期，SPA 重新拉取时间段，不重新加载整个页面
+        date_label.click()
+        return True
+
+    def refresh_date_view(self, da_te: str, venue_type: str, wait_timeout_seconds: float):
+        """重新拉取当前日期视图的时间段：能重新点击日期时不重新加载页面"""
+        self.governor.acquire()
+        day = self._resolve_date(da_te)
+        date_label = self.page.locator(f"//label/div[contains(.,'{day}')]").first
+        if date_label.is_visible():
+            date_label.click()
+        elif self._reload_venue_view(venue_type, day) == 'venue':
+            self.select_date(da_te, venue_type, wait_timeout_seconds)
+        return self
+
+    @timed_stage('select_time_slot')
+    def select_time_slot_loop(self, time_slot: str, da_te: str, venue_type: str, wait_timeout_seconds: float,
+                              max_attempts=100, window: SlotWindow = None):
+        """选择时间段（循环尝试）
+
+        给出 window 时不匹配固定的 time_slot，而是一次读出并解析所有时间段，
+        选择窗口内最合适的可预约时间段。
+        """
+        if self.instrumentation:
+            # 深链接直达日期视图时不会经过 select_date，在这里开始录制
+            self.instrumentation.start_hot_section('select_date -> submit_booking')
+        self._target = (venue_type, self._resolve_date(da_te), time_slot)
+        self.selected_slot = time_slot
+        if self.racer and window:
+            logger.warning("race strategy needs a fixed time_slot, selecting by time window instead")
+        elif self.racer:
+            return self._race_time_slot(time_slot, da_te, venue_type, wait_timeout_seconds, max_attempts)
+        target = window or time_slot
         for attempt in range(max_attempts):
+            if self.prewarmer:
+                # 放票前、高频轮询开始之前定期预热连接，放票后的第一次刷新不用重新建立连接
+                self.prewarmer.maybe_prewarm(self.governor)
             if attempt > 0:
-                self.page.reload()
-                self.page.wait_for_load_state('networkidle')
-                self.page.wait_for_load_state('domcontentloaded')
-                self.page.wait_for_load_state('load')
-                self.select_campus()
-                self.select_venue(venue_type)
-                self.select_date(da_te, venue_type, wait_timeout_seconds)
+                self.governor.acquire()
             try:
-                time_locator = self.page.locator(f"div.element:has-text('{time_slot}(可预约)')")
-                time_locator.wait_for(state='visible', timeout=wait_timeout_seconds * 1000)
-                time_locator.click()
-                logger.info(f"Successfully selected time slot: {time_slot}")
+                if attempt > 0 and not self._refresh_slots(target, da_te, venue_type, wait_timeout_seconds):
+                    raise TimeoutError(f"Time slot {target} is not available yet")
+                if window:
+                    self._select_in_window(window, venue_type, da_te, wait_timeout_seconds)
+                else:
+                    time_locator = self.page.locator(f"div.element:has-text('{time_slot}(可预约)')")
+                    time_locator.wait_for(state='visible', timeout=wait_timeout_seconds * 1000)
+                    time_locator.click()
+                self._mark_available()
+                logger.info(f"Successfully selected time slot: {self.selected_slot}")
                 return self
             except TimeoutError:
                 if attempt >= max_attempts - 1:
-                    logger.error(f"Failed to select time slot: {time_slot} after {max_attempts} attempts.")
-                    raise RuntimeError(f"Failed to select time slot: {time_slot} after {max_attempts} attempts.")
+                    logger.error(f"Failed to select time slot: {target} after {max_attempts} attempts.")
+                    raise RuntimeError(f"Failed to select time slot: {target} after {max_attempts} attempts.")
                 else:
-                    logger.info(f"Failed to select time slot: {time_slot}, retrying...")
+                    logger.info(f"Failed to select time slot: {target}, retrying...")
+                    self._add_retry()
         return self
 
+    def _select_in_window(self, window: SlotWindow, venue_type: str, da_te: str, wait_timeout_seconds: float):
+        """一次读出所有时间段，点击窗口内最合适的一个；没有时抛出 TimeoutError"""
+        slots = wait_for_slots(self.page, wait_timeout_seconds)
+        slot = window.best(slots)
+        if slot is None:
+            raise TimeoutError(f"No available time slot {window} among {len(slots)} slots")
+        # 按解析时的位置直接点击，不再逐个查询候选
+        self.page.locator('div.element').nth(slot.index).click()
+        self.selected_slot = slot.label
+        self._target = (venue_type, self._resolve_date(da_te), slot.label)
 
+    def _race_time_slot(self, time_slot: str, da_te: str, venue_type: str, wait_timeout_seconds: float,
+                        max_attempts: int):
+        """race 策略：等第一个检测器报告有票，然后只点击一次目标时间段"""
+        day = self._resolve_date(da_te)
+        winner = self.racer.race(time_slot, day, venue_type, wait_timeout_seconds, max_attempts)
+        try:
+            self._mark_available()
+            time_locator = self.page.locator(f"div.element:has-text('{time_slot}(可预约)')")
+            if winner != 'dom' and not time_locator.is_visible():
+                # 接口先看到有票时页面可能还是旧数据，重新点击日期拉取一次（不再经过限速）
+                date_label = self.page.locator(f"//label/div[contains(.,'{day}')]").first
+                if date_label.is_visible():
+                    date_label.click()
+            time_locator.wait_for(state='visible', timeout=wait_timeout_seconds * 1000)
+            time_locator.click()
+        except TimeoutError:
+            raise RuntimeError(f"{winner} detector saw {time_slot} available but the page never showed it")
+        finally:
+            lags = self.racer.finish()
+            if self.recorder:
+                self.recorder.detector = winner
+                for detector, lag in lags.items():
+                    self.recorder.stages[f'race_lag_{detector}'] = lag
+        logger.info(f"Successfully selected time slot: {time_slot} ({winner} detector, others behind by "
+                    f"{', '.join(f'{d} {lag * 1000:.0f}ms' for d, lag in lags.items()) or '-'})")
+        return self
 
-    def leftover_timeslot(self):
-        """查询当日有票的时间段"""
+    def iter_leftover_timeslots(self):
+        """逐个产出当日有票的时间段，找到一个就立即返回给调用方"""
         self.page.wait_for_timeout(300)
-        available_timeslots = self.page.locator("div.element:has-text('可预约')").all()
-        visible_timeslots = [t for t in available_timeslots if t.is_visible()]
+        for timeslot in self.page.locator("div.element:has-text('可预约')").all():
+            if timeslot.is_visible():
+                self._mark_available()
+                # 产出时间段的文本内容，而不是Locator对象
+                yield timeslot.text_content().strip()
+
+    def leftover_timeslot(self, on_result=None):
+        """查询当日有票的时间段
+
+        Args:
+            on_result: 可选回调，每找到一个有票时间段就调用一次，用于流式展示
+        """
+        self.governor.acquire()
+        visible_timeslots = []
+        for timeslot in self.iter_leftover_timeslots():
+            visible_timeslots.append(timeslot)
+            if on_result:
+                on_result(timeslot)
         if not visible_timeslots:
             logger.error("no timeslots available")
             return None
-        # 返回时间段的文本内容，而不是Locator对象
-        return [t.text_content().strip() for t in visible_timeslots]
+        return visible_timeslots
 
+    @timed_stage('select_specific_venue')
     def select_specific_venue(self, venue_type: str, court=None):
         """选择具体场地"""
         self.current_venue_type = venue_type
@@ -146,28 +632,62 @@ class TicketPage:
                 logger.info("Selected basketball venue: 东馆篮球3号场")
         return self
 
+    @timed_stage('submit_booking')
     def submit_booking(self):
-        """提交预约"""
-        self.page.click("button.bh-btn.bh-btn-default.bh-btn-large:has-text('提交预约')")
-        logger.info("Submitted booking")
-        return self
+        """提交预约，并记下提交请求的响应供支付流程判断
 
-    def make_payment(self,pay_password):
-        """支付订单"""
-        self.page.click("a:has-text('未支付')")
-        self.page.wait_for_selector("button:has-text(')支付')", timeout=10000)
-        payments = [p for p in self.page.get_by_text(')支付').all() if p.is_visible()]
-        if len(payments) == 1:
-            self.page.click("button:has-text('(剩余金额)支付')")
-            logger.info("buy ticket success!!! 买票成功 !!!")
-        else:
-            # 使用 PayPage 完成支付流程
-            pay_page = PayPage(self.page)
-            (pay_page 
-                .pay_with_sports_fund() 
-                .click_next_step() 
-                .enter_password(pay_password)
-            )
-            return True
+        同一目标只提交一次：已经提交过（且没有被服务器拒绝）时不再点击提交，
+        直接交给支付流程处理已有的订单。
+        """
+        return self._submit(lambda: self.page.click("button.bh-btn.bh-btn-default.bh-btn-large:has-text('提交预约')"))
+
+    @property
+    def submitted(self) -> bool:
+        """是否已提交预约且服务器没有明确拒绝（可能已生成订单，不能再重新预约）"""
+        return self._submitted_at is not None and (self.booking_response is None or self.booking_response.ok)
+
+    def _is_booking_response(self, response) -> bool:
+        """是否为提交预约接口的响应（排除统计、保活等其他 POST 请求）"""
+        request = response.request
+        if request.method != 'POST' or request.resource_type not in ('xhr', 'fetch'):
+            return False
+        if self.booking_api_path:
+            return urlparse(response.url).path == urlparse(urljoin(self.page.url, self.booking_api_path)).path
+        return urlparse(response.url).netloc == urlparse(self.page.url).netloc
 
+    def _submit(self, click):
+        """执行提交点击（页面对象或宏回放），同一目标只提交一次"""
+        if self._target and not self.booking_guard.claim(self._target):
+            logger.warning(f"Booking {'/'.join(self._target)} was already submitted, not submitting again")
+            return self
+        self.booking_response = None
+        self._submitted_at = time.perf_counter()
+        try:
+            with self.page.expect_response(self._is_booking_response,
+                                           timeout=self.submit_timeout_seconds * 1000) as response_info:
+                click()
+            self.booking_response = response_info.value
+        except TimeoutError:
+            # 不确定是否已提交，保持占用，避免重复下单
+            logger.warning("no booking response observed")
+        if self._target and self.booking_response is not None and not self.booking_response.ok:
+            self.booking_guard.release(self._target)
+        logger.info("Submitted booking")
+        if self.instrumentation:
+            self.instrumentation.stop_hot_section()
         return self
+
+    @timed_stage('make_payment')
+    def make_payment(self, pay_password):
+        """支付订单，返回是否支付成功"""
+        flow = PaymentFlow(self.page, pay_password, keypad_input=self.keypad_input,
+                           timeout_seconds=self.payment_timeout_seconds, pay_url=self.pay_url,
+                           orders_url=self.orders_url, orders_api_path=self.orders_api_path)
+        paid = flow.run(self.booking_response)
+        if paid and self._submitted_at is not None:
+            elapsed = time.perf_counter() - self._submitted_at
+            path = 'direct' if any(step[0] == 'direct' and step[1] == 'pin' for step in flow.transitions) else 'ui'
+            logger.info(f"Submit to payment confirmation: {elapsed:.3f}s ({path})")
+            if self.recorder:
+                self.recorder.stages['submit_to_paid'] = elapsed
+        return paid
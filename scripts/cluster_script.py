@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cluster import DEFAULT_ADDRESS, Coordinator, WorkerAgent
+from utils.job_queue import JobQueue, load_jobs
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def run_coordinator(args):
+    # 读取配置文件
+    with open(args.config, 'r', encoding='utf-8') as f:
+        cfg = json.load(f)
+
+    queue = JobQueue(load_jobs(args.jobs, cfg))
+    if not queue.jobs:
+        logger.error("没有需要执行的任务")
+        return 1
+    for job in queue.jobs:
+        logger.info(f"Queued {job}, release at {datetime.fromtimestamp(job.release_at):%Y-%m-%d %H:%M}")
+
+    coordinator = Coordinator(queue, address=args.listen or cfg.get('cluster_address', DEFAULT_ADDRESS),
+                              token=args.token or cfg.get('cluster_token')).start()
+    summary = coordinator.run()
+    logger.info(f"分布式任务完成: {summary}")
+    return 0 if summary.get('success', 0) == len(queue.jobs) else 1
+
+
+def run_worker(args):
+    agent = WorkerAgent(address=args.connect, capacity=args.capacity, name=args.name,
+                        headless=not args.headed, token=args.token or os.environ.get('GYM_CLUSTER_TOKEN'))
+    try:
+        agent.connect()
+    except OSError as e:
+        logger.error(f"无法连接协调进程 {args.connect}: {str(e)}")
+        return 1
+    completed = agent.run()
+    logger.info(f"工作进程 {agent.name} 结束，共执行 {completed} 个任务")
+    return 0
+
+
+def main():
+    # 解析命令行参数
+    parser = argparse.ArgumentParser(description='Gym Ticket Booking Cluster')
+    subparsers = parser.add_subparsers(dest='role', required=True)
+
+    coordinator = subparsers.add_parser('coordinator', help='Dispatch the jobs file to connected workers')
+    coordinator.add_argument('--config', required=True, help='Path to config file (defaults for every job)')
+    coordinator.add_argument('--jobs', required=True, help='Path to jobs file')
+    coordinator.add_argument('--listen', help=f'tcp://host:port or unix:///path (default: config "cluster_address" '
+                                              f'or {DEFAULT_ADDRESS})')
+    coordinator.add_argument('--token', help='Shared secret workers must present (default: config "cluster_token")')
+
+    worker = subparsers.add_parser('worker', help='Book the jobs assigned by a coordinator')
+    worker.add_argument('--connect', default=DEFAULT_ADDRESS, help='Coordinator address')
+    worker.add_argument('--capacity', type=int, default=1, help='Browsers working in parallel on this worker')
+    worker.add_argument('--name', help='Worker name (default: host-pid)')
+    worker.add_argument('--token', help='Shared secret (default: $GYM_CLUSTER_TOKEN)')
+    worker.add_argument('--headed', action='store_true', help='Run in headed mode')
+    args = parser.parse_args()
+
+    if args.role == 'coordinator':
+        return run_coordinator(args)
+    return run_worker(args)
+
+if __name__ == '__main__':
+    exit(main())
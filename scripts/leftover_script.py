@@ -7,68 +7,79 @@ import sys
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from playwright.sync_api import sync_playwright, Playwright
 from utils.logger import setup_logger
-from utils.browser_launcher import launch_browser
+from utils.asset_cache import AssetCache
+from utils.browser_pool import open_page
+from utils.har import add_har_arguments, har_options
+from utils.fault_injection import add_fault_arguments
+from utils.instrumentation import RunInstrumentation, add_instrument_arguments
+from utils.run_history import RunHistory, RunRecorder
 
 from pages.login_page import LoginPage
 from pages.ticket_page import TicketPage
 
 logger = setup_logger(__name__)
 
-def main():
+def main(pool=None, on_result=None):
+    """查询余票
+
+    Returns:
+        tuple: (exit_code, message, timeslots) - timeslots为查询到的时间段列表，失败时为None
+    """
     # 解析命令行参数
     parser = argparse.ArgumentParser(description='Gym Leftover Timeslots Query Script')
     parser.add_argument('--config', required=True, help='Path to config file')
     parser.add_argument('--headed', action='store_true', help='Run in headed mode')
+    add_har_arguments(parser)
+    add_fault_arguments(parser)
+    add_instrument_arguments(parser)
     args = parser.parse_args()
     
     # 读取配置文件
     with open(args.config, 'r', encoding='utf-8') as f:
         cfg = json.load(f)
     
-    # 创建Playwright实例
-    with sync_playwright() as p:
-        # 启动浏览器
-        browser = launch_browser(p, headless=not args.headed)
-
-        # 创建页面
-        page = browser.new_page()
-        
+    # 记录本次运行的各阶段耗时和结果
+    recorder = RunRecorder.from_config('query', cfg)
+    
+    # 创建页面（GUI 传入 pool 时复用常驻浏览器）
+    with open_page(headless=not args.headed, pool=pool, fault_profile=args.fault_profile,
+                   asset_cache=AssetCache.from_config(cfg), **har_options(args)) as page:
+        # 可选：采集 CDP 性能指标并只在热点区间录制 trace
+        instrumentation = RunInstrumentation(page, recorder) if args.instrument else None
         try:
             # 登录
             login_page = LoginPage(page)
-            login_success, login_msg = login_page.login(cfg['username'], cfg['password'])
+            with recorder.stage('login'):
+                login_success, login_msg = login_page.login(cfg['username'], cfg['password'])
             if not login_success:
                 logger.info(f"登录失败: {login_msg}")
-                return 1, login_msg
+                recorder.finish('login_failed', login_msg)
+                return 1, login_msg, None
 
-            # 查询余票
-            ticket_page = TicketPage(page)
+            # 查询余票，每找到一个时间段就通过 on_result 推送给调用方
+            ticket_page = TicketPage.from_config(page, cfg, recorder=recorder, instrumentation=instrumentation)
             # 使用括号 ( ... ) 可以让整个表达式自动支持换行
             leftover_timeslots = (ticket_page
-                .select_campus()
-                .select_venue(cfg['venue'])
-                .select_date(cfg['date'], cfg['venue'], wait_timeout_seconds=float(cfg['wait_timeout_seconds']))
-                .leftover_timeslot()
+                .open_date_view(cfg['date'], cfg['venue'], wait_timeout_seconds=float(cfg['wait_timeout_seconds']))
+                .leftover_timeslot(on_result=on_result)
             )
             
-            # 确保config目录存在
-            os.makedirs('config', exist_ok=True)
-            
-            # 将结果写入临时文件，以便main.py读取
-            with open('config/leftover_result.json', 'w', encoding='utf-8') as f:
-                json.dump(leftover_timeslots, f)
-            
             logger.info(f"查询到的余票时间段: {leftover_timeslots}")
-            return 0, "查询成功"
+            recorder.finish('success' if leftover_timeslots else 'empty')
+            return 0, "查询成功", leftover_timeslots
             
         except Exception as e:
             logger.error(f"查询余票失败: {str(e)}")
-            return 1, f"查询失败: {str(e)}"
+            recorder.finish('failed', str(e))
+            return 1, f"查询失败: {str(e)}", None
         finally:
-            # 关闭浏览器
-            browser.close()
+            RunHistory().record(recorder)
+            if instrumentation:
+                instrumentation.save()
 
 if __name__ == '__main__':
-    exit(main())
+    # 结果直接以JSON输出到标准输出，供其他程序读取
+    exit_code, _, timeslots = main()
+    print(json.dumps(timeslots, ensure_ascii=False))
+    exit(exit_code)
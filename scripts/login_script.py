@@ -8,43 +8,60 @@ import os
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from playwright.sync_api import sync_playwright, Playwright
 from utils.logger import setup_logger
 from pages.login_page import LoginPage
-from utils.browser_launcher import launch_browser
+from utils.asset_cache import AssetCache
+from utils.browser_pool import context_setup, open_page
+from utils.har import add_har_arguments, har_options
+from utils.fault_injection import add_fault_arguments
+from utils.watchdog import MemoryWatchdog
+from utils.run_history import RunHistory, RunRecorder
 
 logger = setup_logger(__name__)
 
-def main():
+def main(pool=None):
     # 解析命令行参数
     parser = argparse.ArgumentParser(description='Gym Login Script')
     parser.add_argument('--config', required=True, help='Path to config file')
     parser.add_argument('--headed', action='store_true', help='Run in headed mode')
+    add_har_arguments(parser)
+    add_fault_arguments(parser)
     args = parser.parse_args()
     
     # 读取配置文件
     with open(args.config, 'r', encoding='utf-8') as f:
         cfg = json.load(f)
     
-    # 创建Playwright实例
-    with sync_playwright() as p:
-        # 启动浏览器
-        browser = launch_browser(p, headless=not args.headed)
-        
-        # 创建页面
-        page = browser.new_page()
-        
+    # 创建页面（GUI 传入 pool 时复用常驻浏览器）
+    with open_page(headless=not args.headed, pool=pool, fault_profile=args.fault_profile,
+                   asset_cache=AssetCache.from_config(cfg), **har_options(args)) as page:
         try:
             # 登录
             login_page = LoginPage(page)
-            if login_page.login(cfg['username'], cfg['password']):
-                # 登录成功，保持浏览器打开
+            recorder = RunRecorder.from_config('login', cfg)
+            with recorder.stage('login'):
+                logged_in, login_msg = login_page.login(cfg['username'], cfg['password'])
+            # 登录结果在进入保活循环前记录，浏览器会一直保持打开
+            recorder.finish('success' if logged_in else 'login_failed', login_msg)
+            RunHistory().record(recorder)
+            if logged_in:
+                # 登录成功，保持浏览器打开：每秒只检查本地状态，定期才真正和浏览器通信一次
+                watchdog = MemoryWatchdog.from_config(page, cfg, headless=not args.headed,
+                                                      setup=context_setup(page.context))
+                ping_interval = float(cfg.get('keepalive_ping_seconds', 30))
+                next_ping = time.monotonic() + ping_interval
                 try:
-                    while True:
+                    while not page.is_closed():
                         time.sleep(1)
-                        page.title()
+                        if time.monotonic() >= next_ping:
+                            page.evaluate('1')
+                            next_ping = time.monotonic() + ping_interval
+                        page = watchdog.tick()
+                    logger.info("浏览器已关闭")
                 except Exception as e:
                     logger.info(f"浏览器已关闭: {str(e)}")
+                finally:
+                    watchdog.close()
             else:
                 # 登录失败
                 logger.error("登录失败")
@@ -55,9 +72,6 @@ def main():
         except Exception as e:
             logger.error(f"登录过程中发生错误: {str(e)}")
             return 1
-        finally:
-            # 关闭浏览器
-            browser.close()
 
 if __name__ == '__main__':
     exit(main())
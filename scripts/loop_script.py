@@ -7,62 +7,73 @@ import os
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from playwright.sync_api import sync_playwright, Playwright
 from utils.logger import setup_logger
-from utils.browser_launcher import launch_browser
+from utils.asset_cache import AssetCache
+from utils.browser_pool import open_page
+from utils.har import add_har_arguments, har_options
+from utils.fault_injection import add_fault_arguments
+from utils.instrumentation import RunInstrumentation, add_instrument_arguments
+from utils.prewarm import Prewarmer
+from utils.run_history import RunHistory, RunRecorder
 
 from pages.login_page import LoginPage
 from pages.ticket_page import TicketPage
 
 logger = setup_logger(__name__)
 
-def main():
+def main(pool=None):
     # 解析命令行参数
     parser = argparse.ArgumentParser(description='Gym Ticket Booking Script')
     parser.add_argument('--config', required=True, help='Path to config file')
     parser.add_argument('--headed', action='store_true', help='Run in headed mode')
+    add_har_arguments(parser)
+    add_fault_arguments(parser)
+    add_instrument_arguments(parser)
     args = parser.parse_args()
     
     # 读取配置文件
     with open(args.config, 'r', encoding='utf-8') as f:
         cfg = json.load(f)
     
-    # 创建Playwright实例
-    with sync_playwright() as p:
-        # 启动浏览器
-        browser = launch_browser(p, headless=not args.headed)
-        
-        # 创建页面
-        page = browser.new_page()
-        
+    # 记录本次运行的各阶段耗时、重试次数和结果
+    recorder = RunRecorder.from_config('book', cfg)
+    
+    # 创建页面（GUI 传入 pool 时复用常驻浏览器）
+    with open_page(headless=not args.headed, pool=pool, fault_profile=args.fault_profile,
+                   asset_cache=AssetCache.from_config(cfg), **har_options(args)) as page:
+        # 可选：采集 CDP 性能指标并只在热点区间录制 trace
+        instrumentation = RunInstrumentation(page, recorder) if args.instrument else None
+        # 在登录前创建，以便从登录过程的请求中学到预约系统和统一认证的主机
+        prewarmer = Prewarmer.from_config(page, cfg, recorder.release_at)
         try:
             # 登录
             login_page = LoginPage(page)
-            login_page.login(cfg['username'], cfg['password'])
+            with recorder.stage('login'):
+                login_success, login_msg = login_page.login(cfg['username'], cfg['password'])
+            if not login_success:
+                logger.error(f"登录失败: {login_msg}")
+                recorder.finish('login_failed', login_msg)
+                return 1
 
             # 预订场地
-            ticket_page = TicketPage(page)
-            # 使用括号 ( ... ) 可以让整个表达式自动支持换行
-            if_sc=(ticket_page
-                .select_campus()
-                .select_venue(cfg['venue'])
-                .select_date(cfg['date'], cfg['venue'], wait_timeout_seconds=float(cfg['wait_timeout_seconds']))
-                .select_time_slot_loop(cfg['time_slot'], cfg['date'], cfg['venue'], wait_timeout_seconds=float(cfg['wait_timeout_seconds']))
-                .select_specific_venue(cfg['venue'], cfg.get('court'))
-                .submit_booking()
-                .make_payment(cfg['pay_pass'])
-            )
+            ticket_page = TicketPage.from_config(page, cfg, recorder=recorder, instrumentation=instrumentation,
+                                                prewarmer=prewarmer)
+            if_sc = ticket_page.book(cfg)
             
             if if_sc:
                 logger.info("抢票成功！")
+                recorder.finish('success')
                 return 0
+            recorder.finish('unpaid', '未完成支付')
             
         except Exception as e:
             logger.error(f"抢票失败: {str(e)}")
+            recorder.finish('failed', str(e))
             return 1
         finally:
-            # 关闭浏览器
-            browser.close()
+            RunHistory().record(recorder)
+            if instrumentation:
+                instrumentation.save()
 
 if __name__ == '__main__':
     exit(main())
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger import setup_logger
+from utils.job_queue import JobQueue, load_jobs, run_queue
+
+logger = setup_logger(__name__)
+
+def main():
+    # 解析命令行参数
+    parser = argparse.ArgumentParser(description='Gym Ticket Booking Job Queue')
+    parser.add_argument('--config', required=True, help='Path to config file (defaults for every job)')
+    parser.add_argument('--jobs', required=True, help='Path to jobs file')
+    parser.add_argument('--workers', type=int, help='Number of browsers working in parallel (default: config "workers" or 2)')
+    parser.add_argument('--headed', action='store_true', help='Run in headed mode')
+    args = parser.parse_args()
+
+    # 读取配置文件
+    with open(args.config, 'r', encoding='utf-8') as f:
+        cfg = json.load(f)
+
+    queue = JobQueue(load_jobs(args.jobs, cfg))
+    if not queue.jobs:
+        logger.error("没有需要执行的任务")
+        return 1
+    for job in queue.jobs:
+        logger.info(f"Queued {job}, release at {datetime.fromtimestamp(job.release_at):%Y-%m-%d %H:%M}")
+
+    workers = args.workers or int(cfg.get('workers', 2))
+    summary = run_queue(queue, workers=workers, headless=not args.headed)
+    logger.info(f"任务队列完成: {summary}")
+    return 0 if summary.get('success', 0) == len(queue.jobs) else 1
+
+if __name__ == '__main__':
+    exit(main())
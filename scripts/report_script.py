@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import sys
+import os
+from collections import defaultdict
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.release_predictor import SIGHTING_MODES, WEEKDAYS, ReleasePredictor, sighting_offset
+from utils.run_history import HISTORY_DB_FILE, RunHistory, percentile
+
+PERCENTILES = (50, 90, 99)
+
+
+def _format_seconds(value):
+    return '-' if value is None else f"{value:.2f}s"
+
+
+def _latency_line(label, values):
+    parts = ', '.join(f"p{pct}={_format_seconds(percentile(values, pct))}" for pct in PERCENTILES)
+    return f"  {label:<24} n={len(values):<4} {parts}"
+
+
+def print_report(runs):
+    """打印延迟分位数、各策略成功率、检测器胜出次数、观测到的放票时间和放票时间预测"""
+    if not runs:
+        print("没有运行记录")
+        return
+
+    print(f"共 {len(runs)} 次运行")
+
+    # 总耗时与各阶段耗时分位数
+    print("\n延迟分位数:")
+    print(_latency_line('total', [r['duration'] for r in runs]))
+    stages = defaultdict(list)
+    for r in runs:
+        for name, seconds in json.loads(r['stages']).items():
+            stages[name].append(seconds)
+    for name, values in stages.items():
+        print(_latency_line(name, values))
+
+    # 各策略成功率（只统计抢票运行）
+    print("\n各策略成功率:")
+    by_strategy = defaultdict(list)
+    for r in runs:
+        if r['mode'] == 'book':
+            by_strategy[r['strategy']].append(r)
+    for strategy, items in sorted(by_strategy.items()):
+        wins = sum(1 for r in items if r['outcome'] == 'success')
+        retries = sum(r['retries'] for r in items) / len(items)
+        print(f"  {strategy:<24} {wins}/{len(items)} ({wins / len(items):.0%})  平均重试 {retries:.1f} 次")
+
+    # race 策略中各检测器胜出次数，以及落后的检测器比胜出者晚多少
+    raced = [r for r in runs if r['detector']]
+    if raced:
+        print("\n检测器胜出次数:")
+        by_detector = defaultdict(int)
+        lags_by_detector = defaultdict(list)
+        for r in raced:
+            by_detector[r['detector']] += 1
+            for name, seconds in json.loads(r['stages']).items():
+                if name.startswith('race_lag_'):
+                    lags_by_detector[name[len('race_lag_'):]].append(seconds)
+        for detector in sorted(set(by_detector) | set(lags_by_detector), key=lambda d: -by_detector[d]):
+            count = by_detector[detector]
+            lags = lags_by_detector[detector]
+            behind = f"  落后时 p50={_format_seconds(percentile(lags, 50))}" if lags else ''
+            print(f"  {detector:<24} {count}/{len(raced)} ({count / len(raced):.0%}){behind}")
+
+    # 首次看到可预约的时间（相对于放票时间），与放票时间预测使用同样的运行
+    print("\n观测到的放票时间:")
+    predicted_runs = [r for r in runs if r['mode'] in SIGHTING_MODES]
+    sightings = [r for r in predicted_runs if sighting_offset(r) is not None]
+    for r in sightings:
+        seen = datetime.fromtimestamp(r['first_available_at']).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+        server = r['first_available_server_offset']
+        server = f"  服务器时间 {server:+.2f}s" if server is not None else ''
+        print(f"  {seen}  {r['first_available_offset']:+.2f}s{server}  {r['account']}  {r['target']}")
+    offsets = [sighting_offset(r) for r in sightings]
+    if offsets:
+        print(_latency_line('offset vs release', offsets))
+
+    # 按场馆/星期预测的实际放票时间和对应的高频刷新窗口（只用放票前已在刷新的运行）
+    predictor = ReleasePredictor(predicted_runs)
+    if predictor.samples:
+        print("\n放票时间预测:")
+        for venue, weekday in sorted(predictor.samples):
+            prediction = predictor.predict(venue, weekday)
+            label = f"{venue} {WEEKDAYS[weekday]}"
+            if not prediction:
+                print(f"  {label:<24} 样本不足 ({len(predictor.samples[(venue, weekday)])})")
+                continue
+            before, after = predictor.burst_window(venue, weekday)
+            print(f"  {label:<24} n={prediction['n']:<4} p10={prediction['p10']:+.2f}s p50={prediction['p50']:+.2f}s "
+                  f"p90={prediction['p90']:+.2f}s  高频窗口 {-before:+.1f}s .. {after:+.1f}s ({prediction['scope']})")
+
+
+def main():
+    # 解析命令行参数
+    parser = argparse.ArgumentParser(description='Gym Run History Report')
+    parser.add_argument('--db', default=HISTORY_DB_FILE, help='Path to run history database')
+    parser.add_argument('--mode', choices=['book', 'query', 'login', 'watch'], help='Only include runs of this mode')
+    parser.add_argument('--account', help='Only include runs of this account')
+    args = parser.parse_args()
+
+    print_report(RunHistory(args.db).runs(mode=args.mode, account=args.account))
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger import setup_logger
+from utils.asset_cache import AssetCache
+from utils.browser_pool import open_page
+from utils.har import add_har_arguments, har_options
+from utils.fault_injection import add_fault_arguments
+from utils.run_history import RunHistory, RunRecorder
+from utils.slot_watcher import SlotWatcher, parse_until
+
+from pages.login_page import LoginPage
+from pages.ticket_page import TicketPage
+
+logger = setup_logger(__name__)
+
+def main(pool=None, on_change=None):
+    """监视退订释放的时间段，一出现就预约
+
+    Returns:
+        tuple: (exit_code, message, slot) - slot为预约到的时间段，没有预约到时为None
+    """
+    # 解析命令行参数
+    parser = argparse.ArgumentParser(description='Gym Cancellation Watch Script')
+    parser.add_argument('--config', required=True, help='Path to config file')
+    parser.add_argument('--headed', action='store_true', help='Run in headed mode')
+    parser.add_argument('--until', help='Stop watching at HH:MM or "YYYY-MM-DD HH:MM"')
+    parser.add_argument('--polls-per-minute', type=float, help='Base polling rate (default: config "watch_polls_per_minute" or 12)')
+    add_har_arguments(parser)
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+    
+    # 读取配置文件
+    with open(args.config, 'r', encoding='utf-8') as f:
+        cfg = json.load(f)
+    
+    recorder = RunRecorder.from_config('watch', cfg)
+    
+    # 创建页面（GUI 传入 pool 时复用常驻浏览器），整个监视过程都复用这个页面
+    with open_page(headless=not args.headed, pool=pool, fault_profile=args.fault_profile,
+                   asset_cache=AssetCache.from_config(cfg), **har_options(args)) as page:
+        try:
+            # 登录
+            login_page = LoginPage(page)
+            with recorder.stage('login'):
+                login_success, login_msg = login_page.login(cfg['username'], cfg['password'])
+            if not login_success:
+                logger.info(f"登录失败: {login_msg}")
+                recorder.finish('login_failed', login_msg)
+                return 1, login_msg, None
+
+            # 监视时的基础轮询速率，由进程内共享的 RateGovernor 执行并按站点响应自动调整
+            polls_per_minute = args.polls_per_minute or float(cfg.get('watch_polls_per_minute', 12))
+            ticket_page = TicketPage.from_config(page, {**cfg, 'poll_rate': polls_per_minute / 60}, recorder=recorder)
+            watcher = SlotWatcher(page, ticket_page, cfg, on_change=on_change)
+            logger.info(f"开始监视 {cfg['venue']} {cfg['date']} 的时间段: {watcher.targets or '全部'}")
+            slot = watcher.run(until=parse_until(args.until or cfg.get('watch_until')))
+
+            if slot:
+                logger.info(f"抢到退订的时间段: {slot}")
+                recorder.finish('success', slot)
+                return 0, f"预约成功: {slot}", slot
+            recorder.finish('empty', f"{watcher.polls} polls")
+            return 1, "监视结束，没有预约到", None
+            
+        except Exception as e:
+            logger.error(f"监视失败: {str(e)}")
+            recorder.finish('failed', str(e))
+            return 1, f"监视失败: {str(e)}", None
+        finally:
+            RunHistory().record(recorder)
+
+if __name__ == '__main__':
+    exit_code, message, _ = main()
+    exit(exit_code)
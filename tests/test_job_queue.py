@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from pages.ticket_page import resolve_date
+from utils import job_queue
+from utils.job_queue import BookingJob, JobQueue, load_jobs
+
+BASE = {'username': 'u1', 'password': 'p', 'venue': 'A', 'time_slot': '18:00-19:00', 'date': '+3',
+        # 提前量足够大，任务立即可以开始
+        'job_lead_seconds': 30 * 86400}
+
+
+def job(**cfg):
+    return BookingJob({**BASE, **cfg})
+
+
+def test_booking_job_release_and_key():
+    booking = job(date='+3', release_days_ahead=2, release_time='12:30')
+    assert booking.day == resolve_date('+3')
+    assert booking.cfg['date'] == booking.day
+    assert booking.key == ('A', booking.day, '18:00-19:00', '-')
+    earlier = job(date='+3', release_days_ahead=2, release_time='08:00')
+    assert earlier.release_at < booking.release_at
+    assert job(date='+2', release_days_ahead=1).release_at == job(date='+3', release_days_ahead=2).release_at
+
+
+def test_record_failure_retries_then_fails():
+    booking = job(job_max_attempts=2, job_retry_seconds=10)
+    booking.record_failure('boom')
+    assert (booking.status, booking.attempts, booking.last_error) == ('pending', 1, 'boom')
+    assert booking.ready_at == booking.next_attempt_at
+    booking.record_failure('boom')
+    assert booking.status == 'failed'
+
+
+def test_queue_orders_by_release_and_drops_duplicates_and_past_jobs():
+    late, early = job(date='+4'), job(date='+2')
+    queue = JobQueue([late, early, job(date='+4'), job(date='2000-01-01')])
+    assert queue.jobs == [early, late]
+    assert queue.get() is early
+    assert early.status == 'running'
+    assert queue.get() is late
+
+
+def test_queue_retries_failed_jobs_and_ends():
+    booking = job(job_max_attempts=2, job_retry_seconds=0)
+    queue = JobQueue([booking])
+    assert queue.get() is booking
+    queue.done(booking, False, 'boom')
+    assert queue.get() is booking
+    queue.done(booking, True)
+    assert booking.status == 'success'
+    assert queue.get() is None
+
+
+def test_load_jobs_expands_accounts_and_dates(tmp_path):
+    path = tmp_path / 'jobs.json'
+    path.write_text(json.dumps({
+        'defaults': {'venue': 'B'},
+        'accounts': {'alice': {'username': 'alice', 'password': 'x', 'pay_pass': '1'}},
+        'jobs': [{'account': 'alice', 'date': ['+1', '+2']}, {'time_slot': '19:00-20:00'}],
+    }), encoding='utf-8')
+    jobs = load_jobs(str(path), BASE)
+    assert [(j.account, j.cfg['venue'], j.day) for j in jobs] == [
+        ('alice', 'B', resolve_date('+1')), ('alice', 'B', resolve_date('+2')), ('u1', 'B', resolve_date('+3'))]
+    assert jobs[2].cfg['time_slot'] == '19:00-20:00'
+
+
+def test_load_jobs_unknown_account(tmp_path):
+    path = tmp_path / 'jobs.json'
+    path.write_text(json.dumps({'jobs': [{'account': 'bob'}]}), encoding='utf-8')
+    with pytest.raises(ValueError):
+        load_jobs(str(path), BASE)
+
+
+def test_unpaid_job_is_not_requeued():
+    booking = job(job_max_attempts=3, job_retry_seconds=0)
+    queue = JobQueue([booking])
+    assert queue.get() is booking
+    queue.done(booking, False, '未完成支付', unpaid=True)
+    assert (booking.status, booking.attempts) == ('unpaid', 0)
+    assert queue.get() is None
+    assert queue.summary() == {'unpaid': 1}
+
+
+def test_worker_does_not_book_an_unpaid_job_again(monkeypatch):
+    class Pool:
+        def close(self):
+            pass
+
+    runs = []
+
+    def run_job(booking, pool, headless):
+        runs.append(booking)
+        return 'unpaid'
+
+    monkeypatch.setattr(job_queue, 'BrowserPool', Pool)
+    monkeypatch.setattr(job_queue, 'run_job', run_job)
+    booking = job(job_max_attempts=3, job_retry_seconds=0)
+    assert job_queue.run_queue(JobQueue([booking]), workers=1) == {'unpaid': 1}
+    assert runs == [booking]
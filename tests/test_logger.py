@@ -0,0 +1,37 @@
+import json
+import logging
+
+import pytest
+
+from utils.logger import build_handlers, start_queue_logging
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_logged_exception_reaches_the_file(tmp_path, compact):
+    log_path = tmp_path / 'test.log'
+    logger = logging.getLogger(f'test_logger_{compact}')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handlers = build_handlers(str(log_path), compact=compact)
+    listener = start_queue_logging(logger, handlers)
+    try:
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logger.exception('booking failed for %s', 'alice')
+    finally:
+        listener.stop()
+        for handler in logger.handlers + handlers:
+            logger.removeHandler(handler)
+            handler.close()
+
+    text = log_path.read_text(encoding='utf-8')
+    if compact:
+        entry = json.loads(text.splitlines()[0])
+        assert entry['msg'] == 'booking failed for alice'
+        assert 'Traceback' in entry['exc'] and 'ZeroDivisionError' in entry['exc']
+    else:
+        assert 'booking failed for alice' in text
+        assert 'Traceback' in text and 'ZeroDivisionError: division by zero' in text
+        # 堆栈只输出一次
+        assert text.count('Traceback') == 1
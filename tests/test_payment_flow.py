@@ -0,0 +1,18 @@
+from pages.payment_flow import find_order_id
+
+
+def test_find_order_id_top_level_and_nested():
+    assert find_order_id({'orderId': 'A1'}) == 'A1'
+    assert find_order_id({'code': 0, 'data': {'order': {'order_no': 42}}}) == '42'
+    assert find_order_id({'data': [{'id': 1}, {'orderNo': 'B2'}]}) == 'B2'
+
+
+def test_find_order_id_skips_empty_values():
+    assert find_order_id({'orderId': '', 'data': {'order_id': 'C3'}}) == 'C3'
+    assert find_order_id({'orderId': None}) is None
+
+
+def test_find_order_id_missing_or_custom_keys():
+    assert find_order_id({'code': 0, 'msg': 'ok'}) is None
+    assert find_order_id('not json') is None
+    assert find_order_id({'data': {'bookingId': 'D4'}}, keys=('bookingId',)) == 'D4'
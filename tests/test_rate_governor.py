@@ -0,0 +1,102 @@
+import time
+
+import pytest
+
+from utils.rate_governor import MIN_RATE, RateGovernor
+
+
+def test_errors_halve_the_rate_down_to_min():
+    governor = RateGovernor(base_rate=1, max_rate=4, min_rate=0.5)
+    governor.observe(status=429)
+    assert governor.rate == 2
+    governor.observe(status=503)
+    governor.observe(ok=False)
+    assert governor.rate == 0.5
+    assert governor.stats['backoffs'] == 3
+
+
+def test_healthy_responses_recover_up_to_max():
+    governor = RateGovernor(max_rate=4, increase=1)
+    governor.observe(status=500)
+    for _ in range(5):
+        governor.observe(status=200, latency=0.1)
+    assert governor.rate == 4
+
+
+def test_latency_spike_backs_off():
+    governor = RateGovernor(max_rate=4)
+    for _ in range(10):
+        governor.observe(latency=0.1)
+    governor.observe(latency=2.0)
+    assert governor.rate < 4
+    assert governor.stats['backoffs'] == 1
+
+
+def test_rate_capped_at_base_outside_release_windows():
+    governor = RateGovernor(base_rate=1, max_rate=4)
+    assert governor.effective_rate() == 1
+    governor.add_release_window(time.time(), before=10, after=10)
+    assert governor.in_release_window()
+    assert governor.effective_rate() == 4
+    assert not governor.in_release_window(time.time() + 60)
+
+
+def test_expired_windows_are_dropped():
+    governor = RateGovernor()
+    release_at = time.time() + 100
+    governor.add_release_window(time.time() - 100, before=10, after=10)
+    governor.add_release_window(release_at)
+    governor.add_release_window(release_at)
+    assert len(governor._windows) == 1
+
+
+def test_retry_after_pauses_acquire(monkeypatch):
+    governor = RateGovernor()
+    governor.observe(status=429, retry_after='2')
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        governor._paused_until = 0.0
+
+    monkeypatch.setattr(time, 'sleep', sleep)
+    waited = governor.acquire()
+    # 第一次等待覆盖 Retry-After 的暂停时间（加最多 10% 的抖动），之后立即取得令牌
+    assert len(slept) == 1 and 1.5 < slept[0] <= 2.2
+    assert waited == slept[0]
+    assert governor.stats['acquired'] == 1
+
+
+def test_acquire_waits_for_a_token(monkeypatch):
+    governor = RateGovernor(base_rate=2, burst=1)
+    slept = []
+    monkeypatch.setattr(time, 'sleep', slept.append)
+    monkeypatch.setattr(time, 'monotonic', lambda: 100.0)
+    governor._updated = 100.0
+    assert governor.acquire() == 0.0
+    governor._tokens = 0.5
+    # 时间不前进时令牌不会补充，第二次等待后手动补满
+    monkeypatch.setattr(time, 'sleep', lambda seconds: (slept.append(seconds), setattr(governor, '_tokens', 1)))
+    governor.acquire()
+    assert 0.25 <= slept[0] <= 0.25 * 1.1
+
+
+def test_configure_keeps_rate_within_bounds():
+    governor = RateGovernor(max_rate=4)
+    governor.configure({'poll_rate': 2, 'poll_rate_max': 3, 'poll_rate_min': 0.2})
+    assert (governor.base_rate, governor.max_rate, governor.min_rate, governor.rate) == (2, 3, 0.2, 3)
+
+
+@pytest.mark.parametrize('cfg', [{'poll_rate_min': 0}, {'poll_rate_min': -1}, {'poll_rate': 0, 'poll_rate_min': 0}])
+def test_configure_clamps_non_positive_rates(cfg, monkeypatch):
+    governor = RateGovernor().configure(cfg)
+    assert governor.min_rate >= MIN_RATE and governor.base_rate >= MIN_RATE
+    for _ in range(50):
+        governor.observe(status=503)
+    assert governor.rate >= MIN_RATE
+    # 退避到最低速率后 acquire 仍能算出有限的等待时间
+    governor._tokens = 0
+    slept = []
+    monkeypatch.setattr(time, 'sleep', lambda seconds: (slept.append(seconds), setattr(governor, '_tokens', 1)))
+    governor.acquire()
+    assert 0 < slept[0] < float('inf')
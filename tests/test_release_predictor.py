@@ -0,0 +1,65 @@
+from datetime import datetime
+
+import pytest
+
+from utils.release_predictor import ReleasePredictor, sighting_offset
+
+# 2024-12-30 是周一
+MONDAY = datetime(2024, 12, 30, 12, 30).timestamp()
+TUESDAY = datetime(2024, 12, 31, 12, 30).timestamp()
+
+
+def run(release_at=MONDAY, offset=1.0, server_offset=None, started_before=60, venue='A', retries=3):
+    return {
+        'release_at': release_at, 'started_at': release_at - started_before, 'retries': retries,
+        'first_available_offset': offset, 'first_available_server_offset': server_offset,
+        'target': f"{venue}/2025-01-01/18:00-19:00/-",
+    }
+
+
+def test_sighting_offset_prefers_server_clock():
+    assert sighting_offset(run(offset=1.0, server_offset=0.4)) == 0.4
+    assert sighting_offset(run(offset=1.0)) == 1.0
+
+
+def test_sighting_offset_ignores_runs_started_after_release():
+    assert sighting_offset(run(started_before=-5)) is None
+    assert sighting_offset({**run(), 'release_at': None}) is None
+
+
+def test_sighting_offset_ignores_slots_open_on_the_first_check():
+    # 当天的场次或上午开始的监视：第一次检查就有余票，不是放票时间
+    assert sighting_offset(run(offset=-4 * 3600.0, started_before=5 * 3600, retries=0)) is None
+    assert sighting_offset(run(offset=-4 * 3600.0, started_before=5 * 3600, retries=200)) is None
+    assert sighting_offset(run(offset=-1.0, retries=0)) is None
+    assert sighting_offset(run(offset=-1.0)) == -1.0
+
+
+def test_early_sightings_do_not_widen_the_burst_window():
+    runs = [run(offset=o) for o in (0.5, 1.0, 1.5)] + [run(offset=-3 * 3600.0, started_before=4 * 3600)] * 2
+    before, after = ReleasePredictor(runs).burst_window('A', 0, margin=5)
+    assert before < 5
+    assert after < 7
+
+
+def test_predict_by_venue_and_weekday():
+    runs = [run(offset=o) for o in (0.0, 1.0, 2.0)] + [run(release_at=TUESDAY, offset=30.0)] * 3
+    prediction = ReleasePredictor(runs).predict('A', 0)
+    assert (prediction['scope'], prediction['n'], prediction['p50']) == ('A 周一', 3, 1.0)
+    assert prediction['p10'] <= prediction['p50'] <= prediction['p90']
+
+
+def test_predict_falls_back_to_venue_then_all():
+    runs = [run(offset=1.0), run(release_at=TUESDAY, offset=2.0), run(venue='B', offset=3.0)]
+    predictor = ReleasePredictor(runs, min_samples=2)
+    assert predictor.predict('A', 0)['scope'] == 'A'
+    assert predictor.predict('C', 0)['scope'] == 'all'
+    assert ReleasePredictor(runs, min_samples=4).predict('A', 0) is None
+
+
+def test_burst_window_adds_margin():
+    predictor = ReleasePredictor([run(offset=o) for o in (-2.0, -2.0, -2.0)])
+    before, after = predictor.burst_window('A', 0, margin=5)
+    assert before == pytest.approx(7.0)
+    assert after == pytest.approx(3.0)
+    assert ReleasePredictor([]).burst_window('A', 0) is None
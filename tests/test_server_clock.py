@@ -0,0 +1,41 @@
+from email.utils import formatdate
+
+import pytest
+
+from utils import server_clock
+from utils.server_clock import ServerClock
+
+
+class Page:
+    def __init__(self, url):
+        self.url = url
+        self.request = self
+
+    def head(self, url):
+        raise AssertionError(f"sampled {url}")
+
+
+def test_observations_narrow_the_offset():
+    clock = ServerClock()
+    clock.observe(formatdate(1000.0, usegmt=True), sent=990.2, received=990.4)
+    clock.observe(formatdate(1001.0, usegmt=True), sent=991.0, received=991.1)
+    assert clock.samples == 2
+    # 两个样本的区间 [9.6, 10.8] 和 [9.9, 11.0] 取交集
+    assert clock.offset == pytest.approx(10.35)
+    assert clock.uncertainty == pytest.approx(0.45)
+
+
+def test_sample_skips_pages_off_the_booking_host():
+    clock = ServerClock('ehall.example.com')
+    clock.sample(Page('https://authserver.example.com/login'))
+    clock.sample(Page('about:blank'))
+    assert clock.samples == 0
+
+
+def test_shared_clock_restarts_for_another_host(monkeypatch):
+    monkeypatch.setattr(server_clock, '_shared', None)
+    first = server_clock.shared_server_clock('ehall.example.com')
+    assert server_clock.shared_server_clock() is first
+    assert server_clock.shared_server_clock('ehall.example.com') is first
+    second = server_clock.shared_server_clock('127.0.0.1:8000')
+    assert second is not first and second.host == '127.0.0.1:8000'
@@ -0,0 +1,95 @@
+import pytest
+
+from utils.slots import SlotWindow, parse_slot, slots_from_json
+
+
+def test_parse_slot_ascii_brackets():
+    slot = parse_slot('18:00-19:00(可预约)')
+    assert (slot.label, slot.start, slot.end, slot.status) == ('18:00-19:00', 18 * 60, 19 * 60, '可预约')
+    assert slot.remaining is None
+    assert slot.available
+
+
+def test_parse_slot_full_width_brackets():
+    slot = parse_slot('18:00-19:00（可预约）')
+    assert slot.status == '可预约'
+    assert slot.available
+
+
+def test_parse_slot_remaining():
+    slot = parse_slot('8:00-9:30(可预约 剩余3)')
+    assert (slot.start, slot.duration, slot.remaining) == (8 * 60, 90, 3)
+    assert slot.available
+
+
+def test_parse_slot_none_left_is_not_available():
+    slot = parse_slot('18:00-19:00(可预约 余0)')
+    assert slot.remaining == 0
+    assert not slot.available
+
+
+def test_parse_slot_without_status():
+    slot = parse_slot('18:00-19:00')
+    assert slot.status == ''
+    assert not slot.available
+
+
+def test_parse_slot_not_a_slot():
+    assert parse_slot('篮球场') is None
+
+
+def _slots(*labels):
+    return [parse_slot(label, index) for index, label in enumerate(labels)]
+
+
+def test_window_parse_string_and_dict():
+    window = SlotWindow.parse('18:00-21:00')
+    assert (window.earliest, window.latest, window.duration, window.prefer) == (18 * 60, 21 * 60, None, 'later')
+    window = SlotWindow.parse({'start': '18:00-21:00', 'duration': 60, 'prefer': 'earlier'})
+    assert (window.duration, window.prefer) == (60, 'earlier')
+
+
+@pytest.mark.parametrize('spec', ['evening', {'start': '18:00'}, {'start': '18:00-21:00', 'prefer': 'soon'}])
+def test_window_parse_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        SlotWindow.parse(spec)
+
+
+def test_window_best_prefers_later_or_earlier():
+    slots = _slots('17:00-18:00(可预约)', '18:00-19:00(可预约)', '20:00-21:00(可预约)', '22:00-23:00(可预约)')
+    assert SlotWindow.parse('18:00-21:00').best(slots).label == '20:00-21:00'
+    assert SlotWindow.parse({'start': '18:00-21:00', 'prefer': 'earlier'}).best(slots).label == '18:00-19:00'
+
+
+def test_window_best_skips_unavailable_and_wrong_duration():
+    slots = _slots('18:00-19:00(可预约)', '19:00-21:00(可预约)', '20:00-21:00(已约满)', '20:30-21:30(可预约 余0)')
+    assert SlotWindow.parse('18:00-21:00').best(slots).label == '19:00-21:00'
+    assert SlotWindow.parse({'start': '18:00-21:00', 'duration': 60}).best(slots).label == '18:00-19:00'
+    assert SlotWindow.parse('06:00-08:00').best(slots) is None
+
+
+def test_window_best_tie_goes_to_more_remaining():
+    slots = _slots('20:00-21:00(可预约 剩余1)', '20:00-21:00(可预约 剩余4)', '20:00-21:00(可预约)')
+    assert SlotWindow.parse('18:00-21:00').best(slots).index == 1
+
+
+def test_slots_from_json_records_with_separate_status():
+    data = {'code': 0, 'data': {'list': [
+        {'time': '18:00-19:00', 'status': '可预约', 'remain': 2},
+        {'time': '19:00-20:00', 'status': '已约满', 'remain': 0},
+    ]}}
+    slots = slots_from_json(data)
+    assert [(s.label, s.status, s.remaining) for s in slots] == [
+        ('18:00-19:00', '可预约', 2), ('19:00-20:00', '已约满', 0)]
+    assert [s.available for s in slots] == [True, False]
+
+
+def test_slots_from_json_label_with_status():
+    slots = slots_from_json([{'name': '18:00-19:00(可预约)', 'id': 7}])
+    assert [(s.label, s.status) for s in slots] == [('18:00-19:00', '可预约')]
+
+
+def test_slots_from_json_dict_of_records_and_no_slots():
+    data = {'a': {'period': '08:00-09:00', 'state': '可预约', 'left': 1}, 'b': {'period': '09:00-10:00'}}
+    assert [(s.label, s.remaining) for s in slots_from_json(data)] == [('08:00-09:00', 1), ('09:00-10:00', None)]
+    assert slots_from_json({'code': 0, 'data': []}) == []
@@ -0,0 +1,17 @@
+from utils.strategy_racer import BookingGuard
+
+
+def test_booking_guard_claims_once_until_released():
+    guard = BookingGuard()
+    key = ('A', '2025-01-01', '18:00-19:00')
+    assert guard.claim(key)
+    assert not guard.claim(key)
+    assert guard.claim(('A', '2025-01-01', '19:00-20:00'))
+    guard.release(key)
+    assert guard.claim(key)
+
+
+def test_booking_guard_release_unknown_key():
+    guard = BookingGuard()
+    guard.release('missing')
+    assert guard.claim('missing')
@@ -0,0 +1,24 @@
+from datetime import date
+
+import pytest
+
+from pages.ticket_page import resolve_date
+
+TODAY = date(2024, 12, 31)
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('today', '2024-12-31'),
+    ('tomorrow', '2025-01-01'),
+    ('+0', '2024-12-31'),
+    ('+3', '2025-01-03'),
+    (' 2025-02-01 ', '2025-02-01'),
+])
+def test_resolve_date(value, expected):
+    assert resolve_date(value, today=TODAY) == expected
+
+
+@pytest.mark.parametrize('value', ['yesterday', '-1', '+x', '2025/02/01', '2025-02-30'])
+def test_resolve_date_rejects(value):
+    with pytest.raises(ValueError):
+        resolve_date(value, today=TODAY)
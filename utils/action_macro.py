@@ -0,0 +1,194 @@
+import os
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from playwright.sync_api import Page, TimeoutError
+
+from utils.json_file import read_json, update_json
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+MACRO_FILE = os.path.join('config', 'macros.json')
+
+# 在页面内记录每次点击的元素路径、文本和路由，以及页面自己加入的阶段标记
+_RECORD_JS = '''() => {
+    const pathOf = (el) => {
+        const parts = [];
+        while (el && el.nodeType === 1 && el !== document.body) {
+            if (el.id) {
+                parts.unshift('#' + CSS.escape(el.id));
+                return parts.join(' > ');
+            }
+            const index = [...el.parentElement.children].indexOf(el) + 1;
+            parts.unshift(`${el.tagName.toLowerCase()}:nth-child(${index})`);
+            el = el.parentElement;
+        }
+        parts.unshift('body');
+        return parts.join(' > ');
+    };
+    window.__gymMacro = {events: [], started: performance.now()};
+    performance.setResourceTimingBufferSize(1000);
+    if (window.__gymMacroInstalled) return;
+    window.__gymMacroInstalled = true;
+    document.addEventListener('click', (e) => {
+        if (!window.__gymMacro) return;
+        const el = e.target.closest('div.element, label, button, img, a') || e.target;
+        window.__gymMacro.events.push({
+            type: 'click', at: performance.now(), selector: pathOf(el),
+            text: (el.textContent || '').trim().slice(0, 60),
+            route: location.pathname + location.hash.split('?')[0],
+        });
+    }, true);
+}'''
+
+_MARK_JS = '''(stage) => window.__gymMacro && window.__gymMacro.events.push({type: 'mark', stage, at: performance.now()})'''
+
+_STOP_JS = '''() => {
+    const macro = window.__gymMacro;
+    window.__gymMacro = null;
+    if (!macro) return null;
+    const requests = performance.getEntriesByType('resource')
+        .filter(e => ['xmlhttprequest', 'fetch'].includes(e.initiatorType) && e.startTime >= macro.started)
+        .map(e => ({path: new URL(e.name).pathname, start: e.startTime, end: e.responseEnd}));
+    return {events: macro.events, requests, stopped: performance.now()};
+}'''
+
+# 回放时一次完成状态校验和定位：路由一致、元素存在且文本一致、可见且没有被遮挡，返回点击坐标
+_LOCATE_JS = '''(step) => {
+    if (location.pathname + location.hash.split('?')[0] !== step.route) return null;
+    const el = document.querySelector(step.selector);
+    if (!el || !(el.textContent || '').includes(step.text)) return null;
+    let rect = el.getBoundingClientRect();
+    if (!rect.width || !rect.height) return null;
+    if (rect.top < 0 || rect.left < 0 || rect.bottom > innerHeight || rect.right > innerWidth) {
+        el.scrollIntoView({block: 'center', inline: 'center'});
+        rect = el.getBoundingClientRect();
+    }
+    const x = rect.left + rect.width / 2, y = rect.top + rect.height / 2;
+    const hit = document.elementFromPoint(x, y);
+    if (!hit || !(el === hit || el.contains(hit))) return null;
+    return [x, y];
+}'''
+
+
+class MacroDrift(Exception):
+    """The page is not in the state the macro was recorded in."""
+
+
+def _template(value: str, values: Dict[str, str]) -> str:
+    for name, actual in values.items():
+        if actual:
+            value = value.replace(actual, '{' + name + '}')
+    return value
+
+
+def _fill(value: str, values: Dict[str, str]) -> str:
+    for name, actual in values.items():
+        value = value.replace('{' + name + '}', actual or '')
+    return value
+
+
+class MacroStore:
+    """宏文件 config/macros.json：键 -> 录制的步骤列表"""
+
+    def __init__(self, macro_file: str = MACRO_FILE):
+        self.macro_file = macro_file
+        self.macros = read_json(macro_file)
+
+    def get(self, key: str) -> Optional[List[dict]]:
+        return self.macros.get(key)
+
+    def put(self, key: str, steps: List[dict]) -> None:
+        self.macros[key] = steps
+        self._save(lambda macros: macros.__setitem__(key, steps))
+
+    def discard(self, key: str) -> None:
+        if self.macros.pop(key, None) is not None:
+            self._save(lambda macros: macros.pop(key, None))
+
+    def _save(self, change) -> None:
+        # 重新读取文件后只改动这一个键，保留其他页面/任务同时录制的宏
+        try:
+            self.macros = update_json(self.macro_file, change)
+        except OSError as e:
+            logger.warning(f"Failed to save macros: {str(e)}")
+
+
+class MacroRecording:
+    """录制一段页面对象操作：点击了哪些元素、每次点击后等到了哪个接口"""
+
+    def __init__(self, page: Page, values: Dict[str, str]):
+        self.page = page
+        # 目标相关的文本（日期、时间段）录制成占位符，回放时按本次目标填入
+        self.values = values
+
+    def start(self) -> None:
+        self.page.evaluate(_RECORD_JS)
+
+    def mark(self, stage: str) -> None:
+        self.page.evaluate(_MARK_JS, stage)
+
+    def stop(self) -> Optional[List[dict]]:
+        """结束录制并返回步骤；有阶段没有录到点击（例如中途整页跳转）时返回 None"""
+        data = self.page.evaluate(_STOP_JS)
+        if not data:
+            return None
+        stage = None
+        marked, clicks = [], []
+        for event in data['events']:
+            if event['type'] == 'mark':
+                stage = event['stage']
+                marked.append(stage)
+            elif stage:
+                clicks.append(dict(event, stage=stage))
+        if not clicks or set(marked) - {click['stage'] for click in clicks}:
+            return None
+        steps = []
+        for i, click in enumerate(clicks):
+            until = clicks[i + 1]['at'] if i + 1 < len(clicks) else data['stopped']
+            # 这次点击之后、下一次点击之前完成的最后一个接口，就是下一步真正等待的那个
+            finished = [r for r in data['requests'] if click['at'] <= r['start'] and 0 < r['end'] <= until]
+            response = max(finished, key=lambda r: r['end'])['path'] if finished else None
+            steps.append({
+                'stage': click['stage'],
+                'selector': click['selector'],
+                'text': _template(click['text'], self.values),
+                'route': _template(click['route'], self.values),
+                'response': response,
+            })
+        return steps
+
+
+class MacroPlayer:
+    """按录制的步骤回放：每步一次页面内定位校验，然后直接按坐标点击"""
+
+    def __init__(self, page: Page, values: Dict[str, str], timeout_seconds: float = 5):
+        self.page = page
+        self.values = values
+        self.timeout_seconds = timeout_seconds
+
+    def locate(self, step: dict) -> Tuple[float, float]:
+        """等待页面进入录制时的状态，返回点击坐标；超时则抛出 MacroDrift"""
+        target = dict(step, text=_fill(step['text'], self.values), route=_fill(step['route'], self.values))
+        try:
+            handle = self.page.wait_for_function(_LOCATE_JS, arg=target, polling='raf',
+                                                 timeout=self.timeout_seconds * 1000)
+        except TimeoutError:
+            raise MacroDrift(f"'{target['text']}' not found at {target['selector']} on {target['route']}")
+        x, y = handle.json_value()
+        return x, y
+
+    def click(self, step: dict, x: float, y: float) -> None:
+        """点击，并等待录制时这一步之后的接口响应"""
+        if not step.get('response'):
+            self.page.mouse.click(x, y)
+            return
+        path = step['response']
+        try:
+            with self.page.expect_response(lambda r: urlparse(r.url).path == path,
+                                           timeout=self.timeout_seconds * 1000):
+                self.page.mouse.click(x, y)
+        except TimeoutError:
+            # 下一步的定位校验会发现页面是否偏离
+            logger.warning(f"Macro step {step['stage']}: no response from {path}")
@@ -0,0 +1,260 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+
+from playwright.sync_api import APIResponse, BrowserContext, Route
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+CACHE_ROOT = os.path.join('config', 'cache')
+
+# 只拦截静态资源的地址，接口请求不经过 Python（路由按正则在浏览器端匹配）
+STATIC_URL_RE = re.compile(r'\.(?:js|mjs|css|png|jpe?g|gif|svg|webp|ico|woff2?|ttf|otf)(?:[?#]|$)', re.IGNORECASE)
+_STATIC_TYPES = ('script', 'stylesheet', 'image', 'font')
+# 这些响应头描述的是传输而不是内容，缓存的响应体已解压
+_DROPPED_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive',
+                    'set-cookie', 'date')
+
+
+def _freshness(headers: Dict[str, str], now: float) -> Optional[float]:
+    """按 Cache-Control / Expires 计算过期时间；不允许保存时返回 None"""
+    cache_control = headers.get('cache-control', '').lower()
+    if 'no-store' in cache_control or 'private' in cache_control:
+        return None
+    if 'no-cache' in cache_control:
+        return now
+    match = re.search(r'max-age=(\d+)', cache_control)
+    if match:
+        return now + int(match.group(1))
+    if headers.get('expires'):
+        try:
+            return parsedate_to_datetime(headers['expires']).timestamp()
+        except (TypeError, ValueError):
+            return now
+    # 没有缓存指示时保存，但每次使用前先验证
+    return now
+
+
+class AssetCache:
+    """Persistent on-disk cache of static assets (JS bundles, CSS, images, fonts), one directory per profile.
+
+    Installed as a context route, so it works with the pool's throwaway contexts
+    and survives across runs. The cost: while any route is installed, Chromium
+    turns its HTTP cache off for the context, so every asset request, reloads
+    included, makes a round trip through Python; responses fulfilled by the
+    route never enter the browser cache either. With ``serve_reloads`` off the
+    route is removed after the first page load of the context, so later loads
+    go back to the browser (the first of them over the network, the rest from
+    its cache); bench/bench_cache.py compares both. Entries follow the
+    response's Cache-Control/Expires; stale ones are revalidated with
+    If-None-Match / If-Modified-Since. URLs matching ``pin`` (immutable, hashed
+    bundles) are served without revalidation. Eviction drops entries not used
+    for ``max_age_days`` and then the least recently used ones above ``max_bytes``,
+    pinned entries last.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 100 * 1024 * 1024, max_age_days: float = 30,
+                 pin: Optional[List[str]] = None, serve_reloads: bool = True):
+        self.directory = directory
+        self.serve_reloads = serve_reloads
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 86400
+        self.pin = [re.compile(pattern) for pattern in pin or []]
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stored': 0, 'evicted': 0, 'bytes_served': 0}
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[str, Any]] = {}
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+        self.evict()
+
+    @classmethod
+    def from_config(cls, cfg: dict, profile: Optional[str] = None) -> Optional['AssetCache']:
+        """配置了 asset_cache 时按账号（profile）创建缓存，否则返回 None"""
+        if not cfg.get('asset_cache'):
+            return None
+        return cls(os.path.join(CACHE_ROOT, profile or 'default'),
+                   max_bytes=int(float(cfg.get('asset_cache_mb', 100)) * 1024 * 1024),
+                   max_age_days=float(cfg.get('asset_cache_max_age_days', 30)),
+                   pin=cfg.get('asset_cache_pin'),
+                   serve_reloads=bool(cfg.get('asset_cache_reloads', True)))
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, key + suffix)
+
+    def _load_index(self) -> None:
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                meta['used_at'] = os.path.getmtime(self._path(name[:-5], '.body'))
+            except (OSError, ValueError):
+                continue
+            self._index[name[:-5]] = meta
+
+    @property
+    def size(self) -> int:
+        return sum(meta['size'] for meta in self._index.values())
+
+    def hit_rate(self) -> Optional[float]:
+        requests = self.stats['hits'] + self.stats['revalidated'] + self.stats['misses']
+        return (self.stats['hits'] + self.stats['revalidated']) / requests if requests else None
+
+    def install(self, context: BrowserContext) -> 'AssetCache':
+        context.route(STATIC_URL_RE, self._handle)
+        context.on('close', lambda _: self._log_stats())
+        if not self.serve_reloads:
+            uninstalled: List[bool] = []
+
+            def uninstall(_) -> None:
+                # 只在 context 的第一次页面加载时使用，之后交还给浏览器缓存
+                if uninstalled:
+                    return
+                uninstalled.append(True)
+                try:
+                    context.unroute(STATIC_URL_RE, self._handle)
+                except Exception as e:
+                    logger.debug(f"Failed to remove the asset cache route: {e}")
+
+            context.on('page', lambda page: page.once('load', uninstall))
+        return self
+
+    def _log_stats(self) -> None:
+        rate = self.hit_rate()
+        if rate is not None:
+            logger.info(f"Asset cache {self.directory}: hit rate {rate:.0%} {self.stats}")
+
+    def _handle(self, route: Route) -> None:
+        request = route.request
+        if request.method != 'GET' or request.resource_type not in _STATIC_TYPES:
+            route.fallback()
+            return
+        key = hashlib.sha1(request.url.encode('utf-8')).hexdigest()
+        now = time.time()
+        with self._lock:
+            meta = self._index.get(key)
+        if meta and (meta['pinned'] or meta['expires_at'] > now):
+            body = self._read(key)
+            if body is not None:
+                self._serve(route, key, meta, body, 'hits')
+                return
+
+        headers = dict(request.headers)
+        if meta and meta['headers'].get('etag'):
+            headers['if-none-match'] = meta['headers']['etag']
+        if meta and meta['headers'].get('last-modified'):
+            headers['if-modified-since'] = meta['headers']['last-modified']
+        response = self._fetch(route, headers)
+        if response is None:
+            return
+
+        if response.status == 304 and meta:
+            body = self._read(key)
+            if body is not None:
+                meta['expires_at'] = _freshness(response.headers, now) or now
+                self._write_meta(key, meta)
+                self._serve(route, key, meta, body, 'revalidated')
+                return
+            # 确认未变化时本地副本已被删除（如另一进程淘汰），去掉条件请求头重新下载，不能把 304 交给页面
+            response = self._fetch(route, dict(request.headers))
+            if response is None:
+                return
+
+        body = response.body()
+        self.stats['misses'] += 1
+        expires_at = _freshness(response.headers, now) if response.status == 200 else None
+        if expires_at is not None:
+            self._store(key, request.url, response.status, response.headers, body, expires_at)
+        route.fulfill(response=response, body=body)
+
+    def _fetch(self, route: Route, headers: Dict[str, str]) -> Optional[APIResponse]:
+        """向服务器请求；失败时交给后面的路由/浏览器处理并返回 None"""
+        try:
+            return route.fetch(headers=headers)
+        except Exception as e:
+            logger.debug(f"Asset cache fetch failed for {route.request.url}: {e}")
+            route.fallback()
+            return None
+
+    def _serve(self, route: Route, key: str, meta: Dict[str, Any], body: bytes, outcome: str) -> None:
+        self.stats[outcome] += 1
+        self.stats['bytes_served'] += len(body)
+        try:
+            os.utime(self._path(key, '.body'))
+        except OSError:
+            pass
+        meta['used_at'] = time.time()
+        route.fulfill(status=meta['status'], headers=meta['headers'], body=body)
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key, '.body'), 'rb') as f:
+                return f.read()
+        except OSError:
+            with self._lock:
+                self._index.pop(key, None)
+            return None
+
+    def _write_meta(self, key: str, meta: Dict[str, Any]) -> None:
+        tmp = self._path(key, f'.json.{os.getpid()}.{threading.get_ident()}')
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({k: v for k, v in meta.items() if k != 'used_at'}, f, ensure_ascii=False)
+            os.replace(tmp, self._path(key, '.json'))
+        except OSError as e:
+            logger.warning(f"Failed to write asset cache entry: {e}")
+
+    def _store(self, key: str, url: str, status: int, headers: Dict[str, str], body: bytes,
+               expires_at: float) -> None:
+        meta = {
+            'url': url, 'status': status, 'size': len(body), 'expires_at': expires_at,
+            'pinned': any(pattern.search(url) for pattern in self.pin),
+            'headers': {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS},
+        }
+        # 先写内容再写元数据，并发进程读到元数据时内容一定完整
+        tmp = self._path(key, f'.body.{os.getpid()}.{threading.get_ident()}')
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(body)
+            os.replace(tmp, self._path(key, '.body'))
+        except OSError as e:
+            logger.warning(f"Failed to write asset cache entry: {e}")
+            return
+        self._write_meta(key, meta)
+        meta['used_at'] = time.time()
+        with self._lock:
+            self._index[key] = meta
+        self.stats['stored'] += 1
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> int:
+        """删除长期未用的条目，再按最近使用时间删除超出容量的条目，返回删除的条目数"""
+        now = time.time()
+        with self._lock:
+            # 固定的资源最后才按容量淘汰
+            entries = sorted(self._index.items(), key=lambda item: (item[1]['pinned'], item[1]['used_at']))
+            total = sum(meta['size'] for _, meta in entries)
+            doomed = []
+            for key, meta in entries:
+                if now - meta['used_at'] > self.max_age_seconds or total > self.max_bytes:
+                    doomed.append(key)
+                    total -= meta['size']
+            for key in doomed:
+                self._index.pop(key, None)
+        for key in doomed:
+            for suffix in ('.json', '.body'):
+                try:
+                    os.remove(self._path(key, suffix))
+                except OSError:
+                    pass
+        self.stats['evicted'] += len(doomed)
+        return len(doomed)
@@ -1,5 +1,5 @@
 import os
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from playwright.sync_api import Browser, Playwright
 
@@ -12,6 +12,43 @@ WINDOWS_CHANNEL_MAP = {
     "google chrome": "chrome",
 }
 
+# Chromium flags shared by the low-latency profiles: keep timers and renderers of
+# background tabs at full speed (multi-tab racing) and skip work a bot never needs.
+_LOW_LATENCY_ARGS = [
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-ipc-flooding-protection",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-component-extensions-with-background-pages",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-features=Translate,MediaRouter,OptimizationHints",
+    "--no-first-run",
+    "--mute-audio",
+]
+
+# Named launch profiles. ``args`` go to chromium.launch, ``context`` to new_context,
+# ``headless_shell`` prefers Playwright's chromium-headless-shell build for headless runs.
+LAUNCH_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {"args": [], "context": {}, "headless_shell": False},
+    "lowlatency": {
+        "args": _LOW_LATENCY_ARGS,
+        "context": {"viewport": {"width": 800, "height": 600}, "reduced_motion": "reduce"},
+        "headless_shell": False,
+    },
+    "lowlatency-shell": {
+        "args": _LOW_LATENCY_ARGS,
+        "context": {"viewport": {"width": 800, "height": 600}, "reduced_motion": "reduce"},
+        "headless_shell": True,
+    },
+}
+# Low-latency profiles are opt-in (GYM_LAUNCH_PROFILE) until bench/bench_launch.py has
+# measured them against ``default``; they also shrink the viewport to 800x600.
+DEFAULT_HEADLESS_PROFILE = "default"
+DEFAULT_HEADED_PROFILE = "default"
+
 
 def _detect_windows_default_channel() -> Optional[str]:
     """Detect default browser on Windows and map to Playwright channel."""
@@ -55,18 +92,48 @@ def _candidate_channels() -> List[str]:
     return channels
 
 
-def launch_browser(playwright: Playwright, *, headless: bool, slow_mo: int = 0) -> Browser:
-    """Launch browser preferring installed system channels before bundled Chromium."""
+def resolve_profile(headless: bool, profile: Optional[str] = None) -> str:
+    """Pick the launch profile: explicit name, then GYM_LAUNCH_PROFILE, then the mode default."""
+    name = (profile or os.getenv("GYM_LAUNCH_PROFILE", "")).strip().lower()
+    if not name:
+        name = DEFAULT_HEADLESS_PROFILE if headless else DEFAULT_HEADED_PROFILE
+    if name not in LAUNCH_PROFILES:
+        logger.warning(f"Unknown launch profile {name}, using default")
+        name = "default"
+    return name
+
+
+def context_options(headless: bool, profile: Optional[str] = None) -> Dict[str, Any]:
+    """Return the new_context options of the profile used for this mode."""
+    return dict(LAUNCH_PROFILES[resolve_profile(headless, profile)]["context"])
+
+
+def launch_browser(
+    playwright: Playwright, *, headless: bool, slow_mo: int = 0, profile: Optional[str] = None
+) -> Browser:
+    """Launch browser preferring installed system channels before bundled Chromium.
+
+    Headless runs with a ``headless_shell`` profile try Playwright's bundled
+    chromium-headless-shell first, which starts and reloads faster than a full
+    browser in headless mode.
+    """
+    name = resolve_profile(headless, profile)
+    settings = LAUNCH_PROFILES[name]
+    launch_kwargs = {"headless": headless, "slow_mo": slow_mo, "args": list(settings["args"])}
+
+    if headless and settings["headless_shell"]:
+        try:
+            logger.info(f"Trying bundled chromium-headless-shell (profile {name})")
+            return playwright.chromium.launch(**launch_kwargs)
+        except Exception as exc:
+            logger.warning(f"chromium-headless-shell unavailable, trying system channels: {exc}")
+
     for channel in _candidate_channels():
         try:
-            logger.info(f"Trying system browser channel: {channel}")
-            return playwright.chromium.launch(
-                headless=headless,
-                channel=channel,
-                slow_mo=slow_mo,
-            )
+            logger.info(f"Trying system browser channel: {channel} (profile {name})")
+            return playwright.chromium.launch(channel=channel, **launch_kwargs)
         except Exception as exc:
             logger.warning(f"Channel {channel} unavailable, trying next: {exc}")
 
     logger.warning("No system Chromium channel available, fallback to bundled browser.")
-    return playwright.chromium.launch(headless=headless, slow_mo=slow_mo)
+    return playwright.chromium.launch(**launch_kwargs)
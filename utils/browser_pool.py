@@ -0,0 +1,203 @@
+import os
+import weakref
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from playwright.sync_api import Browser, BrowserContext, Page, Playwright, sync_playwright
+
+from utils.asset_cache import AssetCache
+from utils.browser_launcher import context_options, launch_browser
+from utils.fault_injection import FaultInjector
+from utils.har import record_options, replay
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 登录态（cookies + localStorage）快照，供新的 context 直接复用
+STORAGE_STATE_FILE = os.path.join('config', 'storage_state.json')
+
+
+def _new_context(browser: Browser, storage_state_file: str, headless: bool, **options) -> BrowserContext:
+    """Create a context with the launch profile's options, seeded with the stored session."""
+    options = {**context_options(headless), **options}
+    if 'storage_state' not in options and os.path.exists(storage_state_file):
+        options['storage_state'] = storage_state_file
+    try:
+        return browser.new_context(**options)
+    except Exception as exc:
+        # 登录态文件损坏时退回到空白 context，由 LoginPage 重新登录
+        if options.pop('storage_state', None) is None:
+            raise
+        logger.warning(f"Failed to restore storage state, starting clean: {exc}")
+        return browser.new_context(**options)
+
+
+def _save_state(context: BrowserContext, storage_state_file: str) -> None:
+    """Persist the context's session so the next context starts logged in."""
+    try:
+        os.makedirs(os.path.dirname(storage_state_file), exist_ok=True)
+        context.storage_state(path=storage_state_file)
+    except Exception as exc:
+        logger.warning(f"Failed to save storage state: {exc}")
+
+
+class BrowserPool:
+    """Keep one Playwright driver and warm browsers alive for the lifetime of the GUI.
+
+    Each job gets a fresh context seeded from the stored session, so a repeated
+    query only pays for navigation instead of a browser launch and login.
+    Playwright's sync API is thread bound: use the pool from the thread that created it.
+    """
+
+    def __init__(self, storage_state_file: str = STORAGE_STATE_FILE):
+        self.storage_state_file = storage_state_file
+        self._playwright: Optional[Playwright] = None
+        self._browsers: Dict[bool, Browser] = {}
+
+    def _ensure_playwright(self) -> Playwright:
+        if self._playwright is None:
+            logger.info("Starting shared Playwright driver")
+            self._playwright = sync_playwright().start()
+        return self._playwright
+
+    def browser(self, headless: bool) -> Browser:
+        """Return the warm browser for the given mode, relaunching it if it was closed."""
+        browser = self._browsers.get(headless)
+        if browser is None or not browser.is_connected():
+            browser = launch_browser(self._ensure_playwright(), headless=headless)
+            self._browsers[headless] = browser
+        return browser
+
+    def new_context(self, headless: bool, **options) -> BrowserContext:
+        return _new_context(self.browser(headless), self.storage_state_file, headless, **options)
+
+    def save_state(self, context: BrowserContext) -> None:
+        _save_state(context, self.storage_state_file)
+
+    def close(self) -> None:
+        """Close every browser and stop the driver."""
+        for browser in self._browsers.values():
+            try:
+                browser.close()
+            except Exception as exc:
+                logger.debug(f"Browser already closed: {exc}")
+        self._browsers.clear()
+        if self._playwright is not None:
+            try:
+                self._playwright.stop()
+            except Exception as exc:
+                logger.debug(f"Failed to stop Playwright driver: {exc}")
+            self._playwright = None
+
+
+ContextHook = Callable[[BrowserContext], None]
+
+
+class ContextSetup:
+    """How open_page builds a context: its options, setup hooks and session file.
+
+    Kept per context (see ``context_setup``) so a context replaced later, e.g. by
+    MemoryWatchdog, gets the same routes and saves its session to the same file.
+    ``persist`` is False during HAR replay, when the session is never written.
+    """
+
+    def __init__(self, headless: bool, storage_state_file: str, options: Dict, hooks: List[ContextHook],
+                 persist: bool = True):
+        self.headless = headless
+        self.storage_state_file = storage_state_file
+        self.options = options
+        self.hooks = hooks
+        self.persist = persist
+
+    def new_context(self, browser: Browser, storage_state=None) -> BrowserContext:
+        """Create a context and run the setup hooks; ``storage_state`` overrides the stored session."""
+        options = dict(self.options)
+        if storage_state is not None:
+            options['storage_state'] = storage_state
+        context = _new_context(browser, self.storage_state_file, self.headless, **options)
+        try:
+            for hook in self.hooks:
+                hook(context)
+        except Exception:
+            context.close()
+            raise
+        _setups[context] = self
+        return context
+
+    def save_state(self, context: BrowserContext) -> None:
+        if self.persist:
+            _save_state(context, self.storage_state_file)
+
+
+_setups: 'weakref.WeakKeyDictionary[BrowserContext, ContextSetup]' = weakref.WeakKeyDictionary()
+
+
+def context_setup(context: BrowserContext) -> Optional[ContextSetup]:
+    """The setup a context was opened with by open_page, None for other contexts."""
+    return _setups.get(context)
+
+
+@contextmanager
+def _context_page(browser: Browser, setup: ContextSetup) -> Iterator[Page]:
+    """Yield a page of a new context built by ``setup``, then persist the session and close it."""
+    context = setup.new_context(browser)
+    closed: List[bool] = []
+    context.on('close', lambda _: closed.append(True))
+    try:
+        yield context.new_page()
+    finally:
+        # context 可能已被调用方关闭（如 MemoryWatchdog 回收），此时由调用方负责保存登录态
+        if not closed:
+            setup.save_state(context)
+        # 关闭 context 时才会写出录制的 HAR
+        context.close()
+
+
+@contextmanager
+def open_page(
+    *,
+    headless: bool,
+    pool: Optional[BrowserPool] = None,
+    har_record: Optional[str] = None,
+    har_replay: Optional[str] = None,
+    har_latency_ms: float = 0.0,
+    fault_profile: Optional[str] = None,
+    storage_state_file: Optional[str] = None,
+    asset_cache: Optional[AssetCache] = None,
+) -> Iterator[Page]:
+    """Yield a page in a fresh context, from the shared pool or a one-off browser.
+
+    The context's session is written back on exit so later runs can skip login.
+    ``har_record`` captures the session's traffic; ``har_replay`` serves it back
+    offline, in which case the stored session is neither read nor written so every
+    replay sees the same traffic. ``fault_profile`` installs a FaultInjector.
+    ``storage_state_file`` keeps the session in a separate file, e.g. one per account.
+    ``asset_cache`` serves static assets from a persistent AssetCache (not during replay).
+    """
+    options = record_options(har_record)
+    hooks: List[ContextHook] = []
+    if har_replay:
+        options['storage_state'] = None
+        hooks.append(lambda ctx: replay(ctx, har_replay, har_latency_ms))
+    if fault_profile:
+        # 后注册的路由先执行，故障注入位于 HAR 回放之前
+        hooks.append(FaultInjector.from_file(fault_profile, offline=bool(har_replay)).install)
+    if asset_cache is not None and not har_replay:
+        # 最后注册、最先执行：和浏览器缓存一样位于最靠近页面的一层，静态资源不经过故障注入
+        hooks.append(asset_cache.install)
+
+    if pool is not None:
+        setup = ContextSetup(headless, storage_state_file or pool.storage_state_file, options, hooks,
+                             persist=not har_replay)
+        with _context_page(pool.browser(headless), setup) as page:
+            yield page
+        return
+
+    setup = ContextSetup(headless, storage_state_file or STORAGE_STATE_FILE, options, hooks, persist=not har_replay)
+    with sync_playwright() as p:
+        browser = launch_browser(p, headless=headless)
+        try:
+            with _context_page(browser, setup) as page:
+                yield page
+        finally:
+            browser.close()
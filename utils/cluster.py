@@ -0,0 +1,362 @@
+import itertools
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.browser_pool import BrowserPool
+from utils.job_queue import BookingJob, JobQueue, run_job
+from utils.logger import setup_logger
+from utils.run_history import RunRecorder
+
+logger = setup_logger(__name__)
+
+DEFAULT_ADDRESS = 'tcp://127.0.0.1:8765'
+
+
+def parse_address(address: str) -> Tuple[int, Any]:
+    """'unix:///tmp/gym.sock' 或 'tcp://host:port'（也可省略 tcp://）-> (地址族, socket 地址)"""
+    if address.startswith('unix://'):
+        return socket.AF_UNIX, address[len('unix://'):]
+    if address.startswith('tcp://'):
+        address = address[len('tcp://'):]
+    host, _, port = address.rpartition(':')
+    if not port.isdigit():
+        raise ValueError(f"Unsupported address: {address}, it should be tcp://host:port or unix:///path")
+    return socket.AF_INET, (host or '127.0.0.1', int(port))
+
+
+class _Channel:
+    """JSON lines over a stream socket; ``send`` is thread safe."""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        if sock.family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = sock.makefile('r', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def send(self, message: Dict[str, Any]) -> None:
+        data = (json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            self.sock.sendall(data)
+
+    def __iter__(self):
+        for line in self._reader:
+            if line.strip():
+                yield json.loads(line)
+
+    def close(self) -> None:
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class _WorkerHandle:
+    """协调进程眼中的一个工作进程"""
+
+    def __init__(self, channel: _Channel, name: str, capacity: int, clock_offset: float, rtt: float):
+        self.channel = channel
+        self.name = name
+        self.capacity = capacity
+        # 协调进程时钟 - 工作进程时钟（秒）
+        self.clock_offset = clock_offset
+        self.rtt = rtt
+        self.running: Dict[int, BookingJob] = {}
+
+    @property
+    def free(self) -> int:
+        return self.capacity - len(self.running)
+
+
+class Coordinator:
+    """Hands the jobs of a JobQueue to worker agents over a socket.
+
+    Protocol (one JSON object per line):
+
+    - worker -> coordinator: ``time`` {t0} to sample the clock offset, then
+      ``hello`` {worker, capacity, token, clock_offset, rtt}; ``result`` {id,
+      success, unpaid, error, duration, stages, first_available_offset, detector, clock_offset}
+    - coordinator -> worker: ``time`` {t0, server}; ``job`` {id, cfg, release_at};
+      ``bye`` when every job has finished; ``error`` {message} before closing
+
+    Jobs are dispatched in release order when due on the coordinator's clock.
+    ``release_at`` is the nominal release time, i.e. an instant on the booking
+    server's clock, and is passed through unchanged: each worker converts it to
+    its own clock with its ServerClock only, so all workers burst at the same
+    instant without correcting twice. A worker that
+    disconnects fails its running jobs, which the queue retries elsewhere.
+    """
+
+    def __init__(self, job_queue: JobQueue, address: str = DEFAULT_ADDRESS, token: Optional[str] = None):
+        self.queue = job_queue
+        self.address = address
+        self.token = token
+        self.workers: List[_WorkerHandle] = []
+        self.results: List[Dict[str, Any]] = []
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._listener: Optional[socket.socket] = None
+
+    def start(self) -> 'Coordinator':
+        family, addr = parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(addr):
+            os.unlink(addr)
+        self._listener = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(addr)
+        self._listener.listen()
+        if family == socket.AF_INET:
+            # 端口为 0 时记下实际监听的端口
+            host, port = self._listener.getsockname()[:2]
+            self.address = f"tcp://{host}:{port}"
+        threading.Thread(target=self._accept, name='coordinator-accept', daemon=True).start()
+        logger.info(f"Coordinator listening on {self.address}")
+        return self
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                sock, _ = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(_Channel(sock),), daemon=True).start()
+
+    def _serve(self, channel: _Channel) -> None:
+        worker = None
+        try:
+            for message in channel:
+                kind = message.get('type')
+                if kind == 'time':
+                    channel.send({'type': 'time', 't0': message['t0'], 'server': time.time()})
+                elif kind == 'hello':
+                    if self.token and message.get('token') != self.token:
+                        channel.send({'type': 'error', 'message': 'invalid token'})
+                        logger.warning(f"Rejected worker {message.get('worker')}: invalid token")
+                        return
+                    worker = _WorkerHandle(channel, message['worker'], max(1, int(message.get('capacity', 1))),
+                                           float(message.get('clock_offset', 0.0)), float(message.get('rtt', 0.0)))
+                    with self._cond:
+                        self.workers.append(worker)
+                        self._cond.notify_all()
+                    logger.info(f"Worker {worker.name} joined: capacity {worker.capacity}, "
+                                f"clock offset {worker.clock_offset * 1000:+.1f}ms (rtt {worker.rtt * 1000:.1f}ms)")
+                elif kind == 'result' and worker:
+                    self._on_result(worker, message)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Connection to worker {worker.name if worker else '?'} failed: {str(e)}")
+        finally:
+            channel.close()
+            if worker:
+                self._drop(worker)
+
+    def _on_result(self, worker: _WorkerHandle, message: Dict[str, Any]) -> None:
+        with self._cond:
+            job = worker.running.pop(message['id'], None)
+            worker.clock_offset = float(message.get('clock_offset', worker.clock_offset))
+            self._cond.notify_all()
+        if job is None:
+            return
+        self.results.append({**message, 'worker': worker.name, 'job': str(job)})
+        logger.info(f"Job {job} on {worker.name}: {'success' if message['success'] else message.get('error')} "
+                    f"in {message.get('duration', 0):.2f}s")
+        self.queue.done(job, bool(message['success']), message.get('error', ''), unpaid=bool(message.get('unpaid')))
+
+    def _drop(self, worker: _WorkerHandle) -> None:
+        with self._cond:
+            if worker in self.workers:
+                self.workers.remove(worker)
+            lost = list(worker.running.values())
+            worker.running.clear()
+            self._cond.notify_all()
+        if lost:
+            logger.warning(f"Worker {worker.name} left with {len(lost)} running jobs, requeueing them")
+        else:
+            logger.info(f"Worker {worker.name} left")
+        for job in lost:
+            self.queue.done(job, False, f"worker {worker.name} lost")
+
+    def _assign(self, job: BookingJob) -> None:
+        """把任务交给空闲最多的工作进程；没有空闲时等待"""
+        while True:
+            with self._cond:
+                free = [w for w in self.workers if w.free > 0]
+                if not free:
+                    self._cond.wait()
+                    continue
+                worker = max(free, key=lambda w: (w.free, -w.rtt))
+                job_id = next(self._ids)
+                worker.running[job_id] = job
+            try:
+                worker.channel.send({'type': 'job', 'id': job_id, 'cfg': job.cfg, 'release_at': job.release_at})
+                logger.info(f"Assigned job {job} to {worker.name}")
+                return
+            except OSError:
+                # 连接已断开，_serve 会清理该工作进程，任务换一个工作进程
+                with self._cond:
+                    worker.running.pop(job_id, None)
+                    if worker in self.workers:
+                        self.workers.remove(worker)
+
+    def run(self) -> Dict[str, int]:
+        """分派全部任务，直到每个任务都成功或用完重试次数，返回各状态的任务数"""
+        try:
+            while True:
+                job = self.queue.get()
+                if job is None:
+                    break
+                self._assign(job)
+        finally:
+            self.stop()
+        return self.queue.summary()
+
+    def stop(self) -> None:
+        with self._cond:
+            workers = list(self.workers)
+        for worker in workers:
+            try:
+                worker.channel.send({'type': 'bye'})
+            except OSError:
+                pass
+        if self._listener:
+            self._listener.close()
+
+
+class WorkerAgent:
+    """Connects to a coordinator and books the jobs it is given.
+
+    ``capacity`` threads each own a BrowserPool (the sync API is thread bound).
+    The clock offset to the coordinator is measured NTP-style (the sample with
+    the smallest round trip wins) on connect and every ``resync_seconds``.
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, capacity: int = 1, name: Optional[str] = None,
+                 headless: bool = True, token: Optional[str] = None, resync_seconds: float = 60):
+        self.address = address
+        self.capacity = max(1, capacity)
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.headless = headless
+        self.token = token
+        self.resync_seconds = resync_seconds
+        self.clock_offset = 0.0
+        self.rtt = 0.0
+        self.completed = 0
+        self._channel: Optional[_Channel] = None
+        self._jobs: 'queue.Queue[Optional[Dict[str, Any]]]' = queue.Queue()
+        self._time_replies: 'queue.Queue[Dict[str, Any]]' = queue.Queue()
+        self._stopped = threading.Event()
+
+    def connect(self) -> 'WorkerAgent':
+        family, addr = parse_address(self.address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.connect(addr)
+        self._channel = _Channel(sock)
+        threading.Thread(target=self._read, name='worker-reader', daemon=True).start()
+        return self
+
+    def _read(self) -> None:
+        try:
+            for message in self._channel:
+                kind = message.get('type')
+                if kind == 'time':
+                    self._time_replies.put(message)
+                elif kind == 'job':
+                    self._jobs.put(message)
+                elif kind == 'error':
+                    logger.error(f"Coordinator refused worker {self.name}: {message.get('message')}")
+                    break
+                elif kind == 'bye':
+                    break
+        except (OSError, ValueError) as e:
+            logger.warning(f"Lost connection to coordinator: {str(e)}")
+        finally:
+            self._stopped.set()
+            for _ in range(self.capacity):
+                self._jobs.put(None)
+
+    def sync_clock(self, samples: int = 5) -> float:
+        """测量与协调进程的时钟偏移（协调进程时钟 - 本机时钟），取往返最短的一次"""
+        best = None
+        for _ in range(samples):
+            t0 = time.time()
+            self._channel.send({'type': 'time', 't0': t0})
+            # 丢弃之前超时的采样迟到的回复，只用这次采样的回复
+            deadline = time.monotonic() + 5
+            reply = None
+            while reply is None:
+                try:
+                    candidate = self._time_replies.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if candidate.get('t0') == t0:
+                    reply = candidate
+            if reply is None:
+                continue
+            t2 = time.time()
+            rtt = t2 - t0
+            if best is None or rtt < best[0]:
+                best = (rtt, reply['server'] - (t0 + t2) / 2)
+        if best:
+            self.rtt, self.clock_offset = best
+            logger.info(f"Clock offset to coordinator {self.clock_offset * 1000:+.1f}ms (rtt {self.rtt * 1000:.1f}ms)")
+        return self.clock_offset
+
+    def _work(self) -> None:
+        pool = BrowserPool()
+        try:
+            while True:
+                message = self._jobs.get()
+                if message is None:
+                    return
+                self._run(message, pool)
+        finally:
+            pool.close()
+
+    def _run(self, message: Dict[str, Any], pool: BrowserPool) -> None:
+        job = BookingJob(message['cfg'])
+        # 放票时间是服务器时钟上的时间（与协调进程的时区一致），由 TicketPage 按 ServerClock 换算成本机时间
+        job.release_at = float(message['release_at'])
+        recorder = RunRecorder.from_config('book', job.cfg)
+        logger.info(f"Starting job {job}")
+        error, unpaid = '', False
+        try:
+            outcome = run_job(job, pool, self.headless, recorder=recorder)
+            success, unpaid = outcome == 'success', outcome == 'unpaid'
+            if not success:
+                error = recorder.message or '未完成支付'
+        except Exception as e:
+            success, error = False, str(e)
+        try:
+            self._channel.send({
+                'type': 'result', 'id': message['id'], 'success': success, 'unpaid': unpaid, 'error': error,
+                'duration': recorder.duration, 'stages': recorder.stages,
+                'first_available_offset': recorder.first_available_offset,
+                'detector': recorder.detector, 'clock_offset': self.clock_offset,
+            })
+        except OSError as e:
+            logger.error(f"Failed to report job {job}: {str(e)}")
+        self.completed += 1
+
+    def run(self) -> int:
+        """连接、对时、注册，然后执行分到的任务直到协调进程结束，返回完成的任务数"""
+        if self._channel is None:
+            self.connect()
+        self.sync_clock()
+        self._channel.send({'type': 'hello', 'worker': self.name, 'capacity': self.capacity, 'token': self.token,
+                            'clock_offset': self.clock_offset, 'rtt': self.rtt})
+        threads = [threading.Thread(target=self._work, name=f"cluster-worker-{i}", daemon=True)
+                   for i in range(self.capacity)]
+        for thread in threads:
+            thread.start()
+        while not self._stopped.wait(self.resync_seconds):
+            self.sync_clock()
+        for thread in threads:
+            thread.join()
+        self._channel.close()
+        return self.completed
@@ -0,0 +1,134 @@
+import fnmatch
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from playwright.sync_api import BrowserContext, Route
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def add_fault_arguments(parser) -> None:
+    """Add the shared --fault-profile option to a script's parser."""
+    parser.add_argument('--fault-profile', metavar='PATH',
+                        help='Inject latency, drops and errors described by a JSON profile (stress testing only)')
+
+
+def sample_latency(spec: Any, rng: random.Random) -> float:
+    """Sample a delay in milliseconds from a latency spec.
+
+    A number is a fixed delay; a dict picks a distribution:
+    ``{"dist": "uniform", "min": 100, "max": 900}``,
+    ``{"dist": "normal", "mean": 500, "std": 150}`` or
+    ``{"dist": "lognormal", "median": 400, "sigma": 0.6}``.
+    """
+    if not spec:
+        return 0.0
+    if isinstance(spec, (int, float)):
+        return float(spec)
+    dist = spec.get('dist', 'fixed')
+    if dist == 'fixed':
+        value = spec.get('value', 0)
+    elif dist == 'uniform':
+        value = rng.uniform(spec['min'], spec['max'])
+    elif dist == 'normal':
+        value = rng.gauss(spec['mean'], spec['std'])
+    elif dist == 'lognormal':
+        value = spec['median'] * rng.lognormvariate(0, spec.get('sigma', 0.5))
+    else:
+        raise ValueError(f"Unknown latency distribution: {dist}")
+    return max(0.0, float(value))
+
+
+class FaultInjector:
+    """``context.route`` middleware driven by a profile file.
+
+    Each rule matches request URLs with a glob and may add latency, drop the
+    request, answer with a 5xx or trickle the body slowly. The first matching
+    rule wins; unmatched requests pass through untouched. Delays wait on the
+    driver (``page.wait_for_timeout``) rather than sleeping in the handler, so
+    the delays of concurrent requests overlap as they would on a real network.
+    ``offline`` (HAR replay) never fetches from the network: trickle rules
+    fall back to the next handler with only their latency applied.
+    """
+
+    def __init__(self, profile: Dict[str, Any], seed: Optional[int] = None, offline: bool = False):
+        self.name = profile.get('name', 'unnamed')
+        self.rules: List[Dict[str, Any]] = profile.get('rules', [])
+        self.rng = random.Random(seed if seed is not None else profile.get('seed'))
+        self.offline = offline
+        self.stats = {'requests': 0, 'delayed': 0, 'dropped': 0, 'errors': 0, 'trickled': 0, 'delay_ms': 0.0}
+
+    @classmethod
+    def from_file(cls, path: str, seed: Optional[int] = None, offline: bool = False) -> 'FaultInjector':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), seed=seed, offline=offline)
+
+    def install(self, context: BrowserContext) -> 'FaultInjector':
+        context.route('**/*', self._handle)
+        logger.warning(f"Fault injection profile '{self.name}' active with {len(self.rules)} rules")
+        return self
+
+    def _match(self, url: str) -> Optional[Dict[str, Any]]:
+        for rule in self.rules:
+            if fnmatch.fnmatch(url, rule.get('url', '*')):
+                return rule
+        return None
+
+    @staticmethod
+    def _wait(route: Route, seconds: float) -> bool:
+        """Delay this request only; returns False when its page went away meanwhile.
+
+        Each sync route handler runs in its own greenlet, so waiting through a
+        Playwright call lets the driver keep serving other requests, whereas
+        time.sleep would stall the whole dispatcher.
+        """
+        try:
+            page = route.request.frame.page
+        except Exception:
+            # 例如 Service Worker 的请求没有所属页面
+            time.sleep(seconds)
+            return True
+        try:
+            page.wait_for_timeout(seconds * 1000)
+        except Exception:
+            return False
+        return True
+
+    def _handle(self, route: Route) -> None:
+        rule = self._match(route.request.url)
+        if rule is None:
+            route.fallback()
+            return
+        self.stats['requests'] += 1
+
+        delay = sample_latency(rule.get('latency_ms'), self.rng)
+        if delay:
+            self.stats['delayed'] += 1
+            self.stats['delay_ms'] += delay
+            if not self._wait(route, delay / 1000):
+                return
+
+        if self.rng.random() < rule.get('drop_rate', 0):
+            self.stats['dropped'] += 1
+            route.abort('connectionreset')
+            return
+        if self.rng.random() < rule.get('error_rate', 0):
+            self.stats['errors'] += 1
+            route.fulfill(status=rule.get('error_status', 503), body='injected error')
+            return
+
+        trickle_kbps = rule.get('trickle_kbps')
+        if trickle_kbps and not self.offline:
+            # 真实地逐块发送做不到，按响应体大小折算成整体延迟
+            response = route.fetch()
+            body = response.body()
+            self.stats['trickled'] += 1
+            if self._wait(route, len(body) / (trickle_kbps * 1024)):
+                route.fulfill(response=response, body=body)
+            return
+
+        route.fallback()
@@ -0,0 +1,57 @@
+import os
+import time
+from typing import Any, Dict, Optional
+
+from playwright.sync_api import BrowserContext, Route
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def add_har_arguments(parser) -> None:
+    """Add the shared --record-har / --replay-har options to a script's parser."""
+    parser.add_argument('--record-har', metavar='PATH', help='Record the session traffic to a HAR file (.har or .zip)')
+    parser.add_argument('--replay-har', metavar='PATH', help='Serve all traffic from a recorded HAR file instead of the network')
+    parser.add_argument('--har-latency-ms', type=float, default=0.0, help='Extra latency added to every replayed request')
+
+
+def har_options(args) -> Dict[str, Any]:
+    """Translate parsed script arguments into open_page() keyword arguments."""
+    return {
+        'har_record': args.record_har,
+        'har_replay': args.replay_har,
+        'har_latency_ms': args.har_latency_ms,
+    }
+
+
+def record_options(har_path: Optional[str]) -> Dict[str, Any]:
+    """new_context options that record every request of the context into ``har_path``.
+
+    The HAR is only written when the context is closed.
+    """
+    if not har_path:
+        return {}
+    os.makedirs(os.path.dirname(har_path) or '.', exist_ok=True)
+    logger.info(f"Recording HAR to {har_path}")
+    return {'record_har_path': har_path, 'record_har_mode': 'full'}
+
+
+def replay(context: BrowserContext, har_path: str, latency_ms: float = 0.0) -> None:
+    """Serve the context's traffic from ``har_path``; requests missing from the HAR are aborted.
+
+    ``latency_ms`` delays every request before it is answered from the HAR. The sync
+    API runs route handlers on the driver loop, so the delay also serialises
+    concurrent requests; that matches a slow server closely enough for benchmarks.
+    """
+    if not os.path.exists(har_path):
+        raise FileNotFoundError(f"HAR file not found: {har_path}")
+    context.route_from_har(har_path, not_found='abort')
+    if latency_ms > 0:
+        def delay(route: Route) -> None:
+            time.sleep(latency_ms / 1000)
+            route.fallback()
+
+        # 后注册的处理器先执行，延迟后交给 HAR 处理器
+        context.route('**/*', delay)
+    logger.info(f"Replaying traffic from {har_path} (+{latency_ms:.0f} ms)")
@@ -0,0 +1,146 @@
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from playwright.sync_api import Page, Request
+
+from utils.logger import get_current_log_file, setup_logger
+
+logger = setup_logger(__name__)
+
+# CDP Performance.getMetrics 中关心的指标（秒或字节，均为累计值）
+METRIC_NAMES = ('TaskDuration', 'ScriptDuration', 'LayoutDuration', 'RecalcStyleDuration', 'JSHeapUsedSize', 'Nodes')
+
+
+def add_instrument_arguments(parser) -> None:
+    """Add the shared --instrument option to a script's parser."""
+    parser.add_argument('--instrument', action='store_true',
+                        help='Collect CDP performance metrics and a trace of the hot section next to the log')
+
+
+class RunInstrumentation:
+    """Per-run performance artifacts for the booking pipeline.
+
+    Collects CDP ``Performance.getMetrics`` after every main-frame navigation and
+    the network timing of every finished request. Playwright tracing is recorded
+    in chunks only around the hot section (select_date -> submit_booking), so the
+    trace stays small. ``save()`` writes ``<log>-perf.json`` and ``<log>-trace.zip``
+    next to the run's log file.
+    """
+
+    def __init__(self, page: Page, recorder=None, out_dir: str = 'logs'):
+        self.page = page
+        self.recorder = recorder
+        stem = os.path.splitext(get_current_log_file() or time.strftime('%Y-%m-%d-%H-%M-%S'))[0]
+        self.out_prefix = os.path.join(out_dir, stem)
+        self.navigations: List[Dict[str, Any]] = []
+        self.requests: List[Dict[str, Any]] = []
+        self._last_metrics: Dict[str, float] = {}
+        self._tracing = False
+        self._hot = False
+        self._chunks = 0
+        self.cdp = None
+        try:
+            self.cdp = page.context.new_cdp_session(page)
+            self.cdp.send('Performance.enable')
+        except Exception as exc:
+            # 非 Chromium 内核时没有 CDP，只保留网络耗时和 trace
+            logger.warning(f"CDP performance metrics unavailable: {exc}")
+        page.on('load', self._on_load)
+        page.on('requestfinished', self._on_request_finished)
+
+    def _metrics(self) -> Dict[str, float]:
+        if self.cdp is None:
+            return {}
+        result = self.cdp.send('Performance.getMetrics')
+        return {m['name']: m['value'] for m in result['metrics'] if m['name'] in METRIC_NAMES}
+
+    def _on_load(self, page: Page) -> None:
+        try:
+            metrics = self._metrics()
+        except Exception as exc:
+            logger.debug(f"Failed to read performance metrics: {exc}")
+            return
+        # 累计值相减得到本次导航期间的开销
+        delta = {name: value - self._last_metrics.get(name, 0.0) for name, value in metrics.items()
+                 if name.endswith('Duration')}
+        self._last_metrics = metrics
+        self.navigations.append({'url': page.url, 'at': time.time(), 'delta': delta, 'metrics': metrics})
+
+    def _on_request_finished(self, request: Request) -> None:
+        timing = request.timing
+        if timing.get('responseEnd', -1) < 0:
+            return
+        self.requests.append({
+            'url': request.url,
+            'method': request.method,
+            'resource_type': request.resource_type,
+            'total_ms': timing['responseEnd'],
+            'dns_ms': max(0.0, timing['domainLookupEnd'] - timing['domainLookupStart']),
+            'connect_ms': max(0.0, timing['connectEnd'] - timing['connectStart']),
+            'ttfb_ms': max(0.0, timing['responseStart'] - timing['requestStart']),
+        })
+
+    def start_hot_section(self, title: str = 'hot section') -> None:
+        """Start a trace chunk; calling it again while a chunk is open is a no-op."""
+        if self._hot:
+            return
+        try:
+            if not self._tracing:
+                self.page.context.tracing.start(snapshots=True, screenshots=False, sources=False)
+                self._tracing = True
+            self.page.context.tracing.start_chunk(title=title)
+            self._hot = True
+        except Exception as exc:
+            logger.warning(f"Failed to start tracing: {exc}")
+
+    def stop_hot_section(self) -> None:
+        """Close the open trace chunk and write it next to the log."""
+        if not self._hot:
+            return
+        self._hot = False
+        self._chunks += 1
+        suffix = '' if self._chunks == 1 else f"-{self._chunks}"
+        try:
+            self.page.context.tracing.stop_chunk(path=f"{self.out_prefix}-trace{suffix}.zip")
+        except Exception as exc:
+            logger.warning(f"Failed to save trace chunk: {exc}")
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        slow_requests = sorted(self.requests, key=lambda r: r['total_ms'], reverse=True)[:top]
+        slow_navigations = sorted(self.navigations, key=lambda n: n['delta'].get('TaskDuration', 0), reverse=True)[:top]
+        stages = sorted((self.recorder.stages if self.recorder else {}).items(), key=lambda kv: kv[1], reverse=True)
+        return {
+            'slowest_stages': [{'stage': name, 'seconds': round(seconds, 3)} for name, seconds in stages[:top]],
+            'slowest_requests': slow_requests,
+            'slowest_navigations': slow_navigations,
+            'requests': len(self.requests),
+            'navigations': len(self.navigations),
+        }
+
+    def save(self) -> Optional[str]:
+        """Write the summary (and any open trace chunk) and log the slowest operations."""
+        self.stop_hot_section()
+        if self._tracing:
+            try:
+                self.page.context.tracing.stop()
+            except Exception as exc:
+                logger.debug(f"Failed to stop tracing: {exc}")
+            self._tracing = False
+        summary = self.summary()
+        path = f"{self.out_prefix}-perf.json"
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'summary': summary, 'navigations': self.navigations, 'requests': self.requests},
+                          f, ensure_ascii=False, indent=2)
+        except OSError as exc:
+            logger.error(f"Failed to save performance artifacts: {exc}")
+            return None
+        for item in summary['slowest_stages'][:3]:
+            logger.info(f"slowest stage: {item['stage']} {item['seconds']:.3f}s")
+        for item in summary['slowest_requests'][:3]:
+            logger.info(f"slowest request: {item['total_ms']:.0f}ms {item['method']} {item['url']}")
+        logger.info(f"Performance artifacts saved to {path}")
+        return path
@@ -0,0 +1,227 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from pages.login_page import LoginPage
+from pages.ticket_page import TicketPage, resolve_date
+from utils.asset_cache import AssetCache
+from utils.browser_pool import BrowserPool, open_page
+from utils.logger import setup_logger
+from utils.prewarm import Prewarmer
+from utils.run_history import DEFAULT_RELEASE_TIME, RunHistory, RunRecorder, release_timestamp
+
+logger = setup_logger(__name__)
+
+
+def storage_state_file(account: str) -> str:
+    """Per-account session snapshot, so concurrent jobs of different accounts don't share a login."""
+    return os.path.join('config', f'storage_state_{account}.json')
+
+
+class BookingJob:
+    """One reservation to book: an account plus a date, venue, time slot and court.
+
+    ``cfg`` is a complete script config for the job. Each job keeps its own retry
+    state: after a failed attempt it is retried ``job_retry_seconds * attempts``
+    later until ``job_max_attempts`` is reached. A job whose booking was submitted
+    but not paid ends as 'unpaid' and is never retried, since booking it again
+    would leave a second unpaid order on the account.
+    """
+
+    def __init__(self, cfg: Dict[str, Any]):
+        self.day = resolve_date(cfg['date'])
+        self.cfg = {**cfg, 'date': self.day}
+        self.account = cfg['username']
+        self.max_attempts = int(cfg.get('job_max_attempts', 3))
+        self.retry_seconds = float(cfg.get('job_retry_seconds', 30))
+        # 提前多久开始（登录、进入日期视图），之后由 select_time_slot_loop 等待放票
+        self.lead_seconds = float(cfg.get('job_lead_seconds', 120))
+        # 放票日：目标日期前 release_days_ahead 天的 release_time
+        release_day = datetime.strptime(self.day, "%Y-%m-%d") - timedelta(days=int(cfg.get('release_days_ahead', 1)))
+        self.release_at = release_timestamp(cfg.get('release_time', DEFAULT_RELEASE_TIME), day=release_day)
+        self.status = 'pending'
+        self.attempts = 0
+        self.next_attempt_at = 0.0
+        self.last_error = ''
+
+    @property
+    def key(self) -> Tuple[str, str, str, str]:
+        """The booked target; two jobs with the same key would compete for the same court."""
+        time_slot = self.cfg.get('time_slot') or str(self.cfg.get('time_window'))
+        return (self.cfg['venue'], self.day, time_slot, str(self.cfg.get('court') or '-'))
+
+    @property
+    def ready_at(self) -> float:
+        return max(self.release_at - self.lead_seconds, self.next_attempt_at)
+
+    def record_failure(self, error: str) -> None:
+        self.attempts += 1
+        self.last_error = error
+        if self.attempts >= self.max_attempts:
+            self.status = 'failed'
+        else:
+            self.status = 'pending'
+            self.next_attempt_at = time.time() + self.retry_seconds * self.attempts
+
+    def __str__(self) -> str:
+        return f"{self.account} {'/'.join(self.key)}"
+
+
+def load_jobs(path: str, base_cfg: Dict[str, Any]) -> List[BookingJob]:
+    """Build jobs from a jobs file.
+
+    The file holds optional ``defaults``, named ``accounts`` (username / password /
+    pay_pass) and a ``jobs`` list. A job refers to an account by name (or uses the
+    base config's account) and may list several dates, e.g. ``["+1", "+2", "+3"]``.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+    accounts = spec.get('accounts', {})
+    jobs = []
+    for entry in spec.get('jobs', []):
+        entry = dict(entry)
+        account = entry.pop('account', None)
+        if account is not None and account not in accounts:
+            raise ValueError(f"Unknown account in jobs file: {account}")
+        dates = entry.pop('date', base_cfg.get('date'))
+        for day in dates if isinstance(dates, list) else [dates]:
+            cfg = {**base_cfg, **spec.get('defaults', {}), **accounts.get(account, {}), **entry, 'date': day}
+            jobs.append(BookingJob(cfg))
+    return jobs
+
+
+class JobQueue:
+    """Thread-safe queue handing out jobs in release-time order.
+
+    Duplicate targets are dropped when the queue is built. ``get()`` blocks until
+    the earliest pending job is due and returns None once every job has finished.
+    """
+
+    def __init__(self, jobs: List[BookingJob]):
+        self.jobs: List[BookingJob] = []
+        seen = set()
+        for job in sorted(jobs, key=lambda j: j.release_at):
+            if job.key in seen:
+                logger.warning(f"Skipping duplicate job: {job}")
+                continue
+            if job.day < datetime.now().strftime("%Y-%m-%d"):
+                logger.warning(f"Skipping job in the past: {job}")
+                continue
+            seen.add(job.key)
+            self.jobs.append(job)
+        self._cond = threading.Condition()
+
+    def get(self) -> Optional[BookingJob]:
+        with self._cond:
+            while True:
+                pending = [j for j in self.jobs if j.status == 'pending']
+                if not pending:
+                    # 运行中的任务可能失败后重新排队，等它们结束
+                    if not any(j.status == 'running' for j in self.jobs):
+                        return None
+                    self._cond.wait()
+                    continue
+                job = min(pending, key=lambda j: (j.ready_at, j.release_at))
+                delay = job.ready_at - time.time()
+                if delay > 0:
+                    self._cond.wait(timeout=delay)
+                    continue
+                job.status = 'running'
+                return job
+
+    def done(self, job: BookingJob, success: bool, error: str = '', unpaid: bool = False) -> None:
+        """Report the outcome of a job; ``unpaid`` means the booking was submitted but not paid."""
+        with self._cond:
+            if success:
+                job.status = 'success'
+            elif unpaid:
+                job.status = 'unpaid'
+                job.last_error = error
+                logger.error(f"Job {job} was submitted but not paid ({error}), not booking it again; "
+                             f"pay the order manually")
+            else:
+                job.record_failure(error)
+                if job.status == 'pending':
+                    logger.info(f"Job {job} failed ({error}), retrying at "
+                                f"{datetime.fromtimestamp(job.next_attempt_at):%H:%M:%S}")
+                else:
+                    logger.error(f"Job {job} failed after {job.attempts} attempts: {error}")
+            self._cond.notify_all()
+
+    def summary(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for job in self.jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+
+def run_job(job: BookingJob, pool: BrowserPool, headless: bool, recorder: Optional[RunRecorder] = None) -> str:
+    """Book one job in a fresh context of the worker's browser.
+
+    Returns 'success', or 'unpaid' when the booking was submitted but payment
+    failed or raised; raises when nothing was submitted, so the job can be retried.
+    """
+    recorder = recorder or RunRecorder.from_config('book', job.cfg)
+    # 任务的放票时间不一定是今天
+    recorder.release_at = job.release_at
+    ticket_page = None
+    try:
+        with open_page(headless=headless, pool=pool, storage_state_file=storage_state_file(job.account),
+                       asset_cache=AssetCache.from_config(job.cfg, profile=job.account)) as page:
+            prewarmer = Prewarmer.from_config(page, job.cfg, job.release_at)
+            login_page = LoginPage(page, account=job.account)
+            with recorder.stage('login'):
+                logged_in, login_msg = login_page.login(job.cfg['username'], job.cfg['password'])
+            if not logged_in:
+                raise RuntimeError(login_msg)
+            ticket_page = TicketPage.from_config(page, job.cfg, recorder=recorder, prewarmer=prewarmer)
+            if ticket_page.book(job.cfg):
+                recorder.finish('success')
+                return 'success'
+            recorder.finish('unpaid', '未完成支付')
+            return 'unpaid'
+    except Exception as e:
+        if ticket_page is not None and ticket_page.submitted:
+            # 已提交预约（可能已生成订单），之后的异常不能触发重新预约
+            logger.error(f"Job {job} failed after submitting the booking: {str(e)}")
+            recorder.finish('unpaid', str(e))
+            return 'unpaid'
+        recorder.finish('failed', str(e))
+        raise
+    finally:
+        RunHistory().record(recorder)
+
+
+def _worker(queue: JobQueue, headless: bool) -> None:
+    # sync API 绑定线程：每个工作线程有自己的 Playwright 驱动和浏览器，每个任务一个新 context
+    pool = BrowserPool()
+    try:
+        while True:
+            job = queue.get()
+            if job is None:
+                return
+            logger.info(f"Starting job {job} (attempt {job.attempts + 1}/{job.max_attempts})")
+            try:
+                outcome = run_job(job, pool, headless)
+                queue.done(job, outcome == 'success', '' if outcome == 'success' else '未完成支付',
+                           unpaid=outcome == 'unpaid')
+            except Exception as e:
+                queue.done(job, False, str(e))
+    finally:
+        pool.close()
+
+
+def run_queue(queue: JobQueue, workers: int = 2, headless: bool = True) -> Dict[str, int]:
+    """Work through the queue with at most ``workers`` browsers and return the final status counts."""
+    threads = [
+        threading.Thread(target=_worker, args=(queue, headless), name=f"job-worker-{i}", daemon=True)
+        for i in range(max(1, min(workers, len(queue.jobs))))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return queue.summary()
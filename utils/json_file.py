@@ -0,0 +1,49 @@
+import json
+import os
+import threading
+from typing import Callable, Dict
+
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(path: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+def read_json(path: str) -> dict:
+    """读取 JSON 文件，不存在或内容损坏时返回空字典"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def update_json(path: str, update: Callable[[dict], None]) -> dict:
+    """Apply ``update`` to the file's current content and write it back atomically.
+
+    The file is re-read under a per-path lock, so concurrent pages and jobs in one
+    process merge their changes instead of overwriting each other's. The result
+    is written to a temporary file and swapped in with ``os.replace`` (like
+    AssetCache), so a reader never sees a half-written file. Returns the merged
+    content; raises OSError if it cannot be written.
+    """
+    with _lock_for(path):
+        data = read_json(path)
+        update(data)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=4)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+    return data
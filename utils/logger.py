@@ -1,52 +1,138 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
 import os
+import queue
 import time
 
 # 全局变量，保存当前日志文件名
 _current_log_file = None
+# 后台写日志的监听线程
+_listener = None
+
+# 单个日志文件的大小上限及保留的轮转文件数
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+# 设置环境变量 GYM_LOG_FORMAT=compact 时使用紧凑的结构化（JSON行）格式
+LOG_FORMAT_ENV = 'GYM_LOG_FORMAT'
+
+
+class CompactFormatter(logging.Formatter):
+    """每条日志输出为一行JSON，便于脚本解析"""
+
+    def format(self, record):
+        entry = {
+            't': round(record.created, 3),
+            'lv': record.levelname[0],
+            'src': f"{record.filename}:{record.lineno}",
+            'msg': record.getMessage(),
+        }
+        if record.exc_info or record.exc_text:
+            entry['exc'] = record.exc_text or self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """入队时只填好消息本身，异常堆栈保存在 exc_text 中，由后台线程的格式化器输出
+
+    标准的 QueueHandler.prepare 会把堆栈拼进消息并清掉 exc_info，紧凑格式就丢了 exc 字段。
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _EXC_FORMATTER.formatException(record.exc_info)
+            # 不把 traceback 对象（及其引用的帧）留在队列里
+            record.exc_info = None
+        return record
+
+
+_EXC_FORMATTER = logging.Formatter()
+
+
+def _make_formatter(compact):
+    """创建格式化器"""
+    if compact:
+        return CompactFormatter()
+    return logging.Formatter(
+        '%(asctime)s  [%(levelname)s]  %(module)s  [%(filename)s:%(lineno)d]  %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+
+def build_handlers(log_path, compact=False, stream=None):
+    """创建控制台处理器和按大小轮转的文件处理器"""
+    formatter = _make_formatter(compact)
+
+    console_handler = logging.StreamHandler(stream)
+    console_handler.setLevel(logging.INFO)
+    console_handler.setFormatter(formatter)
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+    )
+    file_handler.setLevel(logging.INFO)
+    file_handler.setFormatter(formatter)
+
+    return [console_handler, file_handler]
+
+
+def start_queue_logging(logger, handlers):
+    """把处理器挂到后台线程上，logger 本身只做一次入队操作
+
+    Returns:
+        QueueListener: 已启动的监听器，调用 stop() 会写完队列中剩余的日志
+    """
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    logger.addHandler(_QueueHandler(log_queue))
+    return listener
+
+
+def stop_logging():
+    """停止后台写日志线程，并写完队列中剩余的日志"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 
 def setup_logger(name):
-    """设置日志记录器，确保所有模块共享同一个日志文件"""
+    """设置日志记录器，确保所有模块共享同一个日志文件
+
+    根logger上只挂一个 QueueHandler，真正的控制台输出和文件写入在后台线程完成，
+    抢票重试循环中的 logger.info 不会阻塞在磁盘或终端IO上。
+    """
     # 获取根logger
     root_logger = logging.getLogger()
-    
+
     # 检查根logger是否已经有处理器被添加
     if root_logger.handlers:
         return logging.getLogger(name)
-    
+
     # 设置根logger的级别
     root_logger.setLevel(logging.INFO)
-    
-    # 创建控制台处理器
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
 
     # 统一将日志保存到 logs 目录
     log_dir = 'logs'
     os.makedirs(log_dir, exist_ok=True)
-    
-    global _current_log_file
+
+    global _current_log_file, _listener
     if _current_log_file is None:
         _current_log_file = time.strftime('%Y-%m-%d-%H-%M-%S', time.localtime()) + '.log'
-    
-    file_name = _current_log_file
-    file_handler = logging.FileHandler(os.path.join(log_dir, file_name), encoding='utf-8')
-    file_handler.setLevel(logging.INFO)
-    
-    # 创建格式化器
-    formatter = logging.Formatter(
-        '%(asctime)s  [%(levelname)s]  %(module)s  [%(filename)s:%(lineno)d]  %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # 设置格式化器
-    console_handler.setFormatter(formatter)
-    file_handler.setFormatter(formatter)
-    
+
+    compact = os.getenv(LOG_FORMAT_ENV, '').strip().lower() == 'compact'
+    handlers = build_handlers(os.path.join(log_dir, _current_log_file), compact=compact)
+
     # 只在根logger上添加处理器，所有子logger会自动继承
-    root_logger.addHandler(console_handler)
-    root_logger.addHandler(file_handler)
-    
+    _listener = start_queue_logging(root_logger, handlers)
+    atexit.register(stop_logging)
+
     return logging.getLogger(name)
 
 def get_current_log_file():
@@ -0,0 +1,137 @@
+import socket
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from playwright.sync_api import Page, Request
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 只有这些类型的请求决定需要预热的主机，忽略统计脚本、图片CDN等
+_PREWARM_RESOURCE_TYPES = ('document', 'xhr', 'fetch')
+
+# 在页面中为每个源加 preconnect 提示，并发一个 HEAD 请求真正建立（并保持）连接
+_PREWARM_JS = '''async ([origins, timeoutMs]) => {
+    for (const origin of origins) {
+        const link = document.createElement('link');
+        link.rel = 'preconnect';
+        link.href = origin;
+        document.head.appendChild(link);
+    }
+    const started = performance.now();
+    // 最多等待 timeoutMs，慢的主机继续在后台建立连接，不拖住调用方
+    await Promise.race([
+        Promise.all(origins.map(origin =>
+            fetch(origin + '/', {method: 'HEAD', mode: 'no-cors', cache: 'no-store', credentials: 'include'})
+                .catch(() => null))),
+        new Promise(resolve => setTimeout(resolve, timeoutMs)),
+    ]);
+    return performance.now() - started;
+}'''
+
+
+def origin_of(url: str) -> Optional[str]:
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.netloc:
+        return None
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def resolve_hosts(origins: Iterable[str]) -> None:
+    """Warm the OS resolver cache for every origin's host in the background."""
+    def resolve(host: str, port: int) -> None:
+        try:
+            socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)
+        except OSError as exc:
+            logger.debug(f"Failed to resolve {host}: {exc}")
+
+    for origin in origins:
+        parsed = urlparse(origin)
+        port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        threading.Thread(target=resolve, args=(parsed.hostname, port), daemon=True).start()
+
+
+class Prewarmer:
+    """Open keep-alive connections to the booking hosts shortly before the release burst.
+
+    The origins are learned from the page's document/xhr/fetch requests (so the
+    booking host and the auth host are both covered) plus ``prewarm_urls`` from
+    the config. Within ``lead_seconds`` before ``release_at`` the connections are
+    refreshed every ``interval_seconds`` through the same browser context, so the
+    first real poll after an idle wait reuses an open connection instead of paying
+    for DNS, TCP and TLS. ``page.request`` keeps its own connections and is warmed too.
+
+    A prewarm runs on the poll loop's thread, so every wait in it is capped at
+    ``timeout_seconds`` per origin, and none runs once the rate governor's release
+    window has begun: the loop's own polls keep the connections open from then on.
+    """
+
+    def __init__(self, page: Page, release_at: float, urls: Optional[List[str]] = None,
+                 lead_seconds: float = 30, interval_seconds: float = 10, timeout_seconds: float = 0.5):
+        self.page = page
+        self.release_at = release_at
+        self.lead_seconds = lead_seconds
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.origins: Dict[str, None] = dict.fromkeys(filter(None, (origin_of(u) for u in urls or [])))
+        self.prewarms = 0
+        self._last = 0.0
+        page.on('request', self._on_request)
+
+    @classmethod
+    def from_config(cls, page: Page, cfg: dict, release_at: float) -> Optional['Prewarmer']:
+        if not cfg.get('prewarm', True):
+            return None
+        return cls(
+            page,
+            release_at,
+            urls=cfg.get('prewarm_urls'),
+            lead_seconds=float(cfg.get('prewarm_lead_seconds', 30)),
+            interval_seconds=float(cfg.get('prewarm_interval_seconds', 10)),
+            timeout_seconds=float(cfg.get('prewarm_timeout_seconds', 0.5)),
+        )
+
+    def _on_request(self, request: Request) -> None:
+        if request.resource_type in _PREWARM_RESOURCE_TYPES:
+            origin = origin_of(request.url)
+            if origin:
+                self.origins.setdefault(origin)
+
+    def prewarm(self) -> float:
+        """Resolve and connect to every known origin now; return the in-page time in ms."""
+        origins = list(self.origins)
+        if not origins:
+            return 0.0
+        self._last = time.time()
+        resolve_hosts(origins)
+        try:
+            elapsed = self.page.evaluate(_PREWARM_JS, [origins, self.timeout_seconds * 1000])
+        except Exception as exc:
+            logger.debug(f"In-page prewarm failed: {exc}")
+            elapsed = 0.0
+        for origin in origins:
+            try:
+                self.page.request.head(origin + '/', timeout=self.timeout_seconds * 1000, max_redirects=0)
+            except Exception as exc:
+                logger.debug(f"API prewarm of {origin} failed: {exc}")
+        self.prewarms += 1
+        logger.info(f"Prewarmed connections to {origins} in {elapsed:.0f} ms")
+        return elapsed
+
+    def maybe_prewarm(self, governor=None) -> bool:
+        """Prewarm if inside the pre-release window and the last prewarm is older than the interval.
+
+        Skipped once ``governor`` (the poll loop's RateGovernor) is in a release window.
+        """
+        now = time.time()
+        if not self.release_at - self.lead_seconds <= now <= self.release_at:
+            return False
+        if governor is not None and governor.in_release_window(now):
+            return False
+        if now - self._last < self.interval_seconds:
+            return False
+        self.prewarm()
+        return True
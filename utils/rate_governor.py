@@ -0,0 +1,177 @@
+import random
+import threading
+import time
+import weakref
+from typing import List, Optional, Tuple
+
+from playwright.sync_api import Page, Request, Response
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 只有这些请求反映站点的负载情况
+_OBSERVED_RESOURCE_TYPES = ('document', 'xhr', 'fetch')
+# 配置的速率不能低于这个值（次/秒），速率为 0 时等待时间无穷大
+MIN_RATE = 0.01
+
+
+class RateGovernor:
+    """Token bucket pacing every availability poll of the process.
+
+    The bucket refills at an adaptive rate. A 429/5xx, a failed request or a
+    Retry-After header halve it (down to ``min_rate``). Latency rising well
+    above its long-run average cuts it by a fifth. Every healthy response adds
+    ``increase`` back, up to ``max_rate``. Outside the release windows the rate
+    is also capped at ``base_rate``, so polling only speeds up around the release.
+    Thread safe; pages report their responses through ``watch()``.
+    """
+
+    def __init__(self, base_rate: float = 1.0, max_rate: float = 4.0, min_rate: float = 0.1,
+                 burst: float = 1.0, increase: float = 0.1, latency_factor: float = 2.0):
+        self.base_rate = base_rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.increase = increase
+        self.latency_factor = latency_factor
+        self.rate = max_rate
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._windows: List[Tuple[float, float]] = []
+        self._latency_fast: Optional[float] = None
+        self._latency_slow: Optional[float] = None
+        self._samples = 0
+        self._lock = threading.Lock()
+        self._watched = weakref.WeakSet()
+        self.stats = {'acquired': 0, 'waited': 0.0, 'backoffs': 0}
+
+    def in_use(self) -> bool:
+        """Whether any page watched by the governor is still open."""
+        return any(not page.is_closed() for page in list(self._watched))
+
+    def configure(self, cfg: dict) -> 'RateGovernor':
+        """Apply poll_rate / poll_rate_max / poll_rate_min; rates below ``MIN_RATE`` are raised to it."""
+        with self._lock:
+            base_rate = float(cfg.get('poll_rate', self.base_rate))
+            min_rate = float(cfg.get('poll_rate_min', self.min_rate))
+            if base_rate < MIN_RATE or min_rate < MIN_RATE:
+                logger.warning(f"Poll rates must be at least {MIN_RATE}/s, "
+                               f"got poll_rate={base_rate} poll_rate_min={min_rate}")
+            self.base_rate = max(base_rate, MIN_RATE)
+            self.max_rate = max(self.base_rate, float(cfg.get('poll_rate_max', self.max_rate)))
+            self.min_rate = min(max(min_rate, MIN_RATE), self.max_rate)
+            self.rate = min(max(self.rate, self.min_rate), self.max_rate)
+        return self
+
+    def add_release_window(self, release_at: float, before: float = 10, after: float = 60) -> None:
+        """Allow polling up to ``max_rate`` from ``before`` seconds before to ``after`` seconds after a release."""
+        with self._lock:
+            now = time.time()
+            self._windows = [w for w in self._windows if w[1] > now]
+            window = (release_at - before, release_at + after)
+            if window not in self._windows:
+                self._windows.append(window)
+
+    def in_release_window(self, now: Optional[float] = None) -> bool:
+        now = now or time.time()
+        return any(start <= now <= end for start, end in self._windows)
+
+    def effective_rate(self) -> float:
+        return self.rate if self.in_release_window() else min(self.rate, self.base_rate)
+
+    def acquire(self) -> float:
+        """Block until a poll is allowed; return the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                rate = self.effective_rate()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * rate)
+                self._updated = now
+                delay = max(self._paused_until - time.time(), 0.0)
+                if not delay and self._tokens >= 1:
+                    self._tokens -= 1
+                    self.stats['acquired'] += 1
+                    self.stats['waited'] += waited
+                    return waited
+                delay = delay or (1 - self._tokens) / rate
+            # 少量随机抖动，避免多个账号/页面同步轮询
+            delay *= random.uniform(1.0, 1.1)
+            time.sleep(delay)
+            waited += delay
+
+    def _backoff(self, factor: float, reason: str) -> None:
+        self.rate = max(self.min_rate, self.rate * factor)
+        self.stats['backoffs'] += 1
+        logger.info(f"Rate governor backing off ({reason}): {self.rate:.2f} polls/s")
+
+    def observe(self, status: Optional[int] = None, latency: Optional[float] = None, ok: bool = True,
+                retry_after: Optional[str] = None) -> None:
+        """Feed the outcome of one request (latency in seconds) back into the rate."""
+        with self._lock:
+            if not ok or status == 429 or (status is not None and status >= 500):
+                if retry_after and retry_after.isdigit():
+                    self._paused_until = max(self._paused_until, time.time() + int(retry_after))
+                self._backoff(0.5, f"status {status}" if status else 'request failed')
+                return
+            if latency is None:
+                return
+            self._samples += 1
+            self._latency_fast = latency if self._latency_fast is None else 0.7 * self._latency_fast + 0.3 * latency
+            self._latency_slow = latency if self._latency_slow is None else 0.95 * self._latency_slow + 0.05 * latency
+            if self._samples > 5 and self._latency_fast > self.latency_factor * self._latency_slow:
+                self._backoff(0.8, f"latency {self._latency_fast * 1000:.0f}ms")
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def watch(self, page: Page) -> None:
+        """Observe the page's document/xhr/fetch responses; idempotent per page."""
+        if page in self._watched:
+            return
+        self._watched.add(page)
+        page.on('response', self._on_response)
+        page.on('requestfinished', self._on_request_finished)
+        page.on('requestfailed', self._on_request_failed)
+
+    def _on_response(self, response: Response) -> None:
+        if response.request.resource_type in _OBSERVED_RESOURCE_TYPES and (
+                response.status == 429 or response.status >= 500):
+            self.observe(status=response.status, retry_after=response.headers.get('retry-after'))
+
+    def _on_request_finished(self, request: Request) -> None:
+        if request.resource_type not in _OBSERVED_RESOURCE_TYPES:
+            return
+        end = request.timing.get('responseEnd', -1)
+        if end >= 0:
+            self.observe(latency=end / 1000)
+
+    def _on_request_failed(self, request: Request) -> None:
+        # 页面刷新/跳转时浏览器取消的请求（net::ERR_ABORTED）不代表站点有问题
+        if request.resource_type in _OBSERVED_RESOURCE_TYPES and request.failure != 'net::ERR_ABORTED':
+            self.observe(ok=False)
+
+
+_shared: Optional[RateGovernor] = None
+_shared_lock = threading.Lock()
+
+
+def shared_governor(cfg: Optional[dict] = None) -> RateGovernor:
+    """The process-wide governor shared by every page and account.
+
+    ``cfg`` sets its rates only while no page is using it. Jobs, a watch and a
+    booking running at the same time in one process therefore share the rates
+    of whichever started first instead of overwriting each other's.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = RateGovernor()
+        if cfg:
+            if not _shared.in_use():
+                _shared.configure(cfg)
+            elif any(key in cfg for key in ('poll_rate', 'poll_rate_max', 'poll_rate_min')):
+                logger.info(f"Rate governor in use by another page, keeping its rates "
+                            f"({_shared.base_rate:.2f}/s, up to {_shared.max_rate:.2f}/s)")
+    return _shared
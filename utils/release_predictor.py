@@ -0,0 +1,73 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from utils.run_history import RunHistory, percentile
+
+WEEKDAYS = ('周一', '周二', '周三', '周四', '周五', '周六', '周日')
+# 超出这个范围（秒）的“首次看到”不是放票，而是别的时间的余票（如当天的场次、上午开始的监视）
+MAX_SIGHTING_OFFSET = 300
+# 只有抢票和监视运行在等待放票；查询、登录看到的余票与放票时间无关
+SIGHTING_MODES = ('book', 'watch')
+
+
+def sighting_offset(run) -> Optional[float]:
+    """First sighting relative to the nominal release, on the server's clock when it was measured.
+
+    Only runs that were already polling at the release and saw the slot
+    unavailable at least once (``retries``) tell when the slots really appeared;
+    a run started later, or one that found them open on its first check, just
+    saw them whenever it looked. Offsets beyond ``MAX_SIGHTING_OFFSET`` are
+    dropped as well.
+    """
+    if run['release_at'] is None or run['started_at'] > run['release_at'] or not run['retries']:
+        return None
+    offset = run['first_available_server_offset']
+    if offset is None:
+        offset = run['first_available_offset']
+    if offset is None or abs(offset) > MAX_SIGHTING_OFFSET:
+        return None
+    return offset
+
+
+class ReleasePredictor:
+    """Distribution of the real release time per venue and weekday, learned from the run history.
+
+    A prediction needs at least ``min_samples`` sightings; with fewer, the
+    venue's sightings on any weekday are used, then all sightings.
+    """
+
+    def __init__(self, runs, min_samples: int = 3):
+        self.min_samples = min_samples
+        self.samples: Dict[Tuple[str, int], List[float]] = defaultdict(list)
+        for run in runs:
+            offset = sighting_offset(run)
+            if offset is None:
+                continue
+            venue = run['target'].split('/')[0]
+            self.samples[(venue, datetime.fromtimestamp(run['release_at']).weekday())].append(offset)
+
+    @classmethod
+    def from_history(cls, history: Optional[RunHistory] = None, min_samples: int = 3) -> 'ReleasePredictor':
+        history = history or RunHistory()
+        return cls([r for mode in SIGHTING_MODES for r in history.runs(mode=mode)], min_samples=min_samples)
+
+    def predict(self, venue: str, weekday: int) -> Optional[Dict]:
+        """{'scope', 'n', 'p10', 'p50', 'p90'}（秒，相对名义放票时间），样本不足时返回 None"""
+        candidates = [
+            (f"{venue} {WEEKDAYS[weekday]}", self.samples.get((venue, weekday), [])),
+            (venue, [v for (name, _), values in self.samples.items() if name == venue for v in values]),
+            ('all', [v for values in self.samples.values() for v in values]),
+        ]
+        for scope, values in candidates:
+            if len(values) >= self.min_samples:
+                return {'scope': scope, 'n': len(values), 'p10': percentile(values, 10),
+                        'p50': percentile(values, 50), 'p90': percentile(values, 90)}
+        return None
+
+    def burst_window(self, venue: str, weekday: int, margin: float = 5) -> Optional[Tuple[float, float]]:
+        """高频刷新窗口 (放票前秒数, 放票后秒数)：覆盖 p10 - margin 到 p90 + margin"""
+        prediction = self.predict(venue, weekday)
+        if not prediction:
+            return None
+        return margin - prediction['p10'], prediction['p90'] + margin
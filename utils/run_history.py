@@ -0,0 +1,201 @@
+import functools
+import json
+import math
+import os
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 运行历史单独存放，不受“清除日志”影响
+HISTORY_DB_FILE = os.path.join('config', 'run_history.db')
+# 默认放票时间（每天中午12:30）
+DEFAULT_RELEASE_TIME = '12:30'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mode TEXT NOT NULL,
+    account TEXT NOT NULL,
+    target TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    outcome TEXT NOT NULL,
+    message TEXT,
+    retries INTEGER NOT NULL DEFAULT 0,
+    release_at REAL,
+    first_available_at REAL,
+    first_available_offset REAL,
+    stages TEXT NOT NULL DEFAULT '{}',
+    detector TEXT,
+    server_offset REAL,
+    first_available_server_offset REAL
+)
+"""
+
+# 之后加入的列：旧数据库打开时补上
+_ADDED_COLUMNS = {
+    'detector': 'TEXT',
+    'server_offset': 'REAL',
+    'first_available_server_offset': 'REAL',
+}
+
+
+def release_timestamp(release_time: str = DEFAULT_RELEASE_TIME, day: Optional[datetime] = None) -> float:
+    """Return the epoch timestamp of today's (or ``day``'s) release time, e.g. '12:30'."""
+    day = day or datetime.now()
+    hour, minute = (int(part) for part in release_time.split(':'))
+    return day.replace(hour=hour, minute=minute, second=0, microsecond=0).timestamp()
+
+
+class RunRecorder:
+    """Collect timings, retries and the first availability sighting of one run."""
+
+    def __init__(self, mode: str, account: str, target: str, strategy: str = 'reload',
+                 release_time: str = DEFAULT_RELEASE_TIME):
+        self.mode = mode
+        self.account = account
+        self.target = target
+        self.strategy = strategy
+        self.started_at = time.time()
+        self.release_at = release_timestamp(release_time)
+        self.stages: Dict[str, float] = {}
+        self.retries = 0
+        self.first_available_at: Optional[float] = None
+        # race 策略中最先看到有票的检测器
+        self.detector: Optional[str] = None
+        # 首次看到可预约时估计的服务器时钟偏移（服务器时间 - 本机时间）
+        self.server_offset: Optional[float] = None
+        self.outcome = 'unknown'
+        self.message = ''
+        self.duration = 0.0
+
+    @classmethod
+    def from_config(cls, mode: str, cfg: dict) -> 'RunRecorder':
+        target = '/'.join(str(cfg.get(key) or '-') for key in ('venue', 'date', 'time_slot', 'court'))
+        if not cfg.get('time_slot') and cfg.get('time_window'):
+            target = target.replace('/-/', f"/{cfg['time_window']}/", 1)
+        return cls(
+            mode,
+            account=cfg.get('username', ''),
+            target=target,
+            strategy=cfg.get('strategy', 'reload'),
+            release_time=cfg.get('release_time', DEFAULT_RELEASE_TIME),
+        )
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a stage; repeated stages accumulate."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def add_retry(self, count: int = 1) -> None:
+        self.retries += count
+
+    def mark_available(self, server_offset: Optional[float] = None) -> None:
+        """Record the first time a '(可预约)' slot was seen in this run, and the server clock offset then."""
+        if self.first_available_at is None:
+            self.first_available_at = time.time()
+            self.server_offset = server_offset
+
+    @property
+    def first_available_offset(self) -> Optional[float]:
+        """Seconds between the release time and the first sighting (negative = before release)."""
+        if self.first_available_at is None:
+            return None
+        return self.first_available_at - self.release_at
+
+    @property
+    def first_available_server_offset(self) -> Optional[float]:
+        """Like ``first_available_offset`` but on the server's clock; None without a clock estimate."""
+        if self.first_available_at is None or self.server_offset is None:
+            return None
+        return self.first_available_at + self.server_offset - self.release_at
+
+    def finish(self, outcome: str, message: str = '') -> None:
+        self.outcome = outcome
+        self.message = message
+        self.duration = time.time() - self.started_at
+
+
+def timed_stage(name: str):
+    """Decorator timing a page-object method into ``self.recorder`` when one is attached."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            recorder = getattr(self, 'recorder', None)
+            if recorder is None:
+                return func(self, *args, **kwargs)
+            with recorder.stage(name):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class RunHistory:
+    """SQLite store of every run, used by the report script."""
+
+    def __init__(self, db_file: str = HISTORY_DB_FILE):
+        self.db_file = db_file
+        os.makedirs(os.path.dirname(db_file) or '.', exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(_SCHEMA)
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(runs)")}
+            for column, kind in _ADDED_COLUMNS.items():
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE runs ADD COLUMN {column} {kind}")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_file)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def record(self, recorder: RunRecorder) -> None:
+        """Store a finished run. Failures are logged, never raised: history must not break a booking."""
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT INTO runs (mode, account, target, strategy, started_at, duration, outcome, message,"
+                    " retries, release_at, first_available_at, first_available_offset, stages, detector,"
+                    " server_offset, first_available_server_offset)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        recorder.mode, recorder.account, recorder.target, recorder.strategy,
+                        recorder.started_at, recorder.duration, recorder.outcome, recorder.message,
+                        recorder.retries, recorder.release_at, recorder.first_available_at,
+                        recorder.first_available_offset, json.dumps(recorder.stages), recorder.detector,
+                        recorder.server_offset, recorder.first_available_server_offset,
+                    ),
+                )
+        except sqlite3.Error as exc:
+            logger.error(f"Failed to record run history: {exc}")
+
+    def runs(self, mode: Optional[str] = None, account: Optional[str] = None) -> List[sqlite3.Row]:
+        query = "SELECT * FROM runs WHERE 1=1"
+        params: list = []
+        if mode:
+            query += " AND mode = ?"
+            params.append(mode)
+        if account:
+            query += " AND account = ?"
+            params.append(account)
+        with closing(self._connect()) as conn:
+            return conn.execute(query + " ORDER BY started_at", params).fetchall()
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile, ``pct`` in [0, 100]."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
@@ -0,0 +1,121 @@
+import threading
+import time
+import weakref
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlparse
+
+from playwright.sync_api import Page, Response
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 只有这些请求的 Date 头是服务器当时生成的（静态资源可能来自缓存）
+_OBSERVED_RESOURCE_TYPES = ('document', 'xhr', 'fetch')
+
+
+class ServerClock:
+    """Estimate of the booking server's clock from HTTP ``Date`` headers.
+
+    A Date header only has one-second resolution, but it was stamped somewhere
+    between sending the request and receiving the response, so each response
+    bounds ``server - local`` to ``[date - received, date + 1 - sent]``.
+    Intersecting the bounds of many responses narrows the offset well below a
+    second. A sample that contradicts an established estimate (e.g. a cached
+    response) is ignored; one that contradicts a young estimate restarts it.
+    With ``host`` set, only responses from that host are sampled: the SSO and
+    other services the pages talk to run on clocks of their own.
+    """
+
+    def __init__(self, host: Optional[str] = None):
+        self.host = host
+        self._low = float('-inf')
+        self._high = float('inf')
+        self.samples = 0
+        self._lock = threading.Lock()
+        self._watched = weakref.WeakSet()
+
+    @property
+    def offset(self) -> Optional[float]:
+        """Seconds to add to the local clock to get the server's clock; None before the first sample."""
+        if not self.samples:
+            return None
+        return (self._low + self._high) / 2
+
+    @property
+    def uncertainty(self) -> Optional[float]:
+        if not self.samples:
+            return None
+        return (self._high - self._low) / 2
+
+    def now(self) -> float:
+        return time.time() + (self.offset or 0.0)
+
+    def observe(self, date_header: str, sent: float, received: float) -> None:
+        try:
+            server = parsedate_to_datetime(date_header).timestamp()
+        except (TypeError, ValueError):
+            return
+        low, high = server - received, server + 1 - sent
+        with self._lock:
+            new_low, new_high = max(self._low, low), min(self._high, high)
+            if new_low > new_high:
+                if self.samples >= 3:
+                    return
+                new_low, new_high, self.samples = low, high, 0
+            self._low, self._high = new_low, new_high
+            self.samples += 1
+
+    def watch(self, page: Page) -> None:
+        """Sample the Date header of the page's document/xhr/fetch responses; idempotent per page."""
+        if page in self._watched:
+            return
+        self._watched.add(page)
+        page.on('response', self._on_response)
+
+    def _is_booking_host(self, url: str) -> bool:
+        return not self.host or urlparse(url).netloc == self.host
+
+    def _on_response(self, response: Response) -> None:
+        if response.request.resource_type not in _OBSERVED_RESOURCE_TYPES or not self._is_booking_host(response.url):
+            return
+        date_header = response.headers.get('date')
+        if date_header:
+            self.observe(date_header, response.request.timing['startTime'] / 1000, time.time())
+
+    def sample(self, page: Page) -> None:
+        """Take one sample with a HEAD request to the page's URL (used before any response was seen).
+
+        Skipped while the page is not on the booking host, so only a host the run
+        is already talking to is ever contacted.
+        """
+        url = page.url
+        if not url.startswith('http') or not self._is_booking_host(url):
+            return
+        sent = time.time()
+        try:
+            response = page.request.head(url)
+        except Exception as e:
+            logger.warning(f"Failed to sample the server clock: {str(e)}")
+            return
+        date_header = response.headers.get('date')
+        if date_header:
+            self.observe(date_header, sent, time.time())
+
+
+_shared: Optional[ServerClock] = None
+_shared_lock = threading.Lock()
+
+
+def shared_server_clock(host: Optional[str] = None) -> ServerClock:
+    """The process-wide server clock shared by every page.
+
+    ``host`` is the booking host the caller talks to; if it differs from the
+    clock's, the clock restarts for the new host.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None or (host and _shared.host != host):
+            _shared = ServerClock(host)
+    return _shared
@@ -0,0 +1,145 @@
+import time
+from datetime import datetime
+from typing import Callable, List, Optional, Set
+
+from pages.login_page import LoginPage
+from pages.ticket_page import TicketPage
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def slot_name(text: str) -> str:
+    """'20:00-21:00(可预约)' -> '20:00-21:00'"""
+    return text.split('(')[0].strip()
+
+
+class SlotWatcher:
+    """Watch one venue/date for slots freed by cancellations and book the first watched one.
+
+    Every poll soft-refreshes the date view that is already open (paced by the
+    shared RateGovernor, see TicketPage.refresh_date_view), takes a snapshot
+    of the '(可预约)' slots and diffs it against the previous one. A watched slot
+    that newly appears is booked right away; if someone else was faster, watching
+    continues. If the page breaks (expired session, network blip), it logs in
+    again and reopens the date view, backing off while recovery keeps failing.
+    """
+
+    # 恢复失败后的等待时间（秒），每次失败翻倍，直到上限
+    RECOVER_BACKOFF = 2.0
+    RECOVER_BACKOFF_MAX = 60.0
+
+    def __init__(self, page, ticket_page: TicketPage, cfg: dict,
+                 on_change: Optional[Callable[[List[str], List[str]], None]] = None):
+        self.page = page
+        self.ticket_page = ticket_page
+        self.cfg = cfg
+        self.on_change = on_change
+        self.wait_timeout_seconds = float(cfg['wait_timeout_seconds'])
+        # 监视的时间段：watch_slots 列表，未配置时只监视 time_slot；为空列表时任何时间段都预约
+        self.targets = cfg.get('watch_slots', [cfg['time_slot']] if cfg.get('time_slot') else [])
+        self.snapshot: Set[str] = set()
+        self.polls = 0
+        self.recover_failures = 0
+
+    def is_target(self, slot: str) -> bool:
+        return not self.targets or slot in self.targets
+
+    def take_snapshot(self) -> Set[str]:
+        return {slot_name(text) for text in self.ticket_page.iter_leftover_timeslots()}
+
+    def diff(self, snapshot: Set[str]):
+        appeared = sorted(snapshot - self.snapshot)
+        gone = sorted(self.snapshot - snapshot)
+        self.snapshot = snapshot
+        return appeared, gone
+
+    def book(self, slot: str) -> bool:
+        logger.info(f"Watched slot {slot} became available, booking")
+        try:
+            paid = (self.ticket_page
+                .select_time_slot_loop(slot, self.cfg['date'], self.cfg['venue'],
+                                       wait_timeout_seconds=self.wait_timeout_seconds, max_attempts=1)
+                .select_specific_venue(self.cfg['venue'], self.cfg.get('court'))
+                .submit_booking()
+                .make_payment(self.cfg['pay_pass'])
+            )
+            if paid:
+                return True
+            logger.warning(f"Booking or payment of {slot} did not complete")
+        except Exception as e:
+            logger.warning(f"Failed to book {slot}: {str(e)}")
+        # 下次轮询时若仍显示可预约则再试一次；回到日期视图继续监视
+        self.snapshot.discard(slot)
+        self.ticket_page.open_date_view(self.cfg['date'], self.cfg['venue'], self.wait_timeout_seconds)
+        return False
+
+    def _recover(self, until: Optional[datetime] = None) -> bool:
+        """登录态过期或页面异常时重新登录并回到日期视图；失败时退避等待后返回 False"""
+        try:
+            logged_in, login_msg = LoginPage(self.page).login(self.cfg['username'], self.cfg['password'])
+            if not logged_in:
+                raise RuntimeError(login_msg)
+            self.ticket_page.open_date_view(self.cfg['date'], self.cfg['venue'], self.wait_timeout_seconds)
+        except Exception as e:
+            self.recover_failures += 1
+            delay = min(self.RECOVER_BACKOFF_MAX, self.RECOVER_BACKOFF * 2 ** (self.recover_failures - 1))
+            if until:
+                delay = max(0.0, min(delay, (until - datetime.now()).total_seconds()))
+            logger.warning(f"Recovery failed ({self.recover_failures}x): {str(e)}, retrying in {delay:.0f}s")
+            time.sleep(delay)
+            return False
+        self.recover_failures = 0
+        return True
+
+    def poll(self) -> Optional[str]:
+        """Refresh once and return the booked slot, if any."""
+        if self.polls:
+            # 之前的轮询算作重试，运行历史据此区分首次检查就看到的余票和真正的放票
+            self.ticket_page._add_retry()
+            self.ticket_page.refresh_date_view(self.cfg['date'], self.cfg['venue'], self.wait_timeout_seconds)
+        self.polls += 1
+        appeared, gone = self.diff(self.take_snapshot())
+        if appeared or gone:
+            logger.info(f"Availability changed: +{appeared} -{gone}")
+            if self.on_change:
+                self.on_change(appeared, gone)
+        for slot in appeared:
+            if self.is_target(slot) and self.book(slot):
+                return slot
+        return None
+
+    def run(self, until: Optional[datetime] = None) -> Optional[str]:
+        """Poll until a watched slot is booked, ``until`` passes or the page is closed."""
+        recovering = False
+        try:
+            self.ticket_page.open_date_view(self.cfg['date'], self.cfg['venue'], self.wait_timeout_seconds)
+        except Exception as e:
+            logger.warning(f"Failed to open the date view, recovering: {str(e)}")
+            recovering = True
+        while not self.page.is_closed():
+            if until and datetime.now() >= until:
+                logger.info("Watch window ended")
+                return None
+            if recovering:
+                recovering = not self._recover(until)
+                continue
+            try:
+                booked = self.poll()
+                if booked:
+                    return booked
+            except Exception as e:
+                logger.warning(f"Watch poll failed, recovering: {str(e)}")
+                recovering = True
+        return None
+
+
+def parse_until(value: Optional[str]) -> Optional[datetime]:
+    """'HH:MM' today or a full 'YYYY-MM-DD HH:MM'."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d %H:%M')
+    except ValueError:
+        hour, minute = (int(part) for part in value.split(':'))
+        return datetime.now().replace(hour=hour, minute=minute, second=0, microsecond=0)
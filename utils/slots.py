@@ -0,0 +1,166 @@
+import re
+from typing import Any, List, Optional, Union
+
+from playwright.sync_api import Page
+
+AVAILABLE = '可预约'
+
+_SLOT_RE = re.compile(r'(\d{1,2}):(\d{2})\s*[-~－—至]\s*(\d{1,2}):(\d{2})')
+_STATUS_RE = re.compile(r'[(（]([^)）]*)[)）]')
+_REMAINING_RE = re.compile(r'(?:剩余|余|remaining)\D{0,3}(\d+)')
+
+# 一次读出页面上所有 div.element 的文本和是否可见，在 Python 里解析
+_EXTRACT_JS = '''() => [...document.querySelectorAll('div.element')].map(el => {
+    const rect = el.getBoundingClientRect();
+    return [el.textContent.trim(), rect.width > 0 && rect.height > 0];
+})'''
+
+# 等到至少有一个可见的可预约元素，再返回与 _EXTRACT_JS 相同的结果
+_WAIT_JS = '''() => {
+    const rows = (%s)();
+    return rows.some(([text, visible]) => visible && text.includes('%s')) ? rows : null;
+}''' % (_EXTRACT_JS, AVAILABLE)
+
+
+def _minutes(hour: str, minute: str) -> int:
+    return int(hour) * 60 + int(minute)
+
+
+def format_minutes(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class Slot:
+    """A parsed time slot: '18:00-19:00(可预约)' -> start/end in minutes, status, remaining count."""
+
+    __slots__ = ('label', 'start', 'end', 'status', 'remaining', 'index')
+
+    def __init__(self, label: str, start: int, end: int, status: str = '', remaining: Optional[int] = None,
+                 index: Optional[int] = None):
+        self.label = label
+        self.start = start
+        self.end = end
+        self.status = status
+        self.remaining = remaining
+        # 在页面 div.element 列表中的位置，选中后直接按位置点击
+        self.index = index
+
+    @property
+    def duration(self) -> int:
+        return self.end - self.start
+
+    @property
+    def available(self) -> bool:
+        return AVAILABLE in self.status and self.remaining != 0
+
+    def __repr__(self):
+        remaining = '' if self.remaining is None else f" remaining={self.remaining}"
+        return f"Slot({self.label} {self.status}{remaining})"
+
+
+def parse_slot(text: str, index: Optional[int] = None) -> Optional[Slot]:
+    """Parse a slot label such as '18:00-19:00(可预约)' or '18:00-19:00(可预约 剩余3)'; None if it is not a slot."""
+    match = _SLOT_RE.search(text)
+    if not match:
+        return None
+    rest = text[match.end():]
+    status = _STATUS_RE.search(rest)
+    remaining = _REMAINING_RE.search(text)
+    start = _minutes(match.group(1), match.group(2))
+    end = _minutes(match.group(3), match.group(4))
+    return Slot(match.group(0), start, end, (status.group(1) if status else rest).strip(),
+                int(remaining.group(1)) if remaining else None, index)
+
+
+def extract_slots(page: Page) -> List[Slot]:
+    """一次读取并解析日期视图中所有可见的时间段"""
+    return _parse_rows(page.evaluate(_EXTRACT_JS))
+
+
+def wait_for_slots(page: Page, timeout_seconds: float) -> List[Slot]:
+    """等到页面上出现可预约的元素（在页面内轮询），然后返回解析出的全部时间段；超时抛出 TimeoutError"""
+    handle = page.wait_for_function(_WAIT_JS, polling='raf', timeout=timeout_seconds * 1000)
+    return _parse_rows(handle.json_value())
+
+
+def _parse_rows(rows) -> List[Slot]:
+    slots = []
+    for index, (text, visible) in enumerate(rows):
+        slot = parse_slot(text, index) if visible else None
+        if slot:
+            slots.append(slot)
+    return slots
+
+
+def slots_from_json(data: Any) -> List[Slot]:
+    """在时间段接口返回的JSON中查找时间段记录（含 HH:MM-HH:MM 的对象）"""
+    found = []
+    if isinstance(data, dict):
+        strings = [v for v in data.values() if isinstance(v, str)]
+        label = next((v for v in strings if _SLOT_RE.search(v)), None)
+        if label:
+            slot = parse_slot(label)
+            slot.status = ' '.join(v for v in strings if v != label) or slot.status
+            for key, value in data.items():
+                if isinstance(value, int) and ('remain' in key or 'left' in key):
+                    slot.remaining = value
+            found.append(slot)
+            return found
+        data = list(data.values())
+    if isinstance(data, list):
+        for item in data:
+            found.extend(slots_from_json(item))
+    return found
+
+
+class SlotWindow:
+    """Booking target: any slot starting between ``earliest`` and ``latest`` (minutes after midnight).
+
+    ``duration`` (minutes) optionally restricts the slot length; ``prefer`` picks
+    the 'later' or 'earlier' start when several match, ties going to the slot
+    with more remaining places.
+    """
+
+    PREFERENCES = ('later', 'earlier')
+
+    def __init__(self, earliest: int, latest: int, duration: Optional[int] = None, prefer: str = 'later'):
+        if prefer not in self.PREFERENCES:
+            raise ValueError(f"Unsupported preference: {prefer}, it should be one of {list(self.PREFERENCES)}")
+        self.earliest = earliest
+        self.latest = latest
+        self.duration = duration
+        self.prefer = prefer
+
+    @classmethod
+    def parse(cls, spec: Union[str, dict]) -> 'SlotWindow':
+        """'18:00-21:00' 或 {'start': '18:00-21:00', 'duration': 60, 'prefer': 'later'}"""
+        if isinstance(spec, str):
+            spec = {'start': spec}
+        match = _SLOT_RE.search(str(spec.get('start', '')))
+        if not match:
+            raise ValueError(f"Unsupported time window: {spec}, the start should look like 18:00-21:00")
+        duration = spec.get('duration')
+        return cls(_minutes(match.group(1), match.group(2)), _minutes(match.group(3), match.group(4)),
+                   duration=int(duration) if duration else None, prefer=spec.get('prefer', 'later'))
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> Optional['SlotWindow']:
+        """配置了 time_window 时返回对应的窗口，否则返回 None（按 time_slot 精确匹配）"""
+        spec = cfg.get('time_window')
+        return cls.parse(spec) if spec else None
+
+    def matches(self, slot: Slot) -> bool:
+        return (self.earliest <= slot.start <= self.latest
+                and (self.duration is None or slot.duration == self.duration))
+
+    def best(self, slots: List[Slot]) -> Optional[Slot]:
+        """在已解析的时间段中选出最合适的一个可预约时间段"""
+        candidates = [s for s in slots if s.available and self.matches(s)]
+        if not candidates:
+            return None
+        direction = 1 if self.prefer == 'later' else -1
+        return max(candidates, key=lambda s: (direction * s.start, s.remaining or 0))
+
+    def __str__(self):
+        length = f" {self.duration}min" if self.duration else ''
+        return f"start {format_minutes(self.earliest)}-{format_minutes(self.latest)}{length} prefer {self.prefer}"
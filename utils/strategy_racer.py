@@ -0,0 +1,198 @@
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+
+from playwright.sync_api import Page, Response
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DETECTORS = ('dom', 'network', 'api')
+
+# 在页面内监视时间段列表，目标时间段一变为可预约就通过绑定函数报告（带页面内的时间戳）
+_DOM_WATCH_JS = '''(target) => {
+    if (window.__gymRaceObserver) window.__gymRaceObserver.disconnect();
+    const check = () => {
+        for (const el of document.querySelectorAll('div.element')) {
+            if (el.textContent.includes(target)) {
+                observer.disconnect();
+                window.__gymRaceSeen(Date.now());
+                return true;
+            }
+        }
+        return false;
+    };
+    const observer = new MutationObserver(check);
+    window.__gymRaceObserver = observer;
+    if (!check()) {
+        observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+    }
+}'''
+
+
+class BookingGuard:
+    """Let exactly one booking action through per target.
+
+    ``claim`` succeeds once for a key until it is ``release``-d again (e.g. after
+    the server rejected the submission), so a second detector, a late event or a
+    retry can never submit the same booking twice.
+    """
+
+    def __init__(self):
+        self._claimed = set()
+        self._lock = threading.Lock()
+
+    def claim(self, key) -> bool:
+        with self._lock:
+            if key in self._claimed:
+                return False
+            self._claimed.add(key)
+            return True
+
+    def release(self, key) -> None:
+        with self._lock:
+            self._claimed.discard(key)
+
+
+class StrategyRacer:
+    """Race several availability detectors on one page; the first sighting wins.
+
+    - dom: a MutationObserver in the page reports the target slot turning '(可预约)'
+    - network: the page's own xhr/fetch responses (the slots API when ``slots_api_url``
+      is configured) are checked as they arrive
+    - api: the slots API is polled directly through the context's request client
+
+    Each round refreshes the date view once (paced by the page's RateGovernor) and
+    polls the API once; the DOM and network detectors are driven by that refresh.
+    Every detector stamps the wall-clock time it saw the slot, the earliest stamp
+    wins. ``sightings`` keeps all stamps so the losers' lag can be recorded too.
+    """
+
+    def __init__(self, ticket_page, detectors: Iterable[str] = DETECTORS, grace_seconds: float = 0.2):
+        self.ticket_page = ticket_page
+        self.page: Page = ticket_page.page
+        if isinstance(detectors, str):
+            detectors = [d.strip() for d in detectors.split(',') if d.strip()]
+        unknown = set(detectors) - set(DETECTORS)
+        if unknown:
+            raise ValueError(f"Unsupported detectors: {sorted(unknown)}, they should be in {list(DETECTORS)}")
+        self.detectors = tuple(d for d in DETECTORS if d in detectors)
+        if 'api' in self.detectors and not ticket_page.slots_api_url:
+            logger.warning("api detector needs slots_api_url, racing without it")
+            self.detectors = tuple(d for d in self.detectors if d != 'api')
+        # 一轮中接口已返回但还没有检测器报告时，再等多久（给页面渲染留时间）
+        self.grace_seconds = grace_seconds
+        self.sightings: Dict[str, float] = {}
+        self.winner: Optional[str] = None
+        self._target: Optional[Tuple[str, str, str]] = None
+        self._api_path: Optional[str] = None
+        self._responses = 0
+        self._lock = threading.Lock()
+        self._installed = False
+
+    def _install(self) -> None:
+        """页面级的绑定和监听只注册一次，之后每次 arm 只更新目标"""
+        if self._installed:
+            return
+        if 'dom' in self.detectors:
+            self.page.expose_binding('__gymRaceSeen', lambda source, at: self._signal('dom', at / 1000))
+        if 'network' in self.detectors:
+            self.page.on('response', self._on_response)
+        self._installed = True
+
+    def _signal(self, detector: str, at: float) -> None:
+        with self._lock:
+            if self._target is None or detector in self.sightings:
+                return
+            self.sightings[detector] = at
+            time_slot = self._target[2]
+        logger.info(f"race: {detector} detector saw {time_slot} available")
+
+    def _arm_dom(self) -> None:
+        if 'dom' in self.detectors:
+            try:
+                self.page.evaluate(_DOM_WATCH_JS, f"{self._target[2]}(可预约)")
+            except Exception as e:
+                logger.warning(f"Failed to arm the dom detector: {str(e)}")
+
+    def _on_response(self, response: Response) -> None:
+        if self._target is None or response.request.resource_type not in ('xhr', 'fetch'):
+            return
+        if self._api_path and urlparse(response.url).path != self._api_path:
+            return
+        at = time.time()
+        self._responses += 1
+        try:
+            available = response.ok and self.ticket_page._slot_available(response.json(), self._target[2])
+        except Exception:
+            return
+        if available:
+            self._signal('network', at)
+
+    def _poll_api(self) -> None:
+        venue_type, day, time_slot = self._target
+        # 直接请求接口也是一次轮询，和刷新日期视图一样先取令牌（第一轮也不例外）
+        self.ticket_page.governor.acquire()
+        try:
+            if self.ticket_page.query_slot_api(time_slot, venue_type, day):
+                self._signal('api', time.time())
+        except Exception as e:
+            logger.warning(f"api detector failed: {str(e)}")
+
+    def _wait_round(self, timeout_seconds: float) -> None:
+        """等到有检测器报告、或接口已返回且渲染宽限已过、或超时"""
+        deadline = time.monotonic() + timeout_seconds
+        settled_at = None
+        while not self.sightings and time.monotonic() < deadline:
+            if settled_at is None and self._responses:
+                settled_at = time.monotonic() + self.grace_seconds
+            if settled_at is not None and time.monotonic() >= settled_at:
+                return
+            # 等待期间 Playwright 分发页面事件（绑定调用、响应）
+            self.page.wait_for_timeout(20)
+
+    def race(self, time_slot: str, day: str, venue_type: str, wait_timeout_seconds: float,
+             max_attempts: int = 100) -> str:
+        """等待目标时间段出现，返回胜出的检测器；超过次数时抛出 RuntimeError"""
+        self._install()
+        with self._lock:
+            self._target = (venue_type, day, time_slot)
+            self.sightings = {}
+            self.winner = None
+        if 'network' in self.detectors and self.ticket_page.slots_api_url:
+            self._api_path = urlparse(self.ticket_page._slots_api(venue_type, day)).path
+        try:
+            for attempt in range(max_attempts):
+                if self.ticket_page.prewarmer:
+                    self.ticket_page.prewarmer.maybe_prewarm(self.ticket_page.governor)
+                self._responses = 0
+                if attempt > 0:
+                    self.ticket_page._add_retry()
+                    self.ticket_page.refresh_date_view(day, venue_type, wait_timeout_seconds)
+                self._arm_dom()
+                if 'api' in self.detectors and not self.sightings:
+                    self._poll_api()
+                self._wait_round(wait_timeout_seconds if attempt > 0 else self.grace_seconds)
+                if self.sightings:
+                    self.winner = min(self.sightings, key=self.sightings.get)
+                    logger.info(f"race: {self.winner} detector won after {attempt} retries")
+                    # 保持监听到 finish()，落后的检测器仍可报告，用于统计
+                    return self.winner
+                logger.info(f"race: {time_slot} not available yet, retrying...")
+        except BaseException:
+            self.finish()
+            raise
+        self.finish()
+        logger.error(f"Failed to select time slot: {time_slot} after {max_attempts} attempts.")
+        raise RuntimeError(f"Failed to select time slot: {time_slot} after {max_attempts} attempts.")
+
+    def finish(self) -> Dict[str, float]:
+        """停止接收报告，返回其他检测器相对胜出者晚了多少秒"""
+        with self._lock:
+            self._target = None
+        if not self.winner:
+            return {}
+        first = self.sightings[self.winner]
+        return {d: at - first for d, at in self.sightings.items() if d != self.winner}
@@ -0,0 +1,167 @@
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+from playwright.sync_api import BrowserContext, Page
+
+from utils.browser_pool import STORAGE_STATE_FILE, ContextSetup, context_setup
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+BROWSER_PROCESS_NAMES = ('chrome', 'chromium', 'msedge', 'headless_shell')
+
+
+def _descendants_proc(root_pid: int) -> Dict[int, str]:
+    """Linux fallback without psutil: map descendant pid -> process name via /proc."""
+    parents: Dict[int, int] = {}
+    names: Dict[int, str] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # 进程名在括号中，可能包含空格
+        name = stat[stat.index('(') + 1:stat.rindex(')')]
+        ppid = int(stat[stat.rindex(')') + 2:].split()[1])
+        parents[int(entry)] = ppid
+        names[int(entry)] = name
+    found: Dict[int, str] = {}
+    frontier = [root_pid]
+    while frontier:
+        pid = frontier.pop()
+        for child, ppid in parents.items():
+            if ppid == pid and child not in found:
+                found[child] = names[child]
+                frontier.append(child)
+    return found
+
+
+def browser_rss_mb() -> Optional[float]:
+    """Total RSS in MB of the browser processes started by this process, None if unknown."""
+    try:
+        import psutil  # pylint: disable=import-error
+
+        children = psutil.Process().children(recursive=True)
+        return sum(
+            p.memory_info().rss for p in children
+            if any(name in p.name().lower() for name in BROWSER_PROCESS_NAMES)
+        ) / 1024 / 1024
+    except ImportError:
+        pass
+    except Exception as exc:  # pragma: no cover - processes may exit while sampling
+        logger.debug(f"psutil sampling failed: {exc}")
+        return None
+
+    if not sys.platform.startswith('linux'):
+        return None
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    total = 0
+    for pid, name in _descendants_proc(os.getpid()).items():
+        if not any(n in name.lower() for n in BROWSER_PROCESS_NAMES):
+            continue
+        try:
+            with open(f'/proc/{pid}/statm', 'r') as f:
+                total += int(f.read().split()[1]) * page_size
+        except OSError:
+            continue
+    return total / 1024 / 1024
+
+
+def js_heap_mb(page: Page) -> Optional[float]:
+    """Used JS heap of the page in MB (Chromium only), None if unavailable."""
+    try:
+        used = page.evaluate('() => performance.memory ? performance.memory.usedJSHeapSize : null')
+    except Exception:
+        return None
+    return None if used is None else used / 1024 / 1024
+
+
+class MemoryWatchdog:
+    """Sample browser RSS and JS heap, and recycle the context when a limit is crossed.
+
+    Recycling snapshots the session (cookies + localStorage), opens a new context
+    from it on the same browser, reopens the current URL and closes the old
+    context, so the login survives while the renderer's memory is released.
+    With the ``setup`` the page was opened with (see open_page), the new context
+    gets the same options and routes (fault injection, asset cache, HAR) and the
+    session is saved to that setup's file instead of the default one.
+    """
+
+    def __init__(self, page: Page, rss_limit_mb: float = 1024, heap_limit_mb: float = 256,
+                 interval_seconds: float = 60, headless: bool = True, setup: Optional[ContextSetup] = None):
+        self.page = page
+        self.setup = setup or ContextSetup(headless, STORAGE_STATE_FILE, {}, [])
+        self.rss_limit_mb = rss_limit_mb
+        self.heap_limit_mb = heap_limit_mb
+        self.interval_seconds = interval_seconds
+        self.headless = headless
+        self.recycles = 0
+        self._next_sample = time.monotonic() + interval_seconds
+        self._owned: List[BrowserContext] = []
+
+    @classmethod
+    def from_config(cls, page: Page, cfg: dict, headless: bool,
+                    setup: Optional[ContextSetup] = None) -> 'MemoryWatchdog':
+        return cls(
+            page,
+            rss_limit_mb=float(cfg.get('watchdog_rss_mb', 1024)),
+            heap_limit_mb=float(cfg.get('watchdog_heap_mb', 256)),
+            interval_seconds=float(cfg.get('watchdog_interval_seconds', 60)),
+            headless=headless,
+            setup=setup or context_setup(page.context),
+        )
+
+    def over_limit(self) -> Optional[str]:
+        """Return why the context should be recycled, or None."""
+        rss = browser_rss_mb()
+        heap = js_heap_mb(self.page)
+        logger.debug(f"watchdog sample: rss={rss} MB heap={heap} MB")
+        if rss is not None and rss > self.rss_limit_mb:
+            return f"browser RSS {rss:.0f} MB > {self.rss_limit_mb:.0f} MB"
+        if heap is not None and heap > self.heap_limit_mb:
+            return f"JS heap {heap:.0f} MB > {self.heap_limit_mb:.0f} MB"
+        return None
+
+    def tick(self) -> Page:
+        """Sample when the interval has elapsed; return the (possibly recycled) page."""
+        if time.monotonic() < self._next_sample:
+            return self.page
+        self._next_sample = time.monotonic() + self.interval_seconds
+        reason = self.over_limit()
+        if reason:
+            self.recycle(reason)
+        return self.page
+
+    def recycle(self, reason: str) -> Page:
+        old_page = self.page
+        old_context = old_page.context
+        url = old_page.url
+        logger.info(f"Recycling browser context: {reason}")
+        state = old_context.storage_state()
+        self.setup.save_state(old_context)
+        context = self.setup.new_context(old_context.browser, storage_state=state)
+        self._owned.append(context)
+        page = context.new_page()
+        page.goto(url)
+        # 关闭旧 context 释放渲染进程；open_page 退出时不会再用它覆盖登录态
+        if old_context in self._owned:
+            self._owned.remove(old_context)
+        old_context.close()
+        self.page = page
+        self.recycles += 1
+        return page
+
+    def close(self) -> None:
+        """Persist the latest session and close contexts opened by recycling."""
+        for context in self._owned:
+            try:
+                self.setup.save_state(context)
+                context.close()
+            except Exception as exc:
+                logger.debug(f"Recycled context already closed: {exc}")
+        self._owned.clear()